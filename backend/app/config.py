@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,5 +13,36 @@ class Env:
   ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
   ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
   GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN")
+  # Comma-separated pool of tokens shared by the GitHub request scheduler
+  GITHUB_TOKENS: list = [token.strip() for token in os.getenv("GITHUB_TOKENS", os.getenv("GITHUB_TOKEN") or "").split(",") if token.strip()]
+  GITHUB_WEBHOOK_SECRET: str = os.getenv("GITHUB_WEBHOOK_SECRET")
+  GITHUB_API_URL: str = os.getenv("GITHUB_API_URL", "https://api.github.com")
+  GITHUB_MAX_CONCURRENCY: int = int(os.getenv("GITHUB_MAX_CONCURRENCY", 8))
+  # "api" syncs through the REST API, "git" analyzes a local bare clone
+  GITHUB_ANALYSIS_BACKEND: str = os.getenv("GITHUB_ANALYSIS_BACKEND", "api")
+  GIT_CLONE_DIR: str = os.getenv("GIT_CLONE_DIR", os.path.join(tempfile.gettempdir(), "itss-repos"))
+  JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 2))
+  # Unfinished jobs whose process stopped renewing their lease for this long are failed
+  JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", 60))
+  MINIO_ENDPOINT: str = os.getenv("MINIO_ENDPOINT", "localhost:9000")
+  MINIO_ACCESS_KEY: str = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
+  MINIO_SECRET_KEY: str = os.getenv("MINIO_SECRET_KEY", "minioadmin")
+  MINIO_SECURE: bool = os.getenv("MINIO_SECURE", "false").lower() == "true"
+  MINIO_BUCKET: str = os.getenv("MINIO_BUCKET", "documents")
+  MINIO_REGION: str = os.getenv("MINIO_REGION", "us-east-1")
+  # Host browsers use to reach MinIO in presigned URLs, when it differs from MINIO_ENDPOINT
+  MINIO_PUBLIC_ENDPOINT: str = os.getenv("MINIO_PUBLIC_ENDPOINT")
+  # Seconds before storage setup and health probes give up on an unresponsive server
+  STORAGE_PROBE_TIMEOUT: float = float(os.getenv("STORAGE_PROBE_TIMEOUT", 5))
+  PRESIGNED_URL_EXPIRY: int = int(os.getenv("PRESIGNED_URL_EXPIRY", 15 * 60))
+  # Uploads are streamed in parts of this size (at least 5 MiB), at most
+  # UPLOAD_PARALLEL_PARTS of them in flight, so each upload holds
+  # (UPLOAD_PARALLEL_PARTS + 1) * UPLOAD_PART_SIZE bytes at most
+  UPLOAD_PART_SIZE: int = int(os.getenv("UPLOAD_PART_SIZE", 16 * 1024 * 1024))
+  UPLOAD_PARALLEL_PARTS: int = int(os.getenv("UPLOAD_PARALLEL_PARTS", 2))
+  # Storage calls in flight at once, in threads separate from the shared thread pool
+  STORAGE_MAX_CONCURRENCY: int = int(os.getenv("STORAGE_MAX_CONCURRENCY", 8))
+  # Enough connections for every transfer and its parallel upload parts
+  STORAGE_POOL_SIZE: int = int(os.getenv("STORAGE_POOL_SIZE", STORAGE_MAX_CONCURRENCY * (UPLOAD_PARALLEL_PARTS + 1)))
 
 env = Env()
\ No newline at end of file
@@ -7,9 +7,34 @@ from models.project_model import Project
 from models.group_model import Group
 from models.evaluation_model import Evaluation
 from models.report_model import Report
+from models.free_rider import FreeRider
+from models.commit_stats import CommitStats
+from models.contributor_activity import ContributorActivity
+from models.repo_sync import RepoSync
+from models.analysis_job import AnalysisJob
+from models.evaluation_aggregate import EvaluationAggregate, EvaluationAggregateBuild
+from models.task_file import TaskFile
 from pymongo.errors import OperationFailure
 import logging
 
+DOCUMENT_MODELS = [User, Task, Project, Group, Evaluation, Report, FreeRider, CommitStats, ContributorActivity, RepoSync, AnalysisJob, EvaluationAggregate, EvaluationAggregateBuild, TaskFile]
+
+async def check_indexes(document_models):
+    """Log declared indexes missing from the database and indexes never used since server start."""
+    for model in document_models:
+        collection = model.get_motor_collection()
+        try:
+            declared = {index.name for index in model.get_settings().indexes}
+            existing = set(await collection.index_information())
+            for name in sorted(declared - existing):
+                logging.warning(f"Missing index {name} on {collection.name}")
+
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                    logging.info(f"Unused index {stats['name']} on {collection.name} since {stats['accesses']['since']}")
+        except OperationFailure as e:
+            logging.warning(f"Could not check indexes on {collection.name}: {e}")
+
 async def init_db(test: bool = False):
     try:
         mongo_uri = f"{env.MONGO_URI}?authSource=admin"
@@ -17,10 +42,12 @@ async def init_db(test: bool = False):
         db_name = "test_db" if test else env.DATABASE_NAME
         db = client[db_name]
 
+        # init_beanie creates the indexes declared in each model's Settings
         await init_beanie(
             database=db,
-            document_models=[User, Task, Project, Group, Evaluation, Report]
+            document_models=DOCUMENT_MODELS
         )
         logging.info(f"Connected to MongoDB: {db_name}")
+        await check_indexes(DOCUMENT_MODELS)
     except OperationFailure as e:
-        logging.error("Connect fail: %s", e)
\ No newline at end of file
+        logging.error("Connect fail: %s", e)
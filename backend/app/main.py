@@ -2,15 +2,28 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from routes import user_routes, project_routes, report_routes, task_routes, group_routes, evaluation_routes, github_routes, upload, free_rider
+from routes import user_routes, project_routes, report_routes, task_routes, group_routes, evaluation_routes, github_routes, upload, free_rider, health_routes
 from database import init_db
+from service.pagination import NEXT_CURSOR_HEADER
+from service.github_client import get_github_client
+from service.job_queue import get_job_queue
+from service.evaluation_aggregate_store import get_evaluation_aggregate_store
+from service.object_storage import object_storage
+import asyncio
 from config import env
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown."""
+    # Storage is set up in the background: the app serves without waiting for it
+    storage_init = asyncio.create_task(object_storage().connect())
     await init_db()
+    await get_evaluation_aggregate_store().ensure_built()
+    await get_job_queue().start()
     yield 
+    storage_init.cancel()
+    await get_job_queue().stop()
+    await get_github_client().aclose()
     print("Shutting down gracefully...")
 
 class FastAPIApp:
@@ -27,6 +40,7 @@ class FastAPIApp:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=[NEXT_CURSOR_HEADER],
         )
 
     def include_routers(self):
@@ -39,6 +53,7 @@ class FastAPIApp:
         self.app.include_router(github_routes.router)
         self.app.include_router(upload.router)
         self.app.include_router(free_rider.router)
+        self.app.include_router(health_routes.router)
 
 
 app_instance = FastAPIApp().app
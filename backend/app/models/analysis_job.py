@@ -0,0 +1,27 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+class AnalysisJob(Document):
+    kind: str
+    # Jobs with the same key are not run concurrently
+    key: str
+    params: Dict[str, Any] = {}
+    status: str = "queued"  # queued, running, done, failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Process running the job, which renews the lease while it is alive
+    owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+
+    class Settings:
+        name = "analysis_jobs"
+        indexes = [
+            IndexModel([("key", ASCENDING), ("created_at", DESCENDING)], name="key_created"),
+            IndexModel([("status", ASCENDING)], name="status"),
+        ]
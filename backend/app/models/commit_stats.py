@@ -0,0 +1,16 @@
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+
+class CommitStats(Document):
+    # Stats of a commit never change, so they are fetched from GitHub once per SHA
+    repo: str
+    sha: str
+    additions: int
+    deletions: int
+    files: int
+
+    class Settings:
+        name = "commit_stats"
+        indexes = [
+            IndexModel([("repo", ASCENDING), ("sha", ASCENDING)], name="repo_sha", unique=True),
+        ]
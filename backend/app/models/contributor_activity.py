@@ -0,0 +1,21 @@
+from typing import List, Optional
+from datetime import datetime
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+
+class ContributorActivity(Document):
+    # Running totals of a repository author, updated as new commits are synced
+    repo: str
+    contributor: str
+    messages: List[str] = []
+    commit_count: int = 0
+    lines_added: int = 0
+    lines_removed: int = 0
+    files_modified: int = 0
+    last_commit_date: Optional[datetime] = None
+
+    class Settings:
+        name = "contributor_activity"
+        indexes = [
+            IndexModel([("repo", ASCENDING), ("contributor", ASCENDING)], name="repo_contributor", unique=True),
+        ]
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class EvaluationAggregate(Document):
+    # Running score totals of a student in a project, kept in step with the evaluations
+    project: PydanticObjectId
+    student: PydanticObjectId
+    evaluation_count: int = 0
+    scored_count: int = 0
+    score_sum: float = 0
+    score_sumsq: float = 0
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+
+    class Settings:
+        name = "evaluation_aggregates"
+        indexes = [
+            IndexModel([("project", ASCENDING), ("student", ASCENDING)], name="project_student", unique=True),
+        ]
+
+
+class EvaluationAggregateBuild(Document):
+    # Claimed by the one process that builds the totals of the existing evaluations
+    key: str
+    started_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "evaluation_aggregate_builds"
+        indexes = [
+            IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+        ]
@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Optional
 from beanie import Document, Link
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 
 class Evaluation(Document):
@@ -14,6 +15,11 @@ class Evaluation(Document):
 
     class Settings:
         collection = "evaluations"
+        # Embedded and DBRef links, see User
+        indexes = [
+            IndexModel([("project._id", ASCENDING), ("student._id", ASCENDING)], name="project_student"),
+            IndexModel([("project.$id", ASCENDING), ("student.$id", ASCENDING)], name="project_student_ref"),
+        ]
 
 
 from .project_model import Project
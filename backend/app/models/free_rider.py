@@ -2,6 +2,7 @@ from typing import Optional
 from datetime import datetime
 from beanie import Document, Link
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 class FreeRider(Document):    
     score: float
@@ -11,10 +12,14 @@ class FreeRider(Document):
     lines_added: int
     lines_removed: int
     files_modified: int
-    last_commit_date: datetime
+    last_commit_date: Optional[datetime] = None
 
     class Settings:
       name = "free_rider"
+      # Free riders reference their user and group by DBRef; one entry per (group, user)
+      indexes = [
+          IndexModel([("group.$id", ASCENDING), ("user.$id", ASCENDING)], name="group_user", unique=True),
+      ]
 
 from .user_model import User
 from .group_model import Group
\ No newline at end of file
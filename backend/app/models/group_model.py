@@ -1,7 +1,27 @@
 from datetime import datetime
 from typing import List, Optional
-from beanie import Document, Link
-from pydantic import Field
+from beanie import Document, Link, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+
+class MemberSummary(BaseModel):
+    """Compact copy of a user embedded in groups so reads need no link traversal."""
+    id: PydanticObjectId
+    ho_ten: Optional[str] = None
+    email: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: "User") -> "MemberSummary":
+        return cls(id=user.id, ho_ten=user.ho_ten, email=user.email)
+
+class ProjectSummary(BaseModel):
+    id: PydanticObjectId
+    title: str
+    description: Optional[str] = None
+
+    @classmethod
+    def from_project(cls, project: "Project") -> "ProjectSummary":
+        return cls(id=project.id, title=project.title, description=project.description)
 
 class Group(Document):
     name: str
@@ -10,10 +30,23 @@ class Group(Document):
     members: Optional[List[Link["User"]]]
     allTasks: Optional[List[Link["Task"]]]
     github_link: Optional[str] = None  # Thêm trường mới với giá trị mặc định là None
+    # Denormalized copies of the linked documents; None on groups created before they existed
+    project_summary: Optional[ProjectSummary] = None
+    leader_summary: Optional[MemberSummary] = None
+    member_summaries: Optional[List[MemberSummary]] = None
     created_at: datetime = Field(default_factory=datetime.now)
     
+    def has_summaries(self) -> bool:
+        return None not in (self.project_summary, self.leader_summary, self.member_summaries)
+
     class Settings:
         collection = "groups"
+        # Used to propagate profile and project changes to the embedded summaries
+        indexes = [
+            IndexModel([("member_summaries.id", ASCENDING)], name="member_summaries"),
+            IndexModel([("leader_summary.id", ASCENDING)], name="leader_summary"),
+            IndexModel([("project_summary.id", ASCENDING)], name="project_summary"),
+        ]
         
 from .project_model import Project
 from .task_model import Task
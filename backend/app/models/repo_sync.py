@@ -0,0 +1,19 @@
+from typing import List
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class RepoSync(Document):
+    # Sync cursor: commits are listed again from the latest committer date seen,
+    # skipping the SHAs already ingested at that date
+    repo: str
+    last_commit_date: datetime
+    last_commit_shas: List[str] = []
+    synced_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "repo_sync"
+        indexes = [
+            IndexModel([("repo", ASCENDING)], name="repo_unique", unique=True),
+        ]
@@ -2,6 +2,7 @@ from beanie import Document, Link
 from datetime import datetime
 from typing import Optional
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 class Report(Document):
     content: str
@@ -11,6 +12,11 @@ class Report(Document):
     title: Optional[str] = None 
     class Settings:
         collection = "reports"
+        # Embedded and DBRef links, see User
+        indexes = [
+            IndexModel([("task._id", ASCENDING)], name="task"),
+            IndexModel([("task.$id", ASCENDING)], name="task_ref"),
+        ]
 
 from .user_model import User
 from .task_model import Task
\ No newline at end of file
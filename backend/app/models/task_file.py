@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class TaskFile(Document):
+    # Metadata of a file uploaded straight to object storage, recorded when the upload completes
+    task: PydanticObjectId
+    object_name: str
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+    etag: str
+    uploaded_by: Optional[PydanticObjectId] = None
+    uploaded_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "task_files"
+        indexes = [
+            IndexModel([("object_name", ASCENDING)], name="object_name_unique", unique=True),
+            IndexModel([("task", ASCENDING)], name="task"),
+        ]
@@ -1,6 +1,7 @@
 from datetime import datetime
 from beanie import Document, Link
 from pydantic import EmailStr, Field
+from pymongo import ASCENDING, IndexModel
 from typing import List, Optional
 
 
@@ -19,6 +20,13 @@ class User(Document):
     
     class Settings:
         collection = "users"
+        # Links are inserted as embedded copies ("<field>._id") and become DBRefs
+        # ("<field>.$id") once a loaded document is saved, so both paths are indexed
+        indexes = [
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+            IndexModel([("role", ASCENDING), ("group_id._id", ASCENDING)], name="role_group"),
+            IndexModel([("role", ASCENDING), ("group_id.$id", ASCENDING)], name="role_group_ref"),
+        ]
 
 from .group_model import Group
 from .task_model import Task
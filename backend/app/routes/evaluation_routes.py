@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import Optional
 from models.evaluation_model import Evaluation
 from models.user_model import User
 from models.project_model import Project
-from schemas.evaluation_schemas import EvaluationCreate, EvaluationResponse
+from schemas.evaluation_schemas import EvaluationCreate, EvaluationResponse, StudentEvaluationSummary
 from schemas.pyobjectid_schemas import PyObjectId
+from schemas.projection_schemas import EvaluationListView, ProjectRefView, UserRefView
 from routes.user_routes import get_current_user
+from service.document_loader import DocumentLoader, get_document_loader
+from service.evaluation_aggregate_store import EvaluationAggregateStore, get_evaluation_aggregate_store
+from service.link_resolver import find_by_ids, link_id
+from service.pagination import paginate, set_next_cursor
 from beanie import Link
+import asyncio
 import logging
 
 # Setup logging
@@ -21,7 +28,8 @@ router = APIRouter(
 @router.post("/", response_model=EvaluationResponse,
                description="Create a new evaluation. Only students can create evaluations.",
                summary="Create a new evaluation")
-async def create_evaluation(evaluation: EvaluationCreate, current_user: User = Depends(get_current_user)):
+async def create_evaluation(evaluation: EvaluationCreate, current_user: User = Depends(get_current_user),
+                            aggregates: EvaluationAggregateStore = Depends(get_evaluation_aggregate_store)):
     try:
         # Validate and get student
         student_id = PyObjectId.validate(evaluation.student_id)
@@ -43,6 +51,7 @@ async def create_evaluation(evaluation: EvaluationCreate, current_user: User = D
             comment=evaluation.comment,
         )
         await new_evaluation.insert()
+        await aggregates.add(project.id, student.id, new_evaluation.score)
         logger.info(f"Created new evaluation: {new_evaluation.id}")
 
         # Return response without fetching again
@@ -62,26 +71,34 @@ async def create_evaluation(evaluation: EvaluationCreate, current_user: User = D
 @router.get("/", response_model=list[EvaluationResponse],
             description="Get all evaluations. Only the evaluator can view their evaluations.",
             summary="Get all evaluations")
-async def get_all_evaluations(current_user: User = Depends(get_current_user),
+async def get_all_evaluations(response: Response,
+                              current_user: User = Depends(get_current_user),
                               skip: int=Query(0, ge=0, description="Number of reports to skip"), 
-                              limit: int=Query(10, le=100, description="Maximum number of reports to return")):
+                              limit: int=Query(10, le=100, description="Maximum number of reports to return"),
+                              cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page; takes precedence over skip")):
     try:
         # Lấy tất cả evaluations
-        evaluations = await Evaluation.find().skip(skip).limit(limit).to_list()
+        evaluations = await paginate(Evaluation.find(), skip, limit, cursor).project(EvaluationListView).to_list()
+        set_next_cursor(response, evaluations, limit)
+        # Fetch evaluators, students and projects of the whole page in batched, projected queries
+        user_ids = {e.evaluator_id for e in evaluations} | {e.student_id for e in evaluations}
+        users, projects = await asyncio.gather(
+            find_by_ids(User, user_ids - {None}, UserRefView),
+            find_by_ids(Project, {e.project_id for e in evaluations} - {None}, ProjectRefView)
+        )
         result = []
         for evaluation in evaluations:
-            # Fetch evaluator, student, project
-            evaluator = await evaluation.evaluator.fetch() if isinstance(evaluation.evaluator, Link) else evaluation.evaluator
+            evaluator = users.get(evaluation.evaluator_id)
             if not evaluator:
                 logger.error(f"Failed to resolve evaluator for evaluation {evaluation.id}")
                 continue
 
-            student = await evaluation.student.fetch() if isinstance(evaluation.student, Link) else evaluation.student
+            student = users.get(evaluation.student_id)
             if not student:
                 logger.error(f"Failed to resolve student for evaluation {evaluation.id}")
                 continue
 
-            project = await evaluation.project.fetch() if isinstance(evaluation.project, Link) else evaluation.project
+            project = projects.get(evaluation.project_id)
             if not project:
                 logger.error(f"Failed to resolve project for evaluation {evaluation.id}")
                 continue
@@ -97,15 +114,54 @@ async def get_all_evaluations(current_user: User = Depends(get_current_user),
                 comment=evaluation.comment
             ))
         return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching all evaluations: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get("/projects/{project_id}/summary", response_model=list[StudentEvaluationSummary],
+            description="Average, number, minimum and maximum evaluation score of every evaluated student of a project.",
+            summary="Get the evaluation summary of a project")
+async def get_project_evaluation_summary(project_id: str, current_user: User = Depends(get_current_user),
+                                         aggregates: EvaluationAggregateStore = Depends(get_evaluation_aggregate_store)):
+    try:
+        project_id_obj = PyObjectId.validate(project_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid project_id format")
+
+    try:
+        project = await Project.get(project_id_obj)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        # Điểm đã được tổng hợp sẵn, chỉ tải thêm thông tin sinh viên
+        stats = await aggregates.get_many(project.id)
+        students = await find_by_ids(User, stats.keys(), UserRefView)
+        result = []
+        for student_id, student_stats in stats.items():
+            student = students.get(student_id)
+            if not student:
+                logger.error(f"Failed to resolve student {student_id} for project {project_id}")
+                continue
+            result.append(StudentEvaluationSummary(
+                student={"id": str(student.id), "ho_ten": student.ho_ten or "", "email": student.email},
+                **student_stats
+            ))
+        return sorted(result, key=lambda summary: summary.avg, reverse=True)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching evaluation summary: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/{evaluation_id}", response_model=EvaluationResponse,
             description="Get an evaluation by ID. Only the evaluator can view their evaluation.",
             summary="Get an evaluation by ID")
-async def get_evaluation(evaluation_id: str, current_user: User = Depends(get_current_user)):
+async def get_evaluation(evaluation_id: str, current_user: User = Depends(get_current_user),
+                         loader: DocumentLoader = Depends(get_document_loader)):
     # Validate and get evaluation
     try:
         evaluation_id_obj = PyObjectId.validate(evaluation_id)
@@ -116,9 +172,10 @@ async def get_evaluation(evaluation_id: str, current_user: User = Depends(get_cu
         raise HTTPException(status_code=404, detail="Evaluation not found")
     
     try:
-        evaluator = await evaluation.evaluator.fetch() if isinstance(evaluation.evaluator, Link) else evaluation.evaluator
-        student = await evaluation.student.fetch() if isinstance(evaluation.student, Link) else evaluation.student
-        project = await evaluation.project.fetch() if isinstance(evaluation.project, Link) else evaluation.project
+        student, project = await asyncio.gather(
+            loader.fetch(evaluation.student),
+            loader.fetch(evaluation.project)
+        )
 
         return EvaluationResponse(
             _id=str(evaluation.id),
@@ -135,7 +192,8 @@ async def get_evaluation(evaluation_id: str, current_user: User = Depends(get_cu
 @router.put("/{evaluation_id}", response_model=EvaluationResponse,
             description="Update an evaluation. Only the evaluator can update their evaluation.",
             summary="Update an evaluation")
-async def update_evaluation(evaluation_id: str, evaluation: EvaluationCreate, current_user: User = Depends(get_current_user)):
+async def update_evaluation(evaluation_id: str, evaluation: EvaluationCreate, current_user: User = Depends(get_current_user),
+                            aggregates: EvaluationAggregateStore = Depends(get_evaluation_aggregate_store)):
     # Validate and get evaluation
     try:
         evaluation_id_obj = PyObjectId.validate(evaluation_id)
@@ -182,12 +240,16 @@ async def update_evaluation(evaluation_id: str, evaluation: EvaluationCreate, cu
         raise HTTPException(status_code=404, detail="Project not found")
 
 
-    # Update evaluation
+    # Update evaluation, retracting the old score from the aggregates
+    old_project_id, old_student_id, old_score = link_id(db_evaluation.project), link_id(db_evaluation.student), db_evaluation.score
     db_evaluation.student = Link(student, document_class=User)
     db_evaluation.project = Link(project, document_class=Project)
     db_evaluation.score = evaluation.score
     db_evaluation.comment = evaluation.comment
     await db_evaluation.save()
+    if old_project_id and old_student_id:
+        await aggregates.remove(old_project_id, old_student_id, old_score)
+    await aggregates.add(project.id, student.id, db_evaluation.score)
     logger.info(f"Updated evaluation: {db_evaluation.id}")
 
     # Return response
@@ -203,7 +265,8 @@ async def update_evaluation(evaluation_id: str, evaluation: EvaluationCreate, cu
 @router.delete("/{evaluation_id}",
                description="Delete an evaluation. Only the evaluator can delete their evaluation.",
                summary="Delete an evaluation")
-async def delete_evaluation(evaluation_id: str, current_user: User = Depends(get_current_user)):
+async def delete_evaluation(evaluation_id: str, current_user: User = Depends(get_current_user),
+                            aggregates: EvaluationAggregateStore = Depends(get_evaluation_aggregate_store)):
     # Validate and get evaluation
     try:
         evaluation_id_obj = PyObjectId.validate(evaluation_id)
@@ -229,5 +292,8 @@ async def delete_evaluation(evaluation_id: str, current_user: User = Depends(get
    
 
     await evaluation.delete()
+    project_id, student_id = link_id(evaluation.project), link_id(evaluation.student)
+    if project_id and student_id:
+        await aggregates.remove(project_id, student_id, evaluation.score)
     logger.info(f"Deleted evaluation: {evaluation_id}")
     return {"message": "Evaluation deleted"}
\ No newline at end of file
@@ -1,15 +1,13 @@
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from models.free_rider import FreeRider
 from models.group_model import Group
-from models.user_model import User
-from models.evaluation_model import Evaluation
-from service.github_service import GitHubService
-from service.github_service import GitHubService
-from schemas.free_rider import FreeRiderResponse
-from routes.user_routes import get_current_user
-from beanie import Link
+from service.github_service import GitHubService, get_github_service
+from service.document_loader import DocumentLoader, get_document_loader
+from service.free_rider_service import analyze_free_riders, score_project
+from service.job_queue import JobQueue, get_job_queue
+from schemas.free_rider import FreeRiderResponse, FreeRiderJobResponse, FreeRiderRankingRow
 from bson import ObjectId
+from bson.errors import InvalidId
+from functools import partial
 import logging
 
 # Setup logging
@@ -21,81 +19,80 @@ router = APIRouter(
   responses={404: {"description": "Not found"}}
 )
 
-def get_github_service():
-    return GitHubService()
-  
 @router.get("/get_free_rider", response_model=list[FreeRiderResponse])
 async def get_free_rider(
     group_id: str = Query(..., description="Group ID to filter free riders"),
-    github_service: GitHubService = Depends(get_github_service)
+    github_service: GitHubService = Depends(get_github_service),
+    loader: DocumentLoader = Depends(get_document_loader)
 ):
+    return await analyze_free_riders(group_id, github_service, loader)
+
+@router.get("/projects/{project_id}/ranking", response_model=list[FreeRiderRankingRow])
+async def get_project_ranking(
+    project_id: str,
+    github_service: GitHubService = Depends(get_github_service),
+    loader: DocumentLoader = Depends(get_document_loader)
+):
+    """Xếp hạng thành viên của mọi nhóm trong project, điểm thấp nhất trước"""
     try:
-        group_obj_id = ObjectId(group_id)
-        group = await Group.get(group_obj_id)
+        return await score_project(project_id, github_service, loader)
+    except HTTPException as e:
+        raise e
+    except InvalidId:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid project ID")
+    except Exception as e:
+        logger.error(f"Error ranking project free riders: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post("/jobs", response_model=FreeRiderJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_free_rider_job(
+    group_id: str = Query(..., description="Group ID to analyze"),
+    github_service: GitHubService = Depends(get_github_service),
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """Queue a free rider analysis; poll GET /free_rider/jobs/{job_id} for its result"""
+    try:
+        group = await Group.get(ObjectId(group_id))
         if not group:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
-        
-        members = await group.members.fetch() if group.members else []
-        github_link = group.github_link
-        if not github_link:
+        if not group.github_link:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Group does not have a GitHub link")
-        
-        reponame = github_link.split("/")[-1]
-        username = github_link.split("/")[-2]
-        contributors = await github_service.get_repo_contributors(reponame, username)
-        
-        for c in contributors:
-            c["loc"] = c["lines_added"] + c["lines_removed"]
-        max_loc = max((c["loc"] for c in contributors), default=1)
-        min_loc = min((c["loc"] for c in contributors), default=0)
-
-        project = await group.project.fetch()
 
-        for student in members:
-            student_evals = await Evaluation.find(
-                Evaluation.project == Link(project),
-                Evaluation.student == Link(student)
-            ).to_list()
-
-            avg_score = sum(e.score for e in student_evals if e.score is not None) / len(student_evals) if student_evals else 0
-
-            contributor_data = next((c for c in contributors if c["contributor"] == student.github_user), None)
-
-            if contributor_data:
-                loc_score = (contributor_data["loc"] - min_loc) / (max_loc - min_loc) if max_loc != min_loc else 0
-                real_score = loc_score * 0.2 + avg_score * 0.8
-            else:
-                real_score = 0
-
-            if real_score < 0.2:
-                await FreeRider.find(FreeRider.group == Link(group)).delete()
-
-                freerider = FreeRider(
-                    score=real_score,
-                    user=Link(student),
-                    group=Link(group),
-                    commit_count=contributor_data["commit_count"] if contributor_data else 0,
-                    lines_added=contributor_data["lines_added"] if contributor_data else 0,
-                    lines_removed=contributor_data["lines_removed"] if contributor_data else 0,
-                    files_modified=contributor_data["files_modified"] if contributor_data else 0,
-                    last_commit_date=datetime.fromisoformat(contributor_data["last_commit_date"]) if contributor_data and contributor_data["last_commit_date"] else None
-                )
-                await freerider.insert()
-                logger.info(f"Added free rider: {student.username} to group {group.name}")
+        # A job already queued or running for the group is reused
+        job_id = await job_queue.submit(
+            "free_rider",
+            f"free_rider:{group.id}",
+            partial(analyze_free_riders, str(group.id), github_service),
+            {"group_id": str(group.id)}
+        )
+        return await get_free_rider_job(str(job_id), job_queue)
+    except HTTPException as e:
+        raise e
+    except InvalidId:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid group ID")
+    except Exception as e:
+        logger.error(f"Error submitting free rider job: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-        freeriders = await FreeRider.find(FreeRider.group == Link(group)).to_list()
-        return [
-            FreeRiderResponse(
-                score=fr.score,
-                user=await fr.user.fetch() if fr.user else None,
-                group=await fr.group.fetch() if fr.group else None,
-                commit_count=fr.commit_count,
-                lines_added=fr.lines_added,
-                lines_removed=fr.lines_removed,
-                files_modified=fr.files_modified,
-                last_commit_date=fr.last_commit_date.isoformat() if fr.last_commit_date else None
-            ) for fr in freeriders
-        ]
+@router.get("/jobs/{job_id}", response_model=FreeRiderJobResponse)
+async def get_free_rider_job(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+    try:
+        job = await job_queue.store.get(ObjectId(job_id))
+        if not job or job.kind != "free_rider":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        return FreeRiderJobResponse(
+            id=job.id,
+            status=job.status,
+            result=job.result,
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at
+        )
+    except HTTPException as e:
+        raise e
+    except InvalidId:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     except Exception as e:
-        logger.error(f"Error getting free rider contributors: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        logger.error(f"Error getting free rider job: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from service.github_service import GitHubService
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from service.github_service import GitHubService, get_github_service
+from service.github_client import get_github_client
+from service.github_webhook import handle_push, verify_signature
+from service.job_queue import JobQueue, get_job_queue
+from config import env
+from typing import Literal, Optional
+import json
 
 router = APIRouter(
     prefix='/github',
@@ -8,8 +13,10 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-def get_github_service():
-    return GitHubService()
+@router.get("/quota")
+async def get_quota():
+    """Hàng đợi và quota còn lại của từng GitHub token"""
+    return get_github_client().scheduler.metrics()
 
 @router.get("/user_github")
 async def get_info_user(
@@ -17,7 +24,7 @@ async def get_info_user(
     github_service: GitHubService = Depends(get_github_service)
 ):
     try:
-        return github_service.get_user_info(username)
+        return await github_service.get_user_info(username)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) 
 
@@ -26,6 +33,7 @@ async def get_repo(
     username: str,
     repo_name: Optional[str] = None,
     type: Optional[str] = None,
+    backend: Optional[Literal["api", "git"]] = None,
     github_service: GitHubService = Depends(get_github_service)
 ):
     """Lấy thông tin về một kho lưu trữ GitHub"""
@@ -34,13 +42,13 @@ async def get_repo(
             raise HTTPException(status_code=400, detail="Missing repo_name for the requested type")
 
         if type == "commits":
-            return github_service.get_repo_commits(repo_name, username)
+            return await github_service.get_repo_commits(repo_name, username)
         elif type == "contributors":
-            return github_service.get_repo_contributors(repo_name, username)
+            return await github_service.get_repo_contributors(repo_name, username)
         elif type == "analysis":
-            return github_service.analyze_contributor_activity(repo_name, username)
+            return await github_service.analyze_contributor_activity(repo_name, username, backend)
         elif type is None:
-            return github_service.get_user_repositories(username)
+            return await github_service.get_user_repositories(username)
         else:
             raise HTTPException(status_code=400, detail="Invalid type")
     except Exception as e:
@@ -50,10 +58,34 @@ async def get_repo(
 async def get_free_rider(
     username: str,
     repo_name: str,
+    backend: Optional[Literal["api", "git"]] = None,
     github_service: GitHubService = Depends(get_github_service)
 ):
     try:
-        contributors = github_service.analyze_contributor_activity(repo_name, username)
+        contributors = await github_service.analyze_contributor_activity(repo_name, username, backend)
         return contributors
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/webhook", status_code=status.HTTP_202_ACCEPTED)
+async def github_webhook(
+    request: Request,
+    x_github_event: Optional[str] = Header(None),
+    x_hub_signature_256: Optional[str] = Header(None),
+    github_service: GitHubService = Depends(get_github_service),
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """Nhận sự kiện push từ GitHub và cập nhật số liệu contributors ở nền"""
+    body = await request.body()
+    if not verify_signature(env.GITHUB_WEBHOOK_SECRET, body, x_hub_signature_256):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
+
+    if x_github_event == "ping":
+        return {"status": "pong"}
+    if x_github_event != "push":
+        return {"status": "ignored", "reason": f"Unsupported event {x_github_event}"}
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payload")
+    return await handle_push(payload, github_service, job_queue)
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from typing import List, Any
-from models.group_model import Group
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Any, Optional
+from models.group_model import Group, MemberSummary, ProjectSummary
 from models.project_model import Project
 from models.user_model import User
 from models.task_model import Task
 from schemas.group_schemas import GroupCreate, GroupResponse, PyObjectId
 from routes.user_routes import get_current_mentor
 from routes.user_routes import get_current_user
+from service.document_loader import DocumentLoader, get_document_loader
+from service.group_aggregation import get_group_detail
+from service.group_summaries import summarize_group
+from service.pagination import paginate, set_next_cursor
 from beanie import Link
 import asyncio
 import logging
@@ -89,7 +93,10 @@ async def create_group(group: GroupCreate, current_user: User = Depends(get_curr
             leaders=Link(leader, document_class=User),
             members=members,
             tasks=[],
-            allTasks=[]
+            allTasks=[],
+            project_summary=ProjectSummary.from_project(project),
+            leader_summary=MemberSummary.from_user(leader),
+            member_summaries=[MemberSummary.from_user(member)]
         )
                 
         await new_group.insert()
@@ -105,14 +112,10 @@ async def create_group(group: GroupCreate, current_user: User = Depends(get_curr
 
         logger.info(f"Created new group: {new_group.id}")
 
-        member_data = []
-        for member_link in new_group.members:
-            member = await member_link.fetch() if isinstance(member_link, Link) else member_link
-            member_data.append({
-                "id": str(member.id),
-                "ho_ten": member.ho_ten,
-                "email": member.email
-            })
+        member_data = [
+            {"id": str(member.id), "ho_ten": member.ho_ten, "email": member.email}
+            for member in new_group.member_summaries
+        ]
 
         return GroupResponse(
             id=str(new_group.id),
@@ -145,53 +148,26 @@ async def get_group_by_group_id(group_id: str, current_user: User = Depends(get_
     
     try:
         logger.info(f"Group ID Object: {group_id_obj}")
-        # Fetch the group from the database
         group = await Group.get(group_id_obj)
-        logger.info(f"Group found: {group}")
         if not group:
             raise HTTPException(status_code=404, detail="Group not found")
 
-        # Fetch project to check mentor and get project details
-        project = await group.project.fetch() if isinstance(group.project, Link) else group.project
+        if group.has_summaries():
+            project, leader, members = group.project_summary, group.leader_summary, group.member_summaries
+        else:
+            # Groups created before summaries existed are joined server-side in a single aggregation
+            detail = await get_group_detail(group_id_obj)
+            if not detail:
+                raise HTTPException(status_code=404, detail="Group not found")
+            project, leader, members = detail["project"], detail["leader"], detail["members"]
+
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        # Check if the current user is the mentor of the project
-        # mentor = await project.mentor.fetch() if isinstance(project.mentor, Link) else project.mentor
-        # if not mentor or str(mentor.id) != str(current_user.id):
-        #     raise HTTPException(status_code=403, detail="Not authorized")
-
-        # Fetch leader
-        leader = await group.leaders.fetch() if isinstance(group.leaders, Link) else group.leaders
         if not leader:
             logger.warning(f"Failed to fetch leader for group {group.id}")
             raise HTTPException(status_code=404, detail="Leader not found")
 
-        # Fetch members
-        member_data = []
-        for member_link in group.members:
-            member = await member_link.fetch() if isinstance(member_link, Link) else member_link
-            if member:
-                member_data.append({
-                    "id": str(member.id),
-                    "ho_ten": member.ho_ten,
-                    "email": member.email
-                })
-
-        # Prepare response
-        # return GroupResponse(
-        #     id=str(group.id),
-        #     name=group.name,
-        #     project_id=str(project.id),
-        #     project_title=project.title,
-        #     project_description=project.description,
-        #     leader_id=str(leader.id),
-        #     leader_name=leader.ho_ten,
-        #     leader_email=leader.email,
-        #     member_ids=[member["id"] for member in member_data],
-        #     member_names=[member["ho_ten"] for member in member_data],
-        #     member_emails=[member["email"] for member in member_data]
-        # )
         return {
             "id": str(group.id),
             "name": group.name,
@@ -201,11 +177,13 @@ async def get_group_by_group_id(group_id: str, current_user: User = Depends(get_
             "leader_id": str(leader.id),
             "leader_name": leader.ho_ten,
             "leader_email": leader.email,
-            "member_ids": [member["id"] for member in member_data],
-            "member_names": [member["ho_ten"] for member in member_data],
-            "member_emails": [member["email"] for member in member_data],
+            "member_ids": [str(member.id) for member in members],
+            "member_names": [member.ho_ten for member in members],
+            "member_emails": [member.email for member in members],
             "github_link": group.github_link
         }
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching group {group_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -213,30 +191,31 @@ async def get_group_by_group_id(group_id: str, current_user: User = Depends(get_
 @router.get("/", response_model=List[dict],
             description="Get all groups. Only the mentor who created the project can view its groups cai dcm.",
             summary="Get all groups") 
-async def get_all_groups(current_user: User = Depends(get_current_user),
+async def get_all_groups(response: Response,
+                         current_user: User = Depends(get_current_user),
+                         loader: DocumentLoader = Depends(get_document_loader),
                          skip: int = Query(0, ge=0, description="Number of groups to skip"),
-                         limit: int = Query(50, ge=1, le=100, description="Maximum number of groups to return")):
+                         limit: int = Query(50, ge=1, le=100, description="Maximum number of groups to return"),
+                         cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page; takes precedence over skip")):
     try:
         # Fetch all groups from the database
-        groups = await Group.find().skip(skip).limit(limit).to_list()
+        groups = await paginate(Group.find(), skip, limit, cursor).to_list()
+        set_next_cursor(response, groups, limit)
+        # Only groups without embedded summaries need their links resolved,
+        # in one query per collection for the whole page
+        legacy_groups = [group for group in groups if not group.has_summaries()]
+        links = await loader.prefetch(legacy_groups, "project", "leaders", "members")
         result = []
-        print("Groups: {" , groups)
         for group in groups:
-            mentor = await group.leaders.fetch() if isinstance(group.leaders, Link) else group.leaders
-            if not mentor or str(mentor.id) != str(current_user.id):
-                pass
-                # continue  # Skip groups not associated with the current mentor
-            # Fetch project and leader and members
-            project = await group.project.fetch() if isinstance(group.project, Link) else group.project
-            leader = await group.leaders.fetch() if isinstance(group.leaders, Link) else group.leaders
-            members = []
-            for member_link in group.members:
-                member = await member_link.fetch() if isinstance(member_link, Link) else member_link
-                members.append({
+            project, leader, member_summaries = summarize_group(group, links)
+            members = [
+                {
                     "id": str(member.id),
                     "ho_ten": member.ho_ten,
                     "email": member.email
-                })
+                }
+                for member in member_summaries
+            ]
             result.append({
                 "id": str(group.id),
                 "name": group.name,
@@ -251,6 +230,8 @@ async def get_all_groups(current_user: User = Depends(get_current_user),
             })
 
         return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching all groups: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -294,6 +275,8 @@ async def add_member_to_group(group_id: str, member_id: str, current_user: User
         db_leader.group_id = Link(group, document_class=Group)
         await db_leader.save()
         group.members.append(Link(member, document_class=User))
+        if group.member_summaries is not None:
+            group.member_summaries.append(MemberSummary.from_user(member))
         await group.save()
 
         logger.info(f"Added member {member.id} to group {group.id}")
@@ -305,7 +288,8 @@ async def add_member_to_group(group_id: str, member_id: str, current_user: User
 @router.put("/{group_id}/change-leader/{new_leader_id}", response_model=dict,
              description="Change the leader of a group. Only the mentor who created the project can change the leader.",
              summary="Change group leader")
-async def change_group_leader(group_id: str, new_leader_id: str, current_user: User = Depends(get_current_mentor)):
+async def change_group_leader(group_id: str, new_leader_id: str, current_user: User = Depends(get_current_mentor),
+                              loader: DocumentLoader = Depends(get_document_loader)):
     """
     Change the leader of a group.
     """
@@ -321,12 +305,11 @@ async def change_group_leader(group_id: str, new_leader_id: str, current_user: U
         group = await Group.get(group_id_obj)
         if not group:
             raise HTTPException(status_code=404, detail="Group not found")
-        members = []
-        for member_link in group.members:
-            member = await member_link.fetch() if isinstance(member_link, Link) else member_link
-            members.append(member)
-        # Fetch the new leader from the database
-        new_leader = await User.get(new_leader_id_obj)
+        # Members and the new leader are loaded in one batched query
+        members, new_leader = await asyncio.gather(
+            loader.fetch_many(group.members),
+            loader.get(User, new_leader_id_obj)
+        )
         print(f"New leader: {new_leader}")
         if not new_leader:
             raise HTTPException(status_code=404, detail="New leader not found")
@@ -336,11 +319,12 @@ async def change_group_leader(group_id: str, new_leader_id: str, current_user: U
             raise HTTPException(status_code=400, detail="New leader must be a student")
 
         # Ensure the new leader is a member of the group
-        member_ids = [member.id for member in members]
+        member_ids = [member.id for member in members if member]
         if new_leader_id_obj not in member_ids:
             raise HTTPException(status_code=400, detail="New leader is not a member of the group")
         # Update the leader of the group
         group.leaders = Link(new_leader, document_class=User)
+        group.leader_summary = MemberSummary.from_user(new_leader)
         await group.save()
 
         logger.info(f"Changed leader of group {group.id} to {new_leader.id}")
@@ -405,7 +389,8 @@ async def change_group_leader(group_id: str, new_leader_id: str, current_user: U
 #         logger.error(f"Error removing member {member_id} from group {group_id}: {str(e)}")
 #         raise HTTPException(status_code=500, detail="Internal server error")
 @router.delete("/{group_id}/remove-member/{member_id}", response_model=dict)
-async def remove_member_from_group(group_id: str, member_id: str, current_user: User = Depends(get_current_mentor)):
+async def remove_member_from_group(group_id: str, member_id: str, current_user: User = Depends(get_current_mentor),
+                                   loader: DocumentLoader = Depends(get_document_loader)):
     """
     Remove a member from a group.
     """
@@ -422,26 +407,25 @@ async def remove_member_from_group(group_id: str, member_id: str, current_user:
         if not group:
             raise HTTPException(status_code=404, detail="Group not found")
 
-        # Fetch the member from the database
-        member = await User.get(member_id_obj)
+        # Fetch the member and all group members in one batched query
+        member, fetched_members = await asyncio.gather(
+            loader.get(User, member_id_obj),
+            loader.fetch_many(group.members)
+        )
         if not member:
             raise HTTPException(status_code=404, detail="Member not found")
 
-        # Fetch all members to compare IDs
-        fetched_members = []
-        for member_link in group.members:
-            fetched_member = await member_link.fetch() if isinstance(member_link, Link) else member_link
-            fetched_members.append(fetched_member)
-
         # Check if the member is in the group by comparing IDs
-        if not any(fetched_member.id == member_id_obj for fetched_member in fetched_members):
+        if not any(fetched_member and fetched_member.id == member_id_obj for fetched_member in fetched_members):
             raise HTTPException(status_code=400, detail="Member is not in the group")
 
         # Remove the member by filtering the original Link list
         group.members = [
-            member_link for member_link in group.members
-            if (await member_link.fetch() if isinstance(member_link, Link) else member_link).id != member_id_obj
+            member_link for member_link, fetched_member in zip(group.members, fetched_members)
+            if not fetched_member or fetched_member.id != member_id_obj
         ]
+        if group.member_summaries is not None:
+            group.member_summaries = [m for m in group.member_summaries if m.id != member_id_obj]
         await group.save()
 
         # Update the member's group_id to None
@@ -461,7 +445,8 @@ async def remove_member_from_group(group_id: str, member_id: str, current_user:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/{group_id}")
-async def delete_group(group_id: str, current_user: User = Depends(get_current_mentor)):
+async def delete_group(group_id: str, current_user: User = Depends(get_current_mentor),
+                       loader: DocumentLoader = Depends(get_document_loader)):
     try:
         group_id_obj = PyObjectId.validate(group_id)
     except ValueError:
@@ -479,11 +464,8 @@ async def delete_group(group_id: str, current_user: User = Depends(get_current_m
             await task.delete()
 
         # Remove group reference from members
-        members = []
-        for member_link in group.members:
-            member = await member_link.fetch() if isinstance(member_link, Link) else member_link
-            members.append(member)
-        for member in members:
+        members = await loader.fetch_many(group.members)
+        for member in filter(None, members):
             member.group_id = None
             await member.save()  # Removed fetch_links=False
 
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Response, status
+from service.object_storage import ObjectStorage, object_storage
+import logging
+
+# Setup logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+@router.get("/storage",
+            description="Check that object storage and its bucket are reachable. Returns 503 otherwise.",
+            summary="Object storage health check")
+async def storage_health(response: Response, storage: ObjectStorage = Depends(object_storage)):
+    health = await storage.health()
+    if health["status"] != "ok":
+        logger.warning(f"Storage health check failed: {health.get('error')}")
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return health
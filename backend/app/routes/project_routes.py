@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Optional
 from pydantic import Field
 from schemas.user_schemas import UserResponse
 from schemas.group_schemas import GroupResponse
 from schemas.project_schemas import ProjectCreate, ProjectResponse, ProjectListResponse
 from schemas.pyobjectid_schemas import PyObjectId
+from schemas.projection_schemas import GroupRefView, ProjectListView, UserRefView
 from models.project_model import Project
+from models.group_model import Group
 from models.user_model import User
 from routes.user_routes import get_current_mentor
+from service.group_summaries import sync_project_summaries, to_group_response
+from service.link_resolver import find_by_ids
+from service.pagination import paginate, set_next_cursor
 from beanie import Link
 import logging
 
@@ -89,22 +94,40 @@ async def create_project(project: ProjectCreate, current_user: User = Depends(ge
     summary="List all projects"
 )
 async def get_all_projects(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of projects to skip for pagination"),
-    limit: int = Query(50, ge=1, le=100, description="Maximum number of projects to return")
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of projects to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page; takes precedence over skip")
 ):
     """
     Retrieve a paginated list of all projects.
 
     - **skip**: Number of projects to skip (default: 0).
     - **limit**: Maximum number of projects to return (default: 50, max: 100).
+    - **cursor**: Cursor of the next page, returned in the X-Next-Cursor header (optional).
     """
     try:
-        projects = await Project.find_all().skip(skip).limit(limit).to_list()
+        # Only the fields the response needs are loaded, links are resolved in batched projected queries
+        projects = await paginate(Project.find_all(), skip, limit, cursor).project(ProjectListView).to_list()
+        set_next_cursor(response, projects, limit)
+        groups = await find_by_ids(
+            Group, {group_id for project in projects for group_id in project.group_ids}, GroupRefView
+        )
+        user_ids = {project.mentor_id for project in projects}
+        for group in groups.values():
+            if group.leader_summary is None:
+                user_ids.add(group.leader_id)
+            if group.member_summaries is None:
+                user_ids.update(group.member_ids)
+        users = await find_by_ids(User, user_ids - {None}, UserRefView)
         result = []
 
         for project in projects:
-            mentor = await fetch_mentor(project)
-            groups = await fetch_groups(project)
+            mentor = users.get(project.mentor_id)
+            group_responses = [
+                to_group_response(groups[group_id], project, users)
+                for group_id in project.group_ids if group_id in groups
+            ]
 
             result.append(ProjectListResponse(
                 _id=str(project.id),
@@ -114,10 +137,12 @@ async def get_all_projects(
                 tags=project.tags,
                 description=project.description,
                 mentor=UserResponse(**mentor.model_dump()) if mentor else None,
-                groups=[GroupResponse(**group.model_dump()) for group in groups]
+                groups=[group for group in group_responses if group]
             ))
 
         return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching all projects: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -200,6 +225,7 @@ async def update_project(project_id: str, project: ProjectCreate, current_user:
         db_project.status = "open"
         db_project.tags = project.tags
         await db_project.save()
+        await sync_project_summaries(db_project)
 
         groups = await fetch_groups(db_project)
 
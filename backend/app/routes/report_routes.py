@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import Optional
 from models.report_model import Report
 from models.task_model import Task
 from models.user_model import User
 from schemas.report_schemas import ReportCreate, ReportResponse
 from schemas.pyobjectid_schemas import PyObjectId
+from schemas.projection_schemas import ReportListView, TaskRefView
 from routes.user_routes import get_current_user
+from service.document_loader import DocumentLoader, get_document_loader
+from service.link_resolver import find_by_ids
+from service.pagination import paginate, set_next_cursor
 from beanie import Link
 import logging
 
@@ -22,10 +27,11 @@ router = APIRouter(
              description="Create a new report. Only students can create reports.",
             summary="Create a new report"
 )
-async def create_report(report: ReportCreate, current_user: User = Depends(get_current_user)):
+async def create_report(report: ReportCreate, current_user: User = Depends(get_current_user),
+                        loader: DocumentLoader = Depends(get_document_loader)):
     
 
-    task = await Task.get(report.task_id)
+    task = await loader.get(Task, report.task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")   
 
@@ -38,9 +44,9 @@ async def create_report(report: ReportCreate, current_user: User = Depends(get_c
     await new_report.insert()
     logger.info(f"Created new report: {new_report.id}")
     
-    # Fetch student and task for response
-    student = await new_report.student.fetch() if isinstance(new_report.student, Link) else new_report.student
-    task = await new_report.task.fetch() if isinstance(new_report.task, Link) else new_report.task
+    # Student and task are already loaded, the loader serves them without a query
+    student = await loader.fetch(new_report.student)
+    task = await loader.fetch(new_report.task)
     
     return ReportResponse(
         id=new_report.id,
@@ -81,14 +87,18 @@ async def get_reports(report_id: str, current_user: User = Depends(get_current_u
                      description="Get all reports. Only the admin can view all reports.",
                     summary="Get all reports"
         )
-async def get_all_reports(current_user: User = Depends(get_current_user),
+async def get_all_reports(response: Response,
+                                  current_user: User = Depends(get_current_user),
                                   skip: int=Query(0, ge=0, description="Number of reports to skip"), 
-                                  limit: int=Query(10, le=100, description="Maximum number of reports to return")):
+                                  limit: int=Query(10, le=100, description="Maximum number of reports to return"),
+                                  cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page; takes precedence over skip")):
             try:
-                reports = await Report.find_all().skip(skip).limit(limit).to_list()
+                reports = await paginate(Report.find_all(), skip, limit, cursor).project(ReportListView).to_list()
+                set_next_cursor(response, reports, limit)
+                tasks = await find_by_ids(Task, {report.task_id for report in reports if report.task_id}, TaskRefView)
                 results = []
                 for report in reports:
-                    task = await report.task.fetch() if isinstance(report.task, Link) else report.task
+                    task = tasks.get(report.task_id)
                     results.append({
                         "id": str(report.id),
                         "title": report.title,
@@ -100,6 +110,8 @@ async def get_all_reports(current_user: User = Depends(get_current_user),
                         } if task else None,
                         "created_at": report.created_at
                     })
+            except HTTPException as e:
+                raise e
             except Exception as e:
                 logger.error(f"Error fetching reports: {str(e)}")
                 raise HTTPException(status_code=500, detail="Internal server error")
@@ -109,22 +121,23 @@ async def get_all_reports(current_user: User = Depends(get_current_user),
 @router.put("/{report_id}", response_model=ReportResponse,
             description="Update a report by ID. Only the student who created the report can update it.",
             summary="Update a report by ID")
-async def update_report(report_id: str, report: ReportCreate, current_user: User = Depends(get_current_user)):
+async def update_report(report_id: str, report: ReportCreate, current_user: User = Depends(get_current_user),
+                        loader: DocumentLoader = Depends(get_document_loader)):
 
     db_report = await Report.get(report_id)
     if not db_report:
         raise HTTPException(status_code=404, detail="Report not found")
     
     # Resolve Link[User]
-    student = await db_report.student.fetch() if isinstance(db_report.student, Link) else db_report.student
-    if not student or isinstance(student, Link):
+    student = await loader.fetch(db_report.student)
+    if not student:
         logger.error(f"Failed to resolve student for report {db_report.id}")
         raise HTTPException(status_code=404, detail="Student associated with report not found")
 
     if str(student.id) != str(current_user.id):
         raise HTTPException(status_code=404, detail="Report not found")
 
-    task = await Task.get(report.task_id)
+    task = await loader.get(Task, report.task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -136,8 +149,8 @@ async def update_report(report_id: str, report: ReportCreate, current_user: User
     logger.info(f"Updated report: {db_report.id}")
     
     # Resolve Link[Task] trước khi trả về
-    task = await db_report.task.fetch() if isinstance(db_report.task, Link) else db_report.task
-    if not task or isinstance(task, Link):
+    task = await loader.fetch(db_report.task)
+    if not task:
         logger.error(f"Failed to resolve task for report {db_report.id}")
         raise HTTPException(status_code=404, detail="Task associated with report not found")
 
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import Optional
 from models.task_model import Task
 from models.group_model import Group
 from models.user_model import User
@@ -6,6 +7,8 @@ from models.project_model import Project
 from schemas.task_schemas import TaskCreate, TaskResponse
 from schemas.pyobjectid_schemas import PyObjectId
 from routes.user_routes import get_current_user
+from service.document_loader import DocumentLoader, get_document_loader
+from service.pagination import paginate, set_next_cursor
 from beanie import Link
 import asyncio
 import logging
@@ -23,21 +26,22 @@ router = APIRouter(
 @router.post("/", response_model=TaskResponse)
 async def create_task(task: TaskCreate, 
                       current_user: User = Depends(get_current_user),
+                      loader: DocumentLoader = Depends(get_document_loader),
                       description: str = "Create a new task. Only mentors can create tasks.",
                       summary: str = "Create a new task"):
     try:
-        group = await Group.get(task.group_id)
+        group = await loader.get(Group, task.group_id)
         if not group:
             raise HTTPException(status_code=404, detail="Group not found")
         
-        project = await group.project.fetch()
+        project = await loader.fetch(group.project)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
         # Validate and get assigned students
         assigned_students = []
-        for student_id in task.assigned_student_ids:
-            student = await User.get(PyObjectId(student_id))
+        students = await loader.get_many(User, [PyObjectId.validate(i) for i in task.assigned_student_ids])
+        for student_id, student in zip(task.assigned_student_ids, students):
             if not student or student.role != "student":
                 raise HTTPException(status_code=404, detail=f"Student {student_id} not found")
             assigned_students.append(Link(student, document_class=User))
@@ -62,8 +66,7 @@ async def create_task(task: TaskCreate,
         
         # Prepare response data
         students_data = []
-        for student_link in new_task.assigned_students:
-            student = await student_link.fetch() if isinstance(student_link, Link) else student_link
+        for student in await loader.fetch_many(new_task.assigned_students):
             students_data.append({
                 "id": str(student.id),
                 "name": student.ho_ten,
@@ -91,45 +94,52 @@ async def create_task(task: TaskCreate,
 @router.get("/", response_model=list[TaskResponse],
             description="Get all tasks. Only mentors can view tasks.",
             summary="Get all tasks")
-async def get_all_tasks(current_user: User = Depends(get_current_user),
+async def get_all_tasks(response: Response,
+                        current_user: User = Depends(get_current_user),
+                        loader: DocumentLoader = Depends(get_document_loader),
                         skip: int = Query(0, ge=0, description="Number of tasks to skip"),
-                        limit: int = Query(50, ge=1, le=100, description="Maximum number of tasks to return")):
+                        limit: int = Query(50, ge=1, le=100, description="Maximum number of tasks to return"),
+                        cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page; takes precedence over skip")):
     try:
-        tasks = await Task.find_all().skip(skip).limit(limit).to_list()
+        tasks = await paginate(Task.find_all(), skip, limit, cursor).to_list()
+        set_next_cursor(response, tasks, limit)
+        # Groups and students of the whole page are resolved with one $in query per collection
+        await loader.prefetch(tasks, "group", "assigned_students")
         result = []
         for task in tasks:
-           group = await task.group.fetch() if isinstance(task.group, Link) else task.group
-           assigned_students = []
-           for student_link in task.assigned_students:
-                student = await student_link.fetch() if isinstance(student_link, Link) else student_link
+            group = loader.resolve(task.group)
+            assigned_students = []
+            for student in loader.resolve_list(task.assigned_students):
                 assigned_students.append({
                     "id": str(student.id),
                     "ho_ten": student.ho_ten,
                     "email": student.email
-         })
-           result.append(TaskResponse(
-               _id=task.id,
+                })
+            result.append(TaskResponse(
+                _id=task.id,
                 id=str(task.id),
-               title=task.title,
-               description=task.description,
-               group_id=str(group.id),
-               group_name=group.name,
-               assigned_students=assigned_students,
-               status=task.status,
-               deadline=task.deadline,
-               priority=task.priority,
-               created_at=task.created_at,
-            
-           ))
+                title=task.title,
+                description=task.description,
+                group_id=str(group.id),
+                group_name=group.name,
+                assigned_students=assigned_students,
+                status=task.status,
+                deadline=task.deadline,
+                priority=task.priority,
+                created_at=task.created_at,
+            ))
         return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
-       logger.error(f"Error fetching all tasks: {str(e)}")
-       raise HTTPException(status_code=500, detail="Internal server error")
+        logger.error(f"Error fetching all tasks: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/{task_id}", response_model=TaskResponse,
             description="Get a task by ID. Only mentors can view tasks.",
             summary="Get a task by ID")
-async def get_task(task_id: str, current_user: User = Depends(get_current_user)):
+async def get_task(task_id: str, current_user: User = Depends(get_current_user),
+                   loader: DocumentLoader = Depends(get_document_loader)):
     try:
         task_id_obj = PyObjectId.validate(task_id)
     except ValueError:
@@ -139,10 +149,12 @@ async def get_task(task_id: str, current_user: User = Depends(get_current_user))
         task = await Task.get(task_id_obj)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
-        group = await task.group.fetch() if isinstance(task.group, Link) else task.group
+        group, students = await asyncio.gather(
+            loader.fetch(task.group),
+            loader.fetch_many(task.assigned_students)
+        )
         assigned_students = []
-        for student_link in task.assigned_students:
-            student = await student_link.fetch() if isinstance(student_link, Link) else student_link
+        for student in students:
             assigned_students.append({
                 "id": str(student.id),
                 "name": student.ho_ten,
@@ -172,7 +184,8 @@ async def get_task(task_id: str, current_user: User = Depends(get_current_user))
 @router.put("/{task_id}", response_model=TaskResponse,
             description="Update a task by ID. Only mentors can update tasks.",
             summary="Update a task by ID")
-async def update_task(task_id: str, task: TaskCreate, current_user: User = Depends(get_current_user)):
+async def update_task(task_id: str, task: TaskCreate, current_user: User = Depends(get_current_user),
+                      loader: DocumentLoader = Depends(get_document_loader)):
     try:
         # Lấy task từ database
         db_task = await Task.get(task_id)
@@ -180,29 +193,19 @@ async def update_task(task_id: str, task: TaskCreate, current_user: User = Depen
             raise HTTPException(status_code=404, detail="Task not found")
 
         # Lấy group liên quan
-        group = await Group.get(task.group_id)
+        group = await loader.get(Group, task.group_id)
         if not group:
             raise HTTPException(status_code=404, detail="Group not found")
 
         # Lấy project liên quan
-        project = await group.project.fetch()
+        project = await loader.fetch(group.project)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        # Lấy danh sách students cũ
-        old_students = []
-        if db_task.assigned_students:
-            for student_ref in db_task.assigned_students:
-                if isinstance(student_ref, Link):
-                    student = await student_ref.fetch()
-                else:
-                    student = student_ref
-                old_students.append(student)
-
         # Thêm task vào sinh viên mới
         assigned_students = []
-        for student_id in task.assigned_student_ids:
-            student = await User.get(student_id)
+        students = await loader.get_many(User, [PyObjectId.validate(i) for i in task.assigned_student_ids])
+        for student_id, student in zip(task.assigned_student_ids, students):
             if not student or student.role != "student":
                 raise HTTPException(status_code=404, detail=f"Student {student_id} not found")
             assigned_students.append(Link(student, document_class=User))
@@ -220,11 +223,7 @@ async def update_task(task_id: str, task: TaskCreate, current_user: User = Depen
 
         # Chuyển đổi dữ liệu để trả về
         students_data = []
-        for student_ref in db_task.assigned_students:
-            if isinstance(student_ref, Link):
-                student = await student_ref.fetch()
-            else:
-                student = student_ref
+        for student in await loader.fetch_many(db_task.assigned_students):
             students_data.append({
                 "id": str(student.id),
                 "name": student.ho_ten,
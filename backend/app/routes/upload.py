@@ -1,7 +1,18 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Path
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Path, Request
 from fastapi.responses import StreamingResponse
-from minio import Minio
-import io
+from starlette.background import BackgroundTask
+from minio.error import S3Error
+from pymongo import ReturnDocument
+from datetime import datetime, timedelta
+from config import env
+from models.task_file import TaskFile
+from models.task_model import Task
+from models.user_model import User
+from outh2 import get_current_user
+from schemas.pyobjectid_schemas import PyObjectId
+from schemas.upload_schemas import PresignedUploadRequest, PresignedUrlResponse, TaskFileResponse, UploadCompleteRequest
+from service.byte_ranges import RangeNotSatisfiable, http_date, if_range_matches, parse_range
+from service.object_storage import ObjectStorage, get_object_storage
 import logging
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -13,31 +24,25 @@ router = APIRouter(
     responses={404: {"description": "Not found"}} 
 )
 
-minio_client = Minio(
-    "localhost:9000",
-    access_key="minioadmin",
-    secret_key="minioadmin",
-    secure=False
-)
-
-BUCKET_NAME = "documents"
-
-if not minio_client.bucket_exists(BUCKET_NAME):
-    minio_client.make_bucket(BUCKET_NAME)
+# Downloads are relayed from MinIO to the client in chunks of this size
+CHUNK_SIZE = 1024 * 1024
 
 
 @router.post("/tasks/{task_id}/upload-file/")
-async def upload_file(task_id: str = Path(...), file: UploadFile = File(...)):
+async def upload_file(task_id: str = Path(...), file: UploadFile = File(...),
+                      storage: ObjectStorage = Depends(get_object_storage)):
     try:
-        contents = await file.read()
         object_name = f"{task_id}/{file.filename}"
 
-        minio_client.put_object(
-            BUCKET_NAME,
+        # Stream the spooled file to MinIO part by part (multipart upload above
+        # one part) instead of reading it into memory
+        await storage.put(
             object_name,
-            data=io.BytesIO(contents),
-            length=len(contents),
-            content_type=file.content_type
+            file.file,
+            length=file.size if file.size is not None else -1,
+            content_type=file.content_type or "application/octet-stream",
+            part_size=env.UPLOAD_PART_SIZE,
+            parallel_parts=env.UPLOAD_PARALLEL_PARTS
         )
         return {"message": f"File '{file.filename}' uploaded to task '{task_id}' successfully."}
     except Exception as e:
@@ -45,9 +50,9 @@ async def upload_file(task_id: str = Path(...), file: UploadFile = File(...)):
 
 
 @router.get("/tasks/{task_id}/list-files/")
-def list_files(task_id: str = Path(...)):
+async def list_files(task_id: str = Path(...), storage: ObjectStorage = Depends(get_object_storage)):
     try:
-        objects = minio_client.list_objects(BUCKET_NAME, prefix=f"{task_id}/")
+        objects = await storage.list(f"{task_id}/")
         file_list = [
             {
                 "filename": obj.object_name[len(task_id)+1:],
@@ -60,18 +65,149 @@ def list_files(task_id: str = Path(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/tasks/{task_id}/download-file/{filename}")
-def download_file(task_id: str = Path(...), filename: str = Path(...)):
+async def download_file(request: Request, task_id: str = Path(...), filename: str = Path(...),
+                        storage: ObjectStorage = Depends(get_object_storage)):
     object_name = f"{task_id}/{filename}"
     try:
-        response = minio_client.get_object(BUCKET_NAME, object_name)
-        file_data = response.read()
-        response.close()
-        response.release_conn()
-
-        return StreamingResponse(
-            io.BytesIO(file_data),
-            media_type="routerlication/octet-stream",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        stat = await storage.stat(object_name)
+    except S3Error as e:
+        if e.code in ("NoSuchKey", "NoSuchBucket"):
+            raise HTTPException(status_code=404, detail="File not found")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{stat.etag}"',
+        "Last-Modified": http_date(stat.last_modified),
+    }
+    # A stale If-Range validator means the client's partial copy is outdated: send the whole file
+    byte_range = None
+    if if_range_matches(request.headers.get("if-range"), stat.etag, stat.last_modified):
+        try:
+            byte_range = parse_range(request.headers.get("range"), stat.size)
+        except RangeNotSatisfiable:
+            raise HTTPException(status_code=416, detail="Range not satisfiable",
+                                headers={"Content-Range": f"bytes */{stat.size}"})
+
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+    else:
+        start, end = 0, stat.size - 1
+        status_code = 200
+    headers["Content-Length"] = str(end - start + 1)
+
+    try:
+        stream = await storage.open(object_name, offset=start, length=end - start + 1)
+    except S3Error as e:
+        raise HTTPException(status_code=404 if e.code == "NoSuchKey" else 500, detail=str(e))
+
+    # The background task runs once the body is sent or the client disconnected
+    return StreamingResponse(
+        stream.chunks(CHUNK_SIZE),
+        status_code=status_code,
+        media_type=stat.content_type or "application/octet-stream",
+        headers=headers,
+        background=BackgroundTask(stream.close)
+    )
+
+
+# Presigned flow: the browser sends and fetches the bytes straight to and from
+# MinIO, the API only signs URLs and records the completed uploads
+
+def task_object_name(task_id: str, filename: str) -> str:
+    if not filename or "/" in filename or "\\" in filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    return f"{task_id}/{filename}"
+
+
+async def get_task_or_404(task_id: str) -> Task:
+    try:
+        task = await Task.get(PyObjectId.validate(task_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid task_id format")
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+@router.post("/tasks/{task_id}/presigned-upload", response_model=PresignedUrlResponse)
+async def presign_upload(body: PresignedUploadRequest, task_id: str = Path(...),
+                         current_user: User = Depends(get_current_user),
+                         storage: ObjectStorage = Depends(get_object_storage)):
+    """Cấp URL để trình duyệt PUT file trực tiếp lên MinIO, sau đó gọi upload-complete"""
+    object_name = task_object_name(task_id, body.filename)
+    await get_task_or_404(task_id)
+    try:
+        url = await storage.presigned_put(object_name, timedelta(seconds=env.PRESIGNED_URL_EXPIRY))
+        return PresignedUrlResponse(url=url, method="PUT", object_name=object_name, expires_in=env.PRESIGNED_URL_EXPIRY)
+    except Exception as e:
+        logger.error(f"Error presigning upload of {object_name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tasks/{task_id}/presigned-download/{filename}", response_model=PresignedUrlResponse)
+async def presign_download(task_id: str = Path(...), filename: str = Path(...),
+                           current_user: User = Depends(get_current_user),
+                           storage: ObjectStorage = Depends(get_object_storage)):
+    """Cấp URL để trình duyệt tải file trực tiếp từ MinIO"""
+    object_name = task_object_name(task_id, filename)
+    try:
+        await storage.stat(object_name)
+        url = await storage.presigned_get(object_name, timedelta(seconds=env.PRESIGNED_URL_EXPIRY), filename)
+        return PresignedUrlResponse(url=url, method="GET", object_name=object_name, expires_in=env.PRESIGNED_URL_EXPIRY)
+    except S3Error as e:
+        if e.code == "NoSuchKey":
+            raise HTTPException(status_code=404, detail="File not found")
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error presigning download of {object_name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/tasks/{task_id}/upload-complete", response_model=TaskFileResponse)
+async def complete_upload(body: UploadCompleteRequest, task_id: str = Path(...),
+                          current_user: User = Depends(get_current_user),
+                          storage: ObjectStorage = Depends(get_object_storage)):
+    """Ghi metadata của file vừa upload qua URL presigned; size/etag lấy từ MinIO, không tin client"""
+    object_name = task_object_name(task_id, body.filename)
+    task = await get_task_or_404(task_id)
+    try:
+        stat = await storage.stat(object_name)
+    except S3Error as e:
+        if e.code == "NoSuchKey":
+            raise HTTPException(status_code=404, detail="Upload not found in storage")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        document = await TaskFile.get_motor_collection().find_one_and_update(
+            {"object_name": object_name},
+            {"$set": {
+                "task": task.id,
+                "filename": body.filename,
+                "size": stat.size,
+                "content_type": stat.content_type,
+                "etag": stat.etag,
+                "uploaded_by": current_user.id,
+                "uploaded_at": datetime.utcnow(),
+            }},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        task_file = TaskFile.model_validate(document)
+        logger.info(f"Recorded upload {object_name} ({task_file.size} bytes)")
+        return TaskFileResponse(
+            id=task_file.id,
+            task_id=str(task_file.task),
+            filename=task_file.filename,
+            object_name=task_file.object_name,
+            size=task_file.size,
+            content_type=task_file.content_type,
+            etag=task_file.etag,
+            uploaded_at=task_file.uploaded_at
         )
     except Exception as e:
-        raise HTTPException(status_code=404, detail="File not found")
+        logger.error(f"Error recording upload of {object_name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
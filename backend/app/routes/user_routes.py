@@ -6,7 +6,11 @@ from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from models.user_model import User
 from outh2 import get_current_user, get_password_hash, verify_password
 from token_handler import create_access_token
-from schemas.user_schemas import UserCreate, Token, UserResponse
+from schemas.user_schemas import UserCreate, UserUpdate, Token, UserResponse
+from schemas.projection_schemas import UserListView
+from schemas.pyobjectid_schemas import PyObjectId
+from service.group_summaries import sync_user_summaries
+from service.link_resolver import link_match
 from config import env
 
 # Create router
@@ -81,7 +85,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     return {"access_token": access_token, "token_type": "bearer"}
 @router.get('/get-all')
 async def get_all_users(current_user: User = Depends(get_current_user)):
-    users = await User.find({"role": "student"}).to_list()
+    users = await User.find({"role": "student"}).project(UserListView).to_list()
 
     return [
         {
@@ -89,7 +93,7 @@ async def get_all_users(current_user: User = Depends(get_current_user)):
             "ho_ten": user.ho_ten,
             "email": user.email,
             "role": user.role,
-            "group_id": user.group_id,
+            "group_id": {"_id": str(user.group_id["_id"])} if user.group_id else None,
         }
         for user in users
     ]
@@ -97,6 +101,19 @@ async def get_all_users(current_user: User = Depends(get_current_user)):
 async def get_datail_user(current_user: User = Depends(get_current_user)):
     return current_user
 
+@router.put('/me', response_model=UserResponse)
+async def update_current_user(user: UserUpdate, current_user: User = Depends(get_current_user)):
+    # Null fields are left unchanged, HoDem and Ten are required on the user
+    update_data = user.model_dump(exclude_none=True)
+    for field, value in update_data.items():
+        setattr(current_user, field, value)
+    current_user.ho_ten = f"{current_user.HoDem} {current_user.Ten}"
+    await current_user.save()
+
+    # Keep the member summaries embedded in groups in sync with the profile
+    await sync_user_summaries(current_user)
+    return current_user
+
 @router.get('/search')
 async def search_users(
     search: Optional[str] = Query(None, description="Search by name or email"),
@@ -120,9 +137,13 @@ async def search_users(
 #tìm kiếm sinh viên theo nhóm
 @router.get('/students-by-group/{group_id}')
 async def get_students_by_group(group_id: str = Path(..., description="Group ID")):
+    try:
+        group_id_obj = PyObjectId.validate(group_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid group_id format")
     students = await User.find({
         "role": "student",
-        "group_id": group_id
+        **link_match("group_id", group_id_obj)
     }).to_list()
     return [
         {
@@ -22,4 +22,12 @@ class EvaluationResponse(BaseModel):
     created_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class StudentEvaluationSummary(BaseModel):
+    student: Dict[str, str]    # Dictionary chứa thông tin student
+    avg: float
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    stddev: Optional[float] = None
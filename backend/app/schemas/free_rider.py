@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from bson import ObjectId
@@ -14,9 +15,33 @@ class FreeRiderResponse(BaseModel):
     lines_added: int
     lines_removed: int
     files_modified: int
-    last_commit_date: str
+    last_commit_date: Optional[str] = None
     message: Optional[str] = None
 
     class Config:
       arbitrary_types_allowed = True
-      json_encoders = {ObjectId: str}
\ No newline at end of file
+      json_encoders = {ObjectId: str}
+class FreeRiderJobResponse(BaseModel):
+    id: PyObjectId
+    status: str
+    result: Optional[List[FreeRiderResponse]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class FreeRiderRankingRow(BaseModel):
+    rank: int
+    group_id: str
+    group_name: str
+    user: UserResponse
+    score: float
+    is_free_rider: bool
+    avg_score: float
+    evaluation_count: int
+    loc: int
+    commit_count: int
+    lines_added: int
+    lines_removed: int
+    files_modified: int
+    last_commit_date: Optional[str] = None
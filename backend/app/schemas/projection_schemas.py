@@ -0,0 +1,140 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from beanie import PydanticObjectId
+from pydantic import BaseModel, Field
+from models.group_model import MemberSummary
+
+
+def ref_id(path: str) -> Dict[str, Any]:
+    """Expression for the id of a stored link.
+
+    Links are stored either as a DBRef (``{"$ref", "$id"}``) or, when built
+    from an in-memory document, as an embedded copy with its own ``_id``.
+    """
+    return {
+        "$ifNull": [
+            {"$getField": {"field": {"$literal": "$id"}, "input": path}},
+            f"{path}._id",
+        ]
+    }
+
+
+def ref_ids(path: str) -> Dict[str, Any]:
+    """Expression for the ids of a stored list of links."""
+    return {"$map": {"input": {"$ifNull": [path, []]}, "as": "ref", "in": ref_id("$$ref")}}
+
+
+# Projection models for list endpoints: Mongo only ships the fields below,
+# links are reduced to their ids and resolved with batched projected queries.
+
+class UserListView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    ho_ten: Optional[str] = None
+    email: str
+    role: str
+    group_id: Optional[Dict[str, PydanticObjectId]] = None
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "ho_ten": 1,
+            "email": 1,
+            "role": 1,
+            # Keep the {"_id": ...} shape clients already read
+            "group_id": {
+                "$cond": [{"$ifNull": ["$group_id", False]}, {"_id": ref_id("$group_id")}, None]
+            },
+        }
+
+
+class UserRefView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    ho_ten: Optional[str] = None
+    email: str
+    role: str
+
+
+class ProjectRefView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    description: Optional[str] = None
+
+
+class TaskRefView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    deadline: Optional[datetime] = None
+
+
+class GroupRefView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    leader_id: Optional[PydanticObjectId] = None
+    member_ids: List[PydanticObjectId] = []
+    leader_summary: Optional[MemberSummary] = None
+    member_summaries: Optional[List[MemberSummary]] = None
+    created_at: Optional[datetime] = None
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "name": 1,
+            "created_at": 1,
+            "leader_summary": 1,
+            "member_summaries": 1,
+            "leader_id": ref_id("$leaders"),
+            "member_ids": ref_ids("$members"),
+        }
+
+
+class ReportListView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    title: Optional[str] = None
+    content: str
+    task_id: Optional[PydanticObjectId] = None
+    created_at: datetime
+
+    class Settings:
+        projection = {"_id": 1, "title": 1, "content": 1, "created_at": 1, "task_id": ref_id("$task")}
+
+
+class EvaluationListView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    evaluator_id: Optional[PydanticObjectId] = None
+    student_id: Optional[PydanticObjectId] = None
+    project_id: Optional[PydanticObjectId] = None
+    score: Optional[float] = None
+    comment: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "score": 1,
+            "comment": 1,
+            "created_at": 1,
+            "evaluator_id": ref_id("$evaluator"),
+            "student_id": ref_id("$student"),
+            "project_id": ref_id("$project"),
+        }
+
+
+class ProjectListView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    description: Optional[str] = None
+    status: Optional[str] = None
+    tags: Optional[List[str]] = None
+    mentor_id: Optional[PydanticObjectId] = None
+    group_ids: List[PydanticObjectId] = []
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "title": 1,
+            "description": 1,
+            "status": 1,
+            "tags": 1,
+            "mentor_id": ref_id("$mentor"),
+            "group_ids": ref_ids("$groups"),
+        }
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from schemas.pyobjectid_schemas import PyObjectId
+
+
+class PresignedUploadRequest(BaseModel):
+    filename: str
+
+class UploadCompleteRequest(BaseModel):
+    filename: str
+
+class PresignedUrlResponse(BaseModel):
+    url: str
+    method: str
+    object_name: str
+    expires_in: int
+
+class TaskFileResponse(BaseModel):
+    id: PyObjectId
+    task_id: str
+    filename: str
+    object_name: str
+    size: int
+    content_type: Optional[str] = None
+    etag: str
+    uploaded_at: datetime
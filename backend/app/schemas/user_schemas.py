@@ -13,6 +13,11 @@ class UserCreate(BaseModel):
   class Config:
     from_attributes = True
   
+class UserUpdate(BaseModel):
+  HoDem: Optional[str] = None
+  Ten: Optional[str] = None
+  github_user: Optional[str] = None
+
 class UserLogin(BaseModel):
   email: EmailStr
   password: str
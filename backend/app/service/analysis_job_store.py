@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from models.analysis_job import AnalysisJob
+
+UNFINISHED: List[str] = ["queued", "running"]
+
+
+class AnalysisJobStore:
+    """Persists analysis jobs and their results in Mongo."""
+
+    async def create(self, job_id: ObjectId, kind: str, key: str, params: Dict[str, Any],
+                     owner: str, lease_expires_at: datetime) -> AnalysisJob:
+        job = AnalysisJob(id=job_id, kind=kind, key=key, params=params, owner=owner, lease_expires_at=lease_expires_at)
+        await job.insert()
+        return job
+
+    async def update(self, job_id: ObjectId, **fields):
+        await AnalysisJob.find_one({"_id": job_id}).update({"$set": fields})
+
+    async def get(self, job_id: ObjectId) -> Optional[AnalysisJob]:
+        return await AnalysisJob.get(job_id)
+
+    async def renew_leases(self, owner: str, lease_expires_at: datetime):
+        await AnalysisJob.find({"owner": owner, "status": {"$in": UNFINISHED}}).update(
+            {"$set": {"lease_expires_at": lease_expires_at}}
+        )
+
+    async def fail_expired(self, now: datetime):
+        """Unfinished jobs whose process stopped renewing their lease will never finish."""
+        await AnalysisJob.find({
+            "status": {"$in": UNFINISHED},
+            # Jobs created before leases were recorded have none
+            "$or": [{"lease_expires_at": {"$lt": now}}, {"lease_expires_at": None}],
+        }).update(
+            {"$set": {"status": "failed", "error": "Interrupted by a server restart", "finished_at": now}}
+        )
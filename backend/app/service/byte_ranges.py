@@ -0,0 +1,59 @@
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` of a single ``Range: bytes=...`` request, or None to send the whole body.
+
+    Multiple ranges and other units are answered with the whole body, which
+    HTTP allows. Raises ``RangeNotSatisfiable`` when the range starts past
+    the end of the body.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if last and end < start:
+                return None
+        else:
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix == 0:
+                raise RangeNotSatisfiable()
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def if_range_matches(header: Optional[str], etag: str, last_modified: datetime) -> bool:
+    """Whether the ``If-Range`` validator still identifies the stored object (True without the header)."""
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith(('"', "W/")):
+        # Only strong ETags may validate a range
+        return header.strip('"') == etag.strip('"') and not header.startswith("W/")
+    try:
+        return parsedate_to_datetime(header) == last_modified.replace(microsecond=0)
+    except (TypeError, ValueError):
+        return False
+
+
+def http_date(date: datetime) -> str:
+    return format_datetime(date, usegmt=True)
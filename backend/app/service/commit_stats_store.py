@@ -0,0 +1,30 @@
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+from models.commit_stats import CommitStats
+
+
+class CommitStatsStore:
+    """Persistent commit stats keyed by ``(repo, sha)``."""
+
+    async def get_many(self, repo: str, shas: List[str]) -> Dict[str, Dict[str, int]]:
+        if not shas:
+            return {}
+        documents = await CommitStats.find({"repo": repo.lower(), "sha": {"$in": shas}}).to_list()
+        return {
+            document.sha: {"additions": document.additions, "deletions": document.deletions, "files": document.files}
+            for document in documents
+        }
+
+    async def save_many(self, repo: str, stats: Dict[str, Dict[str, int]]):
+        if not stats:
+            return
+        repo = repo.lower()
+        await CommitStats.get_motor_collection().bulk_write(
+            [
+                UpdateOne({"repo": repo, "sha": sha}, {"$setOnInsert": commit_stats}, upsert=True)
+                for sha, commit_stats in stats.items()
+            ],
+            ordered=False
+        )
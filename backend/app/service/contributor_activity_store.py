@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from models.contributor_activity import ContributorActivity
+from models.repo_sync import RepoSync
+
+
+def as_utc(date: Optional[datetime]) -> Optional[datetime]:
+    # Mongo returns naive UTC datetimes
+    return date.replace(tzinfo=timezone.utc) if date else None
+
+
+class ContributorActivityStore:
+    """Per-repository sync cursor and per-contributor aggregates."""
+
+    async def get_cursor(self, repo: str) -> Optional[Dict[str, Any]]:
+        sync = await RepoSync.find_one({"repo": repo.lower()})
+        if not sync:
+            return None
+        return {"date": as_utc(sync.last_commit_date), "shas": sync.last_commit_shas}
+
+    async def apply(self, repo: str, aggregates: Dict[str, Dict[str, Any]], cursor: Dict[str, Any],
+                    previous: Optional[Dict[str, Any]]) -> bool:
+        """Move the cursor from ``previous`` to ``cursor``, then add the aggregates of the commits in between.
+
+        The cursor moves first, as a compare-and-set on ``previous``: a sync
+        that lost the race to another process, or whose repository was reset
+        meanwhile, applies nothing and gets False, so no commit is counted
+        twice. A crash between the two writes loses the commits of that sync
+        instead, until the repository is reset.
+        """
+        repo = repo.lower()
+        if not await self.move_cursor(repo, previous, cursor):
+            return False
+
+        operations = []
+        for aggregate in aggregates.values():
+            update = {
+                "$inc": {
+                    "commit_count": aggregate["commit_count"],
+                    "lines_added": aggregate["lines_added"],
+                    "lines_removed": aggregate["lines_removed"],
+                    "files_modified": aggregate["files_modified"],
+                },
+                # New commits are listed first, as GitHub lists them
+                "$push": {"messages": {"$each": aggregate["messages"], "$position": 0}},
+            }
+            if aggregate["last_commit_date"]:
+                update["$max"] = {"last_commit_date": datetime.fromisoformat(aggregate["last_commit_date"])}
+            operations.append(UpdateOne({"repo": repo, "contributor": aggregate["contributor"]}, update, upsert=True))
+
+        if operations:
+            await ContributorActivity.get_motor_collection().bulk_write(operations, ordered=False)
+        return True
+
+    async def move_cursor(self, repo: str, previous: Optional[Dict[str, Any]], cursor: Dict[str, Any]) -> bool:
+        """Set the cursor of ``repo`` if it still is ``previous`` (None: not synced yet)."""
+        collection = RepoSync.get_motor_collection()
+        fields = {"last_commit_date": cursor["date"], "last_commit_shas": cursor["shas"], "synced_at": datetime.now()}
+        if previous is None:
+            try:
+                # The unique index on repo fails the insert if another sync got there first
+                await collection.insert_one({"repo": repo, **fields})
+            except DuplicateKeyError:
+                return False
+            return True
+        result = await collection.update_one(
+            {"repo": repo, "last_commit_date": previous["date"], "last_commit_shas": previous["shas"]},
+            {"$set": fields}
+        )
+        return result.matched_count == 1
+
+    async def get_contributors(self, repo: str) -> List[Dict[str, Any]]:
+        """Contributors of a repository, most recently active first."""
+        activities = await ContributorActivity.find(
+            {"repo": repo.lower(), "messages": {"$ne": []}}
+        ).sort("-last_commit_date").to_list()
+        return [
+            {
+                "contributor": activity.contributor,
+                "messages": activity.messages,
+                "commit_count": activity.commit_count,
+                "lines_added": activity.lines_added,
+                "lines_removed": activity.lines_removed,
+                "files_modified": activity.files_modified,
+                "last_commit_date": as_utc(activity.last_commit_date).isoformat() if activity.last_commit_date else None
+            }
+            for activity in activities
+        ]
+
+    async def reset(self, repo: str):
+        """Forget the aggregates and cursor of a repository; the next sync starts over.
+
+        The cursor goes first, so that syncs started from it apply nothing.
+        """
+        repo = repo.lower()
+        await RepoSync.find({"repo": repo}).delete()
+        await ContributorActivity.find({"repo": repo}).delete()
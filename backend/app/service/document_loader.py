@@ -0,0 +1,79 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Type
+
+from beanie import Document, Link
+from bson import ObjectId
+
+from service.link_resolver import LinkResolver
+
+
+class DocumentLoader(LinkResolver):
+    """Request-scoped loader with an identity map for Beanie documents.
+
+    Loads requested in the same event loop tick are coalesced into one
+    ``$in`` query per collection, and every document (or miss) is cached for
+    the lifetime of the loader, so repeated fetches of the same id are free.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._futures: Dict[Type[Document], Dict[Any, asyncio.Future]] = defaultdict(dict)
+        self._queue: Dict[Type[Document], Set[Any]] = defaultdict(set)
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def get(self, document_class: Type[Document], document_id: Any) -> Optional[Document]:
+        """Load one document by id, batching with other loads issued concurrently."""
+        if isinstance(document_id, str):
+            document_id = ObjectId(document_id)
+        cached = self._documents[document_class]
+        if document_id in cached:
+            return cached[document_id]
+
+        # Ids already queued or in flight share the same future
+        futures = self._futures[document_class]
+        if document_id not in futures:
+            loop = asyncio.get_running_loop()
+            futures[document_id] = loop.create_future()
+            self._queue[document_class].add(document_id)
+            if self._flush_task is None:
+                self._flush_task = loop.create_task(self._flush())
+        # Shielded so one cancelled caller does not cancel the load for the others
+        return await asyncio.shield(futures[document_id])
+
+    async def get_many(self, document_class: Type[Document], document_ids: List[Any]) -> List[Optional[Document]]:
+        return list(await asyncio.gather(*[self.get(document_class, i) for i in document_ids]))
+
+    async def fetch(self, value: Any) -> Optional[Document]:
+        """Drop-in replacement for ``link.fetch()`` that also accepts resolved documents."""
+        if isinstance(value, Link) and not isinstance(value.ref, Document):
+            return await self.get(value.document_class, value.ref.id)
+        return self.resolve(value)
+
+    async def fetch_many(self, values: Optional[List[Any]]) -> List[Optional[Document]]:
+        """Fetch a list of links in one batch, keeping positions (missing targets are None)."""
+        return list(await asyncio.gather(*[self.fetch(value) for value in values or []]))
+
+    async def _flush(self):
+        # Yield once so loads issued from nested gathers in this tick join the batch
+        await asyncio.sleep(0)
+        queue, self._queue = self._queue, defaultdict(set)
+        self._flush_task = None
+        await asyncio.gather(*[
+            self._settle(document_class, ids) for document_class, ids in queue.items()
+        ])
+
+    async def _settle(self, document_class: Type[Document], ids: Set[Any]):
+        futures = self._futures[document_class]
+        try:
+            await self._load(document_class, ids)
+        except Exception as e:
+            for document_id in ids:
+                futures.pop(document_id).set_exception(e)
+            return
+        for document_id in ids:
+            futures.pop(document_id).set_result(self._documents[document_class].get(document_id))
+
+def get_document_loader() -> DocumentLoader:
+    """FastAPI dependency; FastAPI caches it per request, so all handlers share one identity map."""
+    return DocumentLoader()
@@ -0,0 +1,180 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from models.evaluation_aggregate import EvaluationAggregate, EvaluationAggregateBuild
+from models.evaluation_model import Evaluation
+from schemas.projection_schemas import ref_id
+from service.evaluation_stats import TOTALS, summarize
+from service.link_resolver import link_match
+
+# Totals that can be retracted; min_score/max_score have to be recomputed
+COUNTERS = ("evaluation_count", "scored_count", "score_sum", "score_sumsq")
+BOUNDS = ("min_score", "max_score")
+
+
+class EvaluationAggregateStore:
+    """Per-``(project, student)`` score totals, updated as evaluations are created, changed and deleted.
+
+    Reads are a lookup of the stored totals instead of a pass over the
+    evaluations. ``min``/``max`` cannot be retracted, so removing the score
+    that holds either one recomputes them from the pair's evaluations.
+
+    An evaluation and its totals are written separately, so a process
+    stopping between the two, or a pair recomputed between them, leaves the
+    totals off by that evaluation. ``reconcile`` and ``rebuild`` repair them.
+    """
+
+    async def add(self, project_id: ObjectId, student_id: ObjectId, score: Optional[float]):
+        update: Dict[str, Any] = {"$inc": {"evaluation_count": 1}}
+        if score is not None:
+            update["$inc"].update({"scored_count": 1, "score_sum": score, "score_sumsq": score * score})
+            update["$min"] = {"min_score": score}
+            update["$max"] = {"max_score": score}
+        await EvaluationAggregate.get_motor_collection().update_one(
+            {"project": project_id, "student": student_id}, update, upsert=True
+        )
+
+    async def remove(self, project_id: ObjectId, student_id: ObjectId, score: Optional[float]):
+        update: Dict[str, Any] = {"$inc": {"evaluation_count": -1}}
+        if score is not None:
+            update["$inc"].update({"scored_count": -1, "score_sum": -score, "score_sumsq": -score * score})
+        totals = await EvaluationAggregate.get_motor_collection().find_one_and_update(
+            {"project": project_id, "student": student_id}, update, return_document=ReturnDocument.AFTER
+        )
+        if totals is None:
+            return
+        if totals["evaluation_count"] <= 0:
+            # A concurrent add keeps the document
+            await EvaluationAggregate.get_motor_collection().delete_one(
+                {"project": project_id, "student": student_id, "evaluation_count": {"$lte": 0}}
+            )
+        elif score is not None and score in (totals.get("min_score"), totals.get("max_score")):
+            await self.refresh_bounds(project_id, student_id)
+
+    async def refresh_bounds(self, project_id: ObjectId, student_id: ObjectId):
+        """Recompute ``min_score``/``max_score`` of a pair in place.
+
+        The bounds are only written if the counters still hold the values
+        read before the evaluations were scanned; a concurrent ``add`` or
+        ``remove`` moves them, and the scan is retried.
+        """
+        collection = EvaluationAggregate.get_motor_collection()
+        key = {"project": project_id, "student": student_id}
+        while True:
+            totals = await collection.find_one(key)
+            if totals is None or totals["evaluation_count"] <= 0:
+                return
+            bounds = await self._scan(project_id, student_id, BOUNDS) or {}
+            result = await collection.update_one(
+                self._unchanged(totals), {"$set": {field: bounds.get(field) for field in BOUNDS}}
+            )
+            if result.matched_count:
+                return
+
+    async def reconcile(self, project_id: ObjectId, student_id: ObjectId):
+        """Recompute every total of a pair from its evaluations, with the same retry as ``refresh_bounds``."""
+        collection = EvaluationAggregate.get_motor_collection()
+        key = {"project": project_id, "student": student_id}
+        while True:
+            totals = await collection.find_one(key)
+            scanned = await self._scan(project_id, student_id, TOTALS)
+            if totals is None:
+                if scanned is None:
+                    return
+                try:
+                    await collection.insert_one({**key, **{field: scanned[field] for field in TOTALS}})
+                    return
+                except DuplicateKeyError:
+                    # A concurrent add created the pair first
+                    continue
+            if scanned is None:
+                result = await collection.delete_one(self._unchanged(totals))
+                if result.deleted_count:
+                    return
+            else:
+                result = await collection.update_one(
+                    self._unchanged(totals), {"$set": {field: scanned[field] for field in TOTALS}}
+                )
+                if result.matched_count:
+                    return
+
+    async def _scan(self, project_id: ObjectId, student_id: ObjectId, fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """``fields`` of the totals of a pair's evaluations, or None if it has none."""
+        fields = {"evaluation_count", *fields}
+        rows = await Evaluation.aggregate([
+            {"$match": {"$and": [link_match("project", project_id), link_match("student", student_id)]}},
+            {"$group": {"_id": None, **{field: TOTALS[field] for field in fields}}},
+        ]).to_list()
+        return rows[0] if rows and rows[0]["evaluation_count"] else None
+
+    @staticmethod
+    def _unchanged(totals: Dict[str, Any]) -> Dict[str, Any]:
+        """Filter matching the totals document only while its counters hold the values read."""
+        return {"_id": totals["_id"], **{field: totals.get(field) for field in COUNTERS}}
+
+    async def get_many(
+        self, project_id: ObjectId, student_ids: Optional[Iterable[ObjectId]] = None
+    ) -> Dict[ObjectId, Dict[str, Any]]:
+        """``{student_id: {"avg", "count", "min", "max", "stddev"}}`` of the evaluated students of a project."""
+        query: Dict[str, Any] = {"project": project_id}
+        if student_ids is not None:
+            query["student"] = {"$in": list(student_ids)}
+        cursor = EvaluationAggregate.get_motor_collection().find(query)
+        return {totals["student"]: summarize(totals) async for totals in cursor}
+
+    async def rebuild(self, project_id: Optional[ObjectId] = None, student_id: Optional[ObjectId] = None):
+        """Reconcile the totals of a student, a project or, without arguments, every evaluation.
+
+        Each pair is reconciled on its own, so concurrent ``add`` and
+        ``remove`` calls are kept rather than overwritten.
+        """
+        matches = []
+        scope: Dict[str, Any] = {}
+        if project_id is not None:
+            matches.append(link_match("project", project_id))
+            scope["project"] = project_id
+        if student_id is not None:
+            matches.append(link_match("student", student_id))
+            scope["student"] = student_id
+        rows = await Evaluation.aggregate([
+            {"$match": {"$and": matches} if matches else {}},
+            {"$group": {"_id": {"project": ref_id("$project"), "student": ref_id("$student")}}},
+        ]).to_list()
+        pairs = {
+            (row["_id"]["project"], row["_id"]["student"])
+            for row in rows
+            if row["_id"].get("project") and row["_id"].get("student")
+        }
+        # Totals left behind by evaluations deleted without their totals
+        async for totals in EvaluationAggregate.get_motor_collection().find(scope, {"project": 1, "student": 1}):
+            pairs.add((totals["project"], totals["student"]))
+        for pair in pairs:
+            await self.reconcile(*pair)
+
+    async def ensure_built(self):
+        """Build the totals of evaluations created before they were maintained, once per database.
+
+        Only the process that claims the build marker builds, so processes
+        starting together do not rebuild over each other.
+        """
+        builds = EvaluationAggregateBuild.get_motor_collection()
+        try:
+            claim = await builds.update_one(
+                {"key": "evaluation_aggregates"}, {"$setOnInsert": {"started_at": datetime.now()}}, upsert=True
+            )
+        except DuplicateKeyError:
+            return
+        if claim.upserted_id is None:
+            return
+        await self.rebuild()
+        await builds.update_one({"_id": claim.upserted_id}, {"$set": {"finished_at": datetime.now()}})
+
+
+@lru_cache
+def get_evaluation_aggregate_store() -> EvaluationAggregateStore:
+    return EvaluationAggregateStore()
@@ -0,0 +1,42 @@
+import math
+from typing import Any, Dict
+
+# $group accumulators of the running totals kept per (project, student)
+TOTALS = {
+    "evaluation_count": {"$sum": 1},
+    "scored_count": {"$sum": {"$cond": [{"$isNumber": "$score"}, 1, 0]}},
+    "score_sum": {"$sum": "$score"},
+    "score_sumsq": {"$sum": {"$multiply": ["$score", "$score"]}},
+    "min_score": {"$min": "$score"},
+    "max_score": {"$max": "$score"},
+}
+
+
+def empty_stats() -> Dict[str, Any]:
+    return {"avg": 0, "count": 0, "min": None, "max": None, "stddev": None}
+
+
+def summarize(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Score statistics from running totals.
+
+    Evaluations without a score count towards ``count`` (and so lower
+    ``avg``) but are ignored by the other statistics, as in the free-rider
+    scoring.
+    """
+    count = totals["evaluation_count"]
+    if not count:
+        return empty_stats()
+    scored = totals["scored_count"]
+    stddev = None
+    if scored:
+        mean = totals["score_sum"] / scored
+        # Guard against the rounding of sums that had scores retracted
+        stddev = math.sqrt(max(totals["score_sumsq"] / scored - mean * mean, 0))
+    return {
+        "avg": totals["score_sum"] / count,
+        "count": count,
+        "min": totals["min_score"],
+        "max": totals["max_score"],
+        "stddev": stddev,
+    }
+
@@ -0,0 +1,204 @@
+from datetime import datetime
+from fastapi import HTTPException, status
+from models.free_rider import FreeRider
+from models.group_model import Group
+from service.github_service import GitHubService
+from service.document_loader import DocumentLoader
+from service.evaluation_stats import empty_stats
+from service.evaluation_aggregate_store import get_evaluation_aggregate_store
+from service.group_summaries import to_group_response
+from schemas.free_rider import FreeRiderResponse
+from schemas.user_schemas import UserResponse
+from beanie.odm.utils.encoder import Encoder
+from bson import ObjectId
+from pymongo import DeleteMany, UpdateOne
+from models.project_model import Project
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+FREE_RIDER_THRESHOLD = 0.2
+
+def score_student(contributor_data: Optional[dict], avg_score: float, min_loc: int, max_loc: int) -> float:
+    if not contributor_data:
+        return 0
+    loc_score = (contributor_data["loc"] - min_loc) / (max_loc - min_loc) if max_loc != min_loc else 0
+    return loc_score * 0.2 + avg_score * 0.8
+
+def score_students(loc: np.ndarray, min_loc: np.ndarray, max_loc: np.ndarray,
+                   has_data: np.ndarray, avg_score: np.ndarray) -> np.ndarray:
+    """Vectorized ``score_student``: each entry is min-max normalized within its own repository's range."""
+    span = max_loc - min_loc
+    loc_score = np.divide(loc - min_loc, span, out=np.zeros_like(loc, dtype=float), where=span != 0)
+    return np.where(has_data, loc_score * 0.2 + avg_score * 0.8, 0.0)
+
+def user_response(student) -> UserResponse:
+    """Member entry of a ranking; users created without ``ho_ten`` fall back to the name they registered with."""
+    return UserResponse(ho_ten=student.ho_ten or f"{student.HoDem} {student.Ten}", email=student.email, role=student.role)
+
+def repo_of(github_link: str) -> Tuple[str, str]:
+    """(owner, repository name) of a group's GitHub link."""
+    parts = github_link.rstrip("/").split("/")
+    return parts[-2], parts[-1]
+
+async def save_free_riders(group: Group, free_riders: List[FreeRider]):
+    """Replace the stored free riders of a group with a single bulk write.
+
+    Current free riders are upserted on (group, user) and the ones that no
+    longer qualify are removed, all in one ordered round trip.
+    """
+    encoder = Encoder(to_db=True, exclude={"_id", "revision_id"})
+    operations = [
+        DeleteMany({"group.$id": group.id, "user.$id": {"$nin": [fr.user.ref.id for fr in free_riders]}})
+    ] + [
+        UpdateOne(
+            {"group.$id": group.id, "user.$id": fr.user.ref.id},
+            {"$set": encoder.encode(fr)},
+            upsert=True
+        )
+        for fr in free_riders
+    ]
+    await FreeRider.get_motor_collection().bulk_write(operations, ordered=True)
+
+async def analyze_free_riders(group_id: str, github_service: GitHubService, loader: Optional[DocumentLoader] = None) -> List[FreeRiderResponse]:
+    """Score the members of a group from their evaluations and GitHub activity, and store the free riders."""
+    loader = loader or DocumentLoader()
+    try:
+        group_obj_id = ObjectId(group_id)
+        group = await Group.get(group_obj_id)
+        if not group:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+        
+        members = [member for member in await loader.fetch_many(group.members) if member]
+        github_link = group.github_link
+        if not github_link:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Group does not have a GitHub link")
+        
+        username, reponame = repo_of(github_link)
+        contributors = await github_service.analyze_contributor_activity(reponame, username)
+        
+        for c in contributors:
+            c["loc"] = c["lines_added"] + c["lines_removed"]
+        max_loc = max((c["loc"] for c in contributors), default=1)
+        min_loc = min((c["loc"] for c in contributors), default=0)
+
+        project = await loader.fetch(group.project)
+        evaluations = await get_evaluation_aggregate_store().get_many(project.id, [student.id for student in members])
+
+        free_riders = []
+        for student in members:
+            avg_score = evaluations.get(student.id, empty_stats())["avg"]
+
+            contributor_data = next((c for c in contributors if c["contributor"] == student.github_user), None)
+            real_score = score_student(contributor_data, avg_score, min_loc, max_loc)
+
+            if real_score < FREE_RIDER_THRESHOLD:
+                free_riders.append(FreeRider(
+                    score=real_score,
+                    user=student.to_ref(),
+                    group=group.to_ref(),
+                    commit_count=contributor_data["commit_count"] if contributor_data else 0,
+                    lines_added=contributor_data["lines_added"] if contributor_data else 0,
+                    lines_removed=contributor_data["lines_removed"] if contributor_data else 0,
+                    files_modified=contributor_data["files_modified"] if contributor_data else 0,
+                    last_commit_date=datetime.fromisoformat(contributor_data["last_commit_date"]) if contributor_data and contributor_data["last_commit_date"] else None
+                ))
+                logger.info(f"Added free rider: {student.ho_ten} to group {group.name}")
+
+        await save_free_riders(group, free_riders)
+
+        students = {student.id: student for student in members}
+        group_response = to_group_response(group, group.project_summary, {}) if group.has_summaries() else None
+        return [
+            FreeRiderResponse(
+                score=fr.score,
+                user=user_response(students[fr.user.ref.id]),
+                group=group_response,
+                commit_count=fr.commit_count,
+                lines_added=fr.lines_added,
+                lines_removed=fr.lines_removed,
+                files_modified=fr.files_modified,
+                last_commit_date=fr.last_commit_date.isoformat() if fr.last_commit_date else None
+            ) for fr in free_riders
+        ]
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error getting free rider contributors: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+async def score_project(project_id: str, github_service: GitHubService, loader: Optional[DocumentLoader] = None) -> List[Dict[str, Any]]:
+    """Score the members of every group of a project, lowest score (most likely free rider) first.
+
+    Evaluation averages come from the project's running aggregates, the
+    members of all groups from one batched query and the contributor stats
+    of the groups' repositories are read concurrently; scores are then
+    computed for every member at once. Groups without a GitHub link, or
+    whose repository cannot be analyzed, are left out.
+    """
+    loader = loader or DocumentLoader()
+    project = await Project.get(ObjectId(project_id))
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    groups = [group for group in await loader.fetch_many(project.groups or []) if group and group.github_link]
+
+    def contributors_of(group: Group):
+        username, reponame = repo_of(group.github_link)
+        return github_service.analyze_contributor_activity(reponame, username)
+
+    evaluation_stats, members_by_group, contributors_by_group = await asyncio.gather(
+        get_evaluation_aggregate_store().get_many(project.id),
+        asyncio.gather(*(loader.fetch_many(group.members) for group in groups)),
+        asyncio.gather(*(contributors_of(group) for group in groups), return_exceptions=True)
+    )
+
+    rows = []
+    for group, members, contributors in zip(groups, members_by_group, contributors_by_group):
+        if isinstance(contributors, Exception):
+            logger.warning(f"Skipping group {group.name}: {contributors}")
+            continue
+        by_login = {c["contributor"]: c for c in contributors}
+        locs = [c["lines_added"] + c["lines_removed"] for c in contributors]
+        for student in members:
+            if not student:
+                continue
+            contributor_data = by_login.get(student.github_user)
+            evaluations = evaluation_stats.get(student.id, empty_stats())
+            rows.append({
+                "group_id": str(group.id),
+                "group_name": group.name,
+                "user": user_response(student),
+                "avg_score": evaluations["avg"],
+                "evaluation_count": evaluations["count"],
+                "loc": contributor_data["lines_added"] + contributor_data["lines_removed"] if contributor_data else 0,
+                "min_loc": min(locs, default=0),
+                "max_loc": max(locs, default=1),
+                "has_data": contributor_data is not None,
+                "commit_count": contributor_data["commit_count"] if contributor_data else 0,
+                "lines_added": contributor_data["lines_added"] if contributor_data else 0,
+                "lines_removed": contributor_data["lines_removed"] if contributor_data else 0,
+                "files_modified": contributor_data["files_modified"] if contributor_data else 0,
+                "last_commit_date": contributor_data["last_commit_date"] if contributor_data else None,
+            })
+    if not rows:
+        return []
+
+    scores = score_students(
+        np.array([row["loc"] for row in rows], dtype=float),
+        np.array([row.pop("min_loc") for row in rows], dtype=float),
+        np.array([row.pop("max_loc") for row in rows], dtype=float),
+        np.array([row.pop("has_data") for row in rows]),
+        np.array([row["avg_score"] for row in rows], dtype=float),
+    )
+    for row, score in zip(rows, scores.tolist()):
+        row["score"] = score
+        row["is_free_rider"] = score < FREE_RIDER_THRESHOLD
+
+    ranking = sorted(rows, key=lambda row: row["score"])
+    for rank, row in enumerate(ranking, start=1):
+        row["rank"] = rank
+    return ranking
@@ -0,0 +1,110 @@
+import asyncio
+import base64
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from service.github_analysis import aggregate_commits, only_contributors, validate_repo_name
+
+# Record and field separators of the ``git log`` output
+RECORD = "\x1e"
+FIELD = "\x1f"
+END_OF_MESSAGE = "\x1d"
+LOG_FORMAT = f"{RECORD}%H{FIELD}%an{FIELD}%aI{FIELD}%B{END_OF_MESSAGE}"
+
+# One clone or fetch of a given path at a time
+clone_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+class GitError(Exception):
+    pass
+
+
+async def run_git(*args: str, cwd: Optional[str] = None) -> str:
+    process = await asyncio.create_subprocess_exec(
+        "git", *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise GitError(stderr.decode(errors="replace").strip())
+    return stdout.decode(errors="replace")
+
+
+def auth_args(token: Optional[str]) -> List[str]:
+    # Passed per command so the token is never written to the clone's config
+    if not token:
+        return []
+    credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    return ["-c", f"http.extraHeader=Authorization: Basic {credentials}"]
+
+
+def clone_path(clone_dir: str, full_name: str) -> str:
+    """Path of the bare clone of ``owner/repo`` under ``clone_dir``.
+
+    Raises ValueError for invalid names and for paths that resolve outside
+    ``clone_dir``, e.g. through a symlink.
+    """
+    root = os.path.realpath(clone_dir)
+    path = os.path.realpath(os.path.join(root, f"{validate_repo_name(full_name).lower()}.git"))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Invalid repository name {full_name!r}")
+    return path
+
+
+async def clone_repository(url: str, path: str, token: Optional[str] = None) -> str:
+    """Bare-clone ``url`` into ``path``, or fetch the new commits if it was cloned before."""
+    async with clone_locks[path]:
+        if os.path.isdir(path):
+            await run_git(*auth_args(token), "fetch", "--prune", "origin", "+refs/heads/*:refs/heads/*", cwd=path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            await run_git(*auth_args(token), "clone", "--bare", "--quiet", url, path)
+    return path
+
+
+def parse_log(output: str) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, int]]]:
+    """Commits in the listed-commit shape of the GitHub API, and their stats by SHA."""
+    commits = []
+    stats = {}
+    for record in output.split(RECORD)[1:]:
+        header, _, numstat = record.partition(END_OF_MESSAGE)
+        sha, author, date, message = header.split(FIELD, 3)
+        commits.append({
+            "sha": sha,
+            "commit": {
+                "message": message.rstrip("\n"),
+                "author": {"name": author, "date": datetime.fromisoformat(date).astimezone(timezone.utc).isoformat()},
+            },
+        })
+
+        commit_stats = {"additions": 0, "deletions": 0, "files": 0}
+        for line in numstat.splitlines():
+            if not line:
+                continue
+            added, deleted, _ = line.split("\t", 2)
+            # Binary files are listed as "-\t-"
+            commit_stats["additions"] += int(added) if added != "-" else 0
+            commit_stats["deletions"] += int(deleted) if deleted != "-" else 0
+            commit_stats["files"] += 1
+        stats[sha] = commit_stats
+    return commits, stats
+
+
+async def analyze_local_repository(path: str, ref: str = "HEAD") -> List[Dict[str, Any]]:
+    """Contributor activity of a local (bare or working) repository from a single ``git log`` pass.
+
+    Produces the same contributors as the GitHub API analysis; merge commits
+    are diffed against their first parent, as GitHub reports them.
+    """
+    output = await run_git(
+        "log", ref, "--numstat", "--no-renames", "--diff-merges=first-parent",
+        f"--format={LOG_FORMAT}",
+        cwd=path,
+    )
+    commits, stats = parse_log(output)
+    return only_contributors(list(aggregate_commits(commits, stats).values()))
@@ -0,0 +1,182 @@
+import asyncio
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from service.github_client import GitHubClient
+
+# Ánh xạ các tên author đặc biệt
+AUTHOR_MAP = {
+    "Khiempg": "Khiempg225868",
+    "Bùi Ngọc Hợp": "hopite601",
+    "Vu Quang Dung": "vqdung71104"
+}
+
+
+def is_counted_message(message: str) -> bool:
+    """Merge and web-editor "Update ..." commits do not count as authored work."""
+    return not message.startswith("Merge") and not message.startswith("Update")
+
+
+def normalize_author(name: Optional[str]) -> Optional[str]:
+    return AUTHOR_MAP.get(name, name) if name else None
+
+
+# Characters GitHub allows in owner and repository names
+REPO_NAME_PART = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def validate_repo_name(full_name: str) -> str:
+    """Return ``owner/repo`` unchanged, or raise ValueError if it is not a GitHub repository name.
+
+    The name ends up in API paths and in the path of local clones, so no
+    part may be "." or "..".
+    """
+    parts = full_name.split("/")
+    if len(parts) != 2 or not all(REPO_NAME_PART.match(part) and part not in (".", "..") for part in parts):
+        raise ValueError(f"Invalid repository name {full_name!r}")
+    return full_name
+
+
+async def resolve_repo_name(client: GitHubClient, repo_name: str, username: Optional[str] = None) -> str:
+    if not username:
+        username = (await client.get_json("/user"))["login"]
+    return validate_repo_name(f"{username}/{repo_name}")
+
+
+async def fetch_commit_stats(client: GitHubClient, full_name: str, sha: str) -> Optional[Dict[str, int]]:
+    """Additions, deletions and number of files of a commit, or None if GitHub cannot provide them."""
+    try:
+        commit = await client.get_json(f"/repos/{full_name}/commits/{sha}")
+    except httpx.HTTPError:
+        return None
+    stats = commit.get("stats") or {}
+    return {
+        "additions": stats.get("additions", 0),
+        "deletions": stats.get("deletions", 0),
+        "files": len(commit.get("files") or []),
+    }
+
+
+async def get_commit_stats(client: GitHubClient, full_name: str, shas: List[str],
+                           store=None) -> Dict[str, Dict[str, int]]:
+    """Stats of the given commits, fetching from GitHub only the SHAs the store has never seen."""
+    cached = await store.get_many(full_name, shas) if store else {}
+    missing = [sha for sha in shas if sha not in cached]
+    fetched = await asyncio.gather(*(fetch_commit_stats(client, full_name, sha) for sha in missing))
+    new_stats = {sha: commit_stats for sha, commit_stats in zip(missing, fetched) if commit_stats}
+    if store:
+        await store.save_many(full_name, new_stats)
+    return {**cached, **new_stats}
+
+
+def new_contributor(author: str) -> Dict[str, Any]:
+    return {
+        "contributor": author,
+        "messages": [],
+        "commit_count": 0,
+        "lines_added": 0,
+        "lines_removed": 0,
+        "files_modified": 0,
+        "last_commit_date": None
+    }
+
+
+def commit_author(commit: Dict[str, Any]) -> Optional[str]:
+    """Normalized author of a listed commit; None for commits that are never attributed."""
+    name = commit["commit"]["author"]["name"]
+    if name == "Unknown":
+        return None
+    return normalize_author(name)
+
+
+def aggregate_commits(commits: List[Dict[str, Any]], stats: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, Any]]:
+    """Fold listed commits (newest first) into per-author aggregates.
+
+    Authors who only made merge or "Update" commits are kept, with no
+    messages, so that later counted commits can promote them to contributors.
+    """
+    contributors = {}
+    for commit in commits:
+        author = commit_author(commit)
+        if not author:
+            continue
+        contributor = contributors.setdefault(author, new_contributor(author))
+
+        message = commit["commit"]["message"]
+        if is_counted_message(message):
+            contributor["messages"].append(message)
+
+        contributor["commit_count"] += 1
+        date = commit["commit"]["author"].get("date")
+        if date:
+            date = datetime.fromisoformat(date).isoformat()
+            if not contributor["last_commit_date"] or date > contributor["last_commit_date"]:
+                contributor["last_commit_date"] = date
+
+        commit_stats = stats.get(commit["sha"])
+        if commit_stats:
+            contributor["lines_added"] += commit_stats["additions"]
+            contributor["lines_removed"] += commit_stats["deletions"]
+            contributor["files_modified"] += commit_stats["files"]
+
+    return contributors
+
+
+def only_contributors(aggregates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Contributors are the authors of at least one counted commit."""
+    return [aggregate for aggregate in aggregates if aggregate["messages"]]
+
+
+# Each repository is synced by one task at a time per process; across processes,
+# the compare-and-set on the cursor keeps commits from being counted twice
+sync_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+def committer_date(commit: Dict[str, Any]) -> datetime:
+    # ``since`` filters on the committer date, so the cursor follows it too
+    return datetime.fromisoformat((commit["commit"].get("committer") or commit["commit"]["author"])["date"])
+
+
+def advance_cursor(cursor: Optional[Dict[str, Any]], commits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Cursor after ingesting ``commits``: the latest committer date and the SHAs committed at that date."""
+    dates = {commit["sha"]: committer_date(commit) for commit in commits}
+    latest = max(dates.values())
+    shas = [sha for sha, date in dates.items() if date == latest]
+    if cursor and cursor["date"] == latest:
+        shas += cursor["shas"]
+    return {"date": latest, "shas": shas}
+
+
+async def sync_repository(client: GitHubClient, full_name: str, activity_store, stats_store=None,
+                          reset: bool = False) -> int:
+    """Ingest the commits pushed since the last sync into the contributor aggregates.
+
+    With ``reset``, the aggregates and cursor are dropped first and the whole
+    history is ingested again. The reset happens under the repository's
+    lock, so a sync already running cannot apply its commits after it.
+    Returns the number of new commits.
+    """
+    async with sync_locks[full_name.lower()]:
+        if reset:
+            await activity_store.reset(full_name)
+        cursor = await activity_store.get_cursor(full_name)
+        params = {"since": cursor["date"].isoformat()} if cursor else None
+        commits = [commit async for commit in client.paginate(f"/repos/{full_name}/commits", params)]
+        # ``since`` is inclusive: drop the commits already ingested at the cursor date
+        seen = set(cursor["shas"]) if cursor else set()
+        commits = [c for c in commits if c["sha"] not in seen]
+        if not commits:
+            return 0
+
+        attributed = [c for c in commits if commit_author(c)]
+        stats = await get_commit_stats(client, full_name, [c["sha"] for c in attributed], stats_store)
+
+        if not await activity_store.apply(full_name, aggregate_commits(attributed, stats),
+                                          advance_cursor(cursor, commits), cursor):
+            # Another process synced these commits first
+            return 0
+        return len(commits)
@@ -0,0 +1,80 @@
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from config import env
+from service.github_scheduler import GitHubScheduler
+
+
+class GitHubClient:
+    """Async client for the GitHub REST API.
+
+    Every request goes through a ``GitHubScheduler``: at most
+    ``max_concurrency`` requests are in flight at once, whatever the number
+    of tasks using the client, and they are spread over the token pool
+    according to the remaining rate-limit quota of each token.
+    """
+
+    def __init__(
+        self,
+        tokens: Optional[List[str]] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.http = httpx.AsyncClient(
+            base_url=base_url or env.GITHUB_API_URL,
+            headers={"Accept": "application/vnd.github+json"},
+            timeout=30,
+            transport=transport,
+        )
+        self.scheduler = GitHubScheduler(tokens, max_concurrency or env.GITHUB_MAX_CONCURRENCY)
+
+    async def __aenter__(self) -> "GitHubClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def request(self, method: str, url: str, priority: Optional[int] = None,
+                      headers: Optional[Dict[str, str]] = None, **kwargs) -> httpx.Response:
+        """Send a request once the scheduler grants a token, retrying it when the token was rate limited."""
+        headers = headers or {}
+        while True:
+            quota = await self.scheduler.acquire(priority)
+            try:
+                response = await self.http.request(method, url, headers={**headers, **quota.headers()}, **kwargs)
+            except BaseException:
+                await self.scheduler.release(quota)
+                raise
+            if not await self.scheduler.release(quota, response):
+                break
+        # 304 only answers conditional requests, the caller serves its cached copy
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        response = await self.request("GET", url, params=params)
+        return response.json()
+
+    async def paginate(self, url: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Any]:
+        """Yield the items of a list endpoint, following the ``Link: rel="next"`` header."""
+        params = {"per_page": 100, **(params or {})}
+        while url:
+            response = await self.request("GET", url, params=params)
+            for item in response.json():
+                yield item
+            next_link = response.links.get("next")
+            # The next link already carries the query string
+            url, params = (next_link["url"], None) if next_link else (None, None)
+
+
+@lru_cache
+def get_github_client() -> GitHubClient:
+    """Process-wide client, so that every analysis shares the token pool and its quota."""
+    return GitHubClient(env.GITHUB_TOKENS)
@@ -0,0 +1,165 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BACKGROUND = 10
+
+request_priority: ContextVar[int] = ContextVar("github_request_priority", default=PRIORITY_DEFAULT)
+
+
+@contextmanager
+def github_priority(priority: int):
+    """Run the GitHub requests made in this block (and the tasks it starts) at ``priority``."""
+    reset = request_priority.set(priority)
+    try:
+        yield
+    finally:
+        request_priority.reset(reset)
+
+
+class TokenQuota:
+    """Rate-limit state of one token, as last reported by GitHub."""
+
+    def __init__(self, token: Optional[str]):
+        self.token = token
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.in_flight = 0
+        self.requests = 0
+
+    def available(self, now: float) -> Optional[int]:
+        """Requests that may still be sent with this token; None while the quota is unknown."""
+        if self.remaining is None or (self.reset_at is not None and now >= self.reset_at):
+            return None
+        return self.remaining - self.in_flight
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    def update(self, response: httpx.Response) -> bool:
+        """Record the quota reported by ``response``; True when it was rejected for exceeding it."""
+        headers = response.headers
+        if "x-ratelimit-remaining" in headers:
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset_at = float(headers.get("x-ratelimit-reset", time.time()))
+            # Concurrent responses arrive out of order: within a window the lowest count is the latest
+            if reset_at == self.reset_at and self.remaining is not None:
+                remaining = min(remaining, self.remaining)
+            self.remaining = remaining
+            self.reset_at = reset_at
+            self.limit = int(headers.get("x-ratelimit-limit", self.limit or 0))
+
+        if response.status_code not in (403, 429):
+            return False
+        if "retry-after" in headers:
+            # Secondary rate limit
+            self.remaining = 0
+            self.reset_at = time.time() + float(headers["retry-after"])
+            return True
+        return self.remaining == 0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "token": f"...{self.token[-4:]}" if self.token else None,
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+        }
+
+
+class GitHubScheduler:
+    """Hands out tokens from a pool to queued GitHub requests.
+
+    Requests are served by priority, then in arrival order, while fewer than
+    ``max_concurrency`` are in flight. Each goes to the token with the most
+    remaining quota; when every token is exhausted the queue waits for the
+    earliest reset instead of burning requests on 403s.
+    """
+
+    def __init__(self, tokens: List[Optional[str]], max_concurrency: int):
+        self.quotas = [TokenQuota(token) for token in tokens or [None]]
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.throttled = 0
+        self.waiting: List[tuple] = []
+        self.counter = itertools.count()
+        self.condition = asyncio.Condition()
+
+    def pick(self, now: float) -> Optional[TokenQuota]:
+        best, best_available = None, 0
+        for quota in self.quotas:
+            available = quota.available(now)
+            if available is None:
+                # Unknown or reset quota: assume it is full
+                available = (quota.limit or float("inf")) - quota.in_flight
+            if available > best_available:
+                best, best_available = quota, available
+        return best
+
+    def next_reset(self, now: float) -> Optional[float]:
+        resets = [quota.reset_at - now for quota in self.quotas if quota.reset_at and quota.reset_at > now]
+        return min(resets, default=None)
+
+    async def acquire(self, priority: Optional[int] = None) -> TokenQuota:
+        """Wait for a token; ``priority`` defaults to the one set with ``github_priority``."""
+        if priority is None:
+            priority = request_priority.get()
+        entry = (priority, next(self.counter))
+        async with self.condition:
+            heapq.heappush(self.waiting, entry)
+            try:
+                while True:
+                    if self.waiting[0] == entry and self.in_flight < self.max_concurrency:
+                        now = time.time()
+                        quota = self.pick(now)
+                        if quota:
+                            heapq.heappop(self.waiting)
+                            quota.in_flight += 1
+                            quota.requests += 1
+                            self.in_flight += 1
+                            self.condition.notify_all()
+                            return quota
+                        timeout = self.next_reset(now)
+                    else:
+                        timeout = None
+                    try:
+                        await asyncio.wait_for(self.condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self.waiting:
+                    self.waiting.remove(entry)
+                    heapq.heapify(self.waiting)
+                    self.condition.notify_all()
+                raise
+
+    async def release(self, quota: TokenQuota, response: Optional[httpx.Response] = None) -> bool:
+        """Return ``quota`` to the pool; True when ``response`` was rate limited and should be retried."""
+        throttled = quota.update(response) if response is not None else False
+        async with self.condition:
+            quota.in_flight -= 1
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+            self.condition.notify_all()
+        return throttled
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self.waiting),
+            "in_flight": self.in_flight,
+            "throttled": self.throttled,
+            "tokens": [quota.metrics() for quota in self.quotas],
+        }
@@ -1,157 +1,188 @@
 from fastapi import HTTPException
+from functools import lru_cache
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+import httpx
 from config import env
-from github import Github
+from service.github_client import GitHubClient, get_github_client
+from service.github_analysis import is_counted_message, resolve_repo_name, sync_repository
+from service.commit_stats_store import CommitStatsStore
+from service.contributor_activity_store import ContributorActivityStore
+from service.git_log_analysis import analyze_local_repository, clone_path, clone_repository
+import asyncio
+
+class ConditionalCache:
+    """ETag / Last-Modified validators and bodies of GitHub responses, per URL.
+
+    GitHub answers a conditional request for an unchanged resource with a 304
+    that carries no body and does not count against the rate limit.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+
+    def headers(self, url: str) -> Dict[str, str]:
+        entry = self.entries.get(url)
+        if not entry:
+            return {}
+        if entry["etag"]:
+            return {"If-None-Match": entry["etag"]}
+        return {"If-Modified-Since": entry["last_modified"]}
+
+    def store(self, url: str, response: httpx.Response):
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        self.entries[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": response.json(),
+            "links": response.links,
+        }
+        self.entries.move_to_end(url)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(url)
+        if entry:
+            self.hits += 1
+            self.entries.move_to_end(url)
+        return entry
+
+
+def to_iso(date: Optional[str]) -> Optional[str]:
+    return datetime.fromisoformat(date).isoformat() if date else None
+
 
 class GitHubService:
-    def __init__(self):
-        self.github = Github(env.GITHUB_TOKEN)
-    
-    def get_user_info(self, username=None):
-        if username:
-            user = self.github.get_user(username)
-        else:
-            user = self.github.get_user()
+    def __init__(self, client: Optional[GitHubClient] = None):
+        self.client = client or get_github_client()
+        self.http_cache = ConditionalCache()
+        self.commit_stats = CommitStatsStore()
+        self.contributor_activity = ContributorActivityStore()
+
+    async def get_page(self, url: str, params: Optional[Dict[str, Any]] = None):
+        """GET ``url`` conditionally; returns the JSON body and the pagination links."""
+        key = str(httpx.URL(url, params=params))
+        response = await self.client.request("GET", url, params=params, headers=self.http_cache.headers(key))
+        if response.status_code == 304:
+            entry = self.http_cache.get(key)
+            if entry:
+                return entry["body"], entry["links"]
+            # Evicted while the request was in flight
+            response = await self.client.request("GET", url, params=params)
+        self.http_cache.store(key, response)
+        return response.json(), response.links
+
+    async def get_json(self, url: str) -> Any:
+        body, _ = await self.get_page(url)
+        return body
+
+    async def get_all_pages(self, url: str) -> AsyncIterator[Any]:
+        params = {"per_page": 100}
+        while url:
+            body, links = await self.get_page(url, params)
+            for item in body:
+                yield item
+            url, params = (links["next"]["url"], None) if "next" in links else (None, None)
+
+    async def get_user_info(self, username=None):
+        user = await self.get_json(f"/users/{username}" if username else "/user")
         # Trả về dict chỉ chứa các trường cơ bản, không dùng __dict__
         return {
-            "login": user.login,
-            "id": user.id,
-            "name": user.name,
-            "avatar_url": user.avatar_url,
-            "html_url": user.html_url,
-            "bio": user.bio,
-            "public_repos": user.public_repos,
-            "followers": user.followers,
-            "following": user.following,
-            "created_at": user.created_at.isoformat() if user.created_at else None,
-            "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+            "login": user["login"],
+            "id": user["id"],
+            "name": user.get("name"),
+            "avatar_url": user.get("avatar_url"),
+            "html_url": user.get("html_url"),
+            "bio": user.get("bio"),
+            "public_repos": user.get("public_repos"),
+            "followers": user.get("followers"),
+            "following": user.get("following"),
+            "created_at": to_iso(user.get("created_at")),
+            "updated_at": to_iso(user.get("updated_at")),
         }
     
-    def get_user_repositories(self, username=None):
+    async def get_user_repositories(self, username=None):
         """Lấy danh sách repositories của user hoặc người dùng hiện tại"""
-        if username:
-            user = self.github.get_user(username)
-        else:
-            user = self.github.get_user()
-        
         repos = []
-        for repo in user.get_repos():
+        async for repo in self.get_all_pages(f"/users/{username}/repos" if username else "/user/repos"):
             repos.append({
-                "id": repo.id,
-                "name": repo.name,
-                "full_name": repo.full_name,
-                "description": repo.description,
-                "url": repo.html_url,
-                "language": repo.language,
-                "stars": repo.stargazers_count
+                "id": repo["id"],
+                "name": repo["name"],
+                "full_name": repo["full_name"],
+                "description": repo.get("description"),
+                "url": repo.get("html_url"),
+                "language": repo.get("language"),
+                "stars": repo.get("stargazers_count")
             })
         return repos
     
-    def get_repo_commits(self, repo_name, username=None):
+    async def get_repo_commits(self, repo_name, username=None):
         """Lấy danh sách commits của repository"""
-        if username:
-            repo = self.github.get_repo(f"{username}/{repo_name}")
-        else:
-            user = self.github.get_user()
-            repo = self.github.get_repo(f"{user.login}/{repo_name}")
-        
+        full_name = await resolve_repo_name(self.client, repo_name, username)
         commits = []
-        for commit in repo.get_commits():
-            if not commit.commit.message.startswith("Merge") and not commit.commit.message.startswith("Update"):
+        async for commit in self.get_all_pages(f"/repos/{full_name}/commits"):
+            if is_counted_message(commit["commit"]["message"]):
                 commits.append({
-                    "sha": commit.sha,
-                    "message": commit.commit.message,
-                    "author": commit.commit.author.name,
-                    "date": commit.commit.author.date.isoformat()
+                    "sha": commit["sha"],
+                    "message": commit["commit"]["message"],
+                    "author": commit["commit"]["author"]["name"],
+                    "date": to_iso(commit["commit"]["author"]["date"])
                 })
         return commits
     
-    def get_repo_contributors(self, repo_name, username=None):
+    async def get_repo_contributors(self, repo_name, username=None):
         """Lấy danh sách contributors của repository"""
-        if username:
-            repo = self.github.get_repo(f"{username}/{repo_name}")
-        else:
-            user = self.github.get_user()
-            repo = self.github.get_repo(f"{user.login}/{repo_name}")
-        
-        contributors = []
-        for contributor in repo.get_contributors():
-            contributors.append({
-                "login": contributor.login,
-                "name": contributor.name,
-                "contributions": contributor.contributions,
-                "avatar_url": contributor.avatar_url,
-                "profile_url": contributor.html_url
-            })
-        return contributors
+        full_name = await resolve_repo_name(self.client, repo_name, username)
+        contributors = [c async for c in self.get_all_pages(f"/repos/{full_name}/contributors")]
+        # Danh sách contributors không có tên, lấy từ hồ sơ của từng người (cũng được cache)
+        profiles = await asyncio.gather(*(self.get_json(f"/users/{c['login']}") for c in contributors))
+        return [
+            {
+                "login": contributor["login"],
+                "name": profile.get("name"),
+                "contributions": contributor["contributions"],
+                "avatar_url": contributor.get("avatar_url"),
+                "profile_url": contributor.get("html_url")
+            }
+            for contributor, profile in zip(contributors, profiles)
+        ]
     
-    def analyze_contributor_activity(self, repo_name, username=None):
+    async def analyze_contributor_activity(self, repo_name, username=None, backend=None):
         """Phân tích hoạt động của các contributors"""
         try:
-            if username:
-                repo = self.github.get_repo(f"{username}/{repo_name}")
-            else:
-                user = self.github.get_user()
-                repo = self.github.get_repo(f"{user.login}/{repo_name}")
-            
-            contributors = {}
-            commits = repo.get_commits()
-            valid_commits = self.get_repo_commits(repo_name, username)
-
-            # Ánh xạ các tên author đặc biệt
-            author_map = {
-                "Khiempg": "Khiempg225868",
-                "Bùi Ngọc Hợp": "hopite601",
-                "Vu Quang Dung": "vqdung71104"
-            }
+            full_name = await resolve_repo_name(self.client, repo_name, username)
+            if (backend or env.GITHUB_ANALYSIS_BACKEND) == "git":
+                return await self.analyze_clone(full_name)
+            # Only the commits pushed since the last analysis are fetched
+            await sync_repository(self.client, full_name, self.contributor_activity, self.commit_stats)
+            return await self.contributor_activity.get_contributors(full_name)
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error analyzing repository: {str(e)}")
 
-            # Lấy login contributor
-            login_user = [{"login": c["login"], "name": c["name"]} for c in self.get_repo_contributors(repo_name, username)]
+    async def sync_contributor_activity(self, full_name, reset=False):
+        """Cập nhật số liệu contributors của một repository đã từng được phân tích"""
+        return await sync_repository(self.client, full_name, self.contributor_activity, self.commit_stats, reset)
 
-            # Tạo tập hợp authors đã lọc và chuẩn hóa
-            authors = {
-                author_map.get(c["author"], c["author"])
-                for c in valid_commits
-                if c["author"] != "Unknown"
-            }
+    async def analyze_clone(self, full_name):
+        """Phân tích từ bản clone cục bộ: một lần `git log --numstat` thay vì một request cho mỗi commit"""
+        try:
+            path = clone_path(env.GIT_CLONE_DIR, full_name)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        await clone_repository(f"https://github.com/{full_name}.git", path, env.GITHUB_TOKEN)
+        return await analyze_local_repository(path)
 
-            for commit in commits:
-                raw_author = commit.commit.author.name
-                if not raw_author:
-                    continue
-
-                # Chuẩn hóa tên author
-                author = author_map.get(raw_author, raw_author)
-
-                if author not in authors:
-                    continue
-
-                if author not in contributors:
-                    contributors[author] = {
-                        "contributor": author,
-                        "messages": [],
-                        "commit_count": 0,
-                        "lines_added": 0,
-                        "lines_removed": 0,
-                        "files_modified": 0,
-                        "last_commit_date": None
-                    }
-
-                if not commit.commit.message.startswith("Merge") and not commit.commit.message.startswith("Update"):
-                    contributors[author]["messages"].append(commit.commit.message)
-
-                contributors[author]["commit_count"] += 1
-                contributors[author]["last_commit_date"] = commit.commit.author.date.isoformat() if commit.commit.author.date else None
-
-                try:
-                    full_commit = repo.get_commit(commit.sha)
-                    contributors[author]["lines_added"] += full_commit.stats.additions
-                    contributors[author]["lines_removed"] += full_commit.stats.deletions
-                    contributors[author]["files_modified"] += len(full_commit.files)
-                except Exception:
-                    continue
-
-            # Trả về dạng mảng
-            return list(contributors.values())
 
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error analyzing repository: {str(e)}")
\ No newline at end of file
+@lru_cache
+def get_github_service():
+    # Một instance cho toàn bộ process thay vì tạo client mới cho mỗi request
+    return GitHubService()
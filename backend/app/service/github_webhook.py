@@ -0,0 +1,45 @@
+import hashlib
+import hmac
+from functools import partial
+from typing import Any, Dict, Optional
+
+from service.github_service import GitHubService
+from service.job_queue import JobQueue
+
+SIGNATURE_HEADER = "X-Hub-Signature-256"
+
+
+def verify_signature(secret: Optional[str], body: bytes, signature: Optional[str]) -> bool:
+    """Check the HMAC-SHA256 signature GitHub computes over the raw body with the webhook secret."""
+    if not secret or not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+async def handle_push(payload: Dict[str, Any], github_service: GitHubService, job_queue: JobQueue) -> Dict[str, Any]:
+    """Queue an incremental sync of the pushed repository's contributor aggregates.
+
+    Only pushes to the default branch of repositories that were analyzed
+    before are synced; the sync ingests every commit since the repository's
+    cursor, so pushes missed while the server was down are caught up too.
+    A forced push may have rewritten history, so the aggregates are rebuilt.
+    """
+    repository = payload.get("repository") or {}
+    full_name = repository.get("full_name")
+    if not full_name or payload.get("ref") != f"refs/heads/{repository.get('default_branch')}":
+        return {"status": "ignored", "reason": "Not a push to the default branch"}
+    if payload.get("deleted") or not payload.get("commits") and not payload.get("forced"):
+        return {"status": "ignored", "reason": "No new commits"}
+    if not await github_service.contributor_activity.get_cursor(full_name):
+        return {"status": "ignored", "reason": "Repository is not tracked"}
+
+    job_id = await job_queue.submit(
+        "contributor_sync",
+        f"contributor_sync:{full_name.lower()}",
+        partial(github_service.sync_contributor_activity, full_name, bool(payload.get("forced"))),
+        {"repo": full_name, "after": payload.get("after")},
+        # A sync already listing commits may miss this push
+        coalesce_running=False
+    )
+    return {"status": "queued", "job_id": str(job_id)}
@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from models.group_model import Group, MemberSummary, ProjectSummary
+from models.project_model import Project
+from models.user_model import User
+from schemas.projection_schemas import ref_id, ref_ids
+
+USER_SUMMARY_FIELDS = {"ho_ten": 1, "email": 1}
+PROJECT_SUMMARY_FIELDS = {"title": 1, "description": 1}
+
+
+def lookup(collection: str, local_field: str, fields: Dict[str, int], as_field: str) -> Dict[str, Any]:
+    return {
+        "$lookup": {
+            "from": collection,
+            "localField": local_field,
+            "foreignField": "_id",
+            "pipeline": [{"$project": fields}],
+            "as": as_field,
+        }
+    }
+
+
+def group_detail_pipeline(group_id: ObjectId) -> List[Dict[str, Any]]:
+    """Pipeline joining a group with its project, leader and members in one round trip."""
+    users = User.get_collection_name()
+    return [
+        {"$match": {"_id": group_id}},
+        {
+            "$addFields": {
+                "project_id": ref_id("$project"),
+                "leader_id": ref_id("$leaders"),
+                "member_ids": ref_ids("$members"),
+            }
+        },
+        lookup(Project.get_collection_name(), "project_id", PROJECT_SUMMARY_FIELDS, "project"),
+        lookup(users, "leader_id", USER_SUMMARY_FIELDS, "leader"),
+        lookup(users, "member_ids", USER_SUMMARY_FIELDS, "members"),
+        {
+            "$project": {
+                "name": 1,
+                "github_link": 1,
+                "member_ids": 1,
+                "members": 1,
+                "project": {"$first": "$project"},
+                "leader": {"$first": "$leader"},
+            }
+        },
+    ]
+
+
+def to_summary(summary_class, document: Optional[Dict[str, Any]]):
+    if not document:
+        return None
+    return summary_class(id=document.pop("_id"), **document)
+
+
+async def get_group_detail(group_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Return a group with project, leader and member summaries, or None if it does not exist.
+
+    Members keep the order in which they were added to the group.
+    """
+    groups = await Group.aggregate(group_detail_pipeline(group_id)).to_list()
+    if not groups:
+        return None
+
+    group = groups[0]
+    members_by_id = {member["_id"]: member for member in group.pop("members")}
+    group["members"] = [
+        to_summary(MemberSummary, dict(members_by_id[member_id]))
+        for member_id in group.pop("member_ids")
+        if member_id in members_by_id
+    ]
+    group["project"] = to_summary(ProjectSummary, group.get("project"))
+    group["leader"] = to_summary(MemberSummary, group.get("leader"))
+    return group
@@ -0,0 +1,87 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.group_model import Group, MemberSummary, ProjectSummary
+from models.project_model import Project
+from models.user_model import User
+from schemas.group_schemas import GroupResponse
+from service.link_resolver import LinkResolver
+
+logger = logging.getLogger(__name__)
+
+
+def summarize_group(
+    group: Group, links: LinkResolver
+) -> Tuple[Optional[ProjectSummary], Optional[MemberSummary], List[MemberSummary]]:
+    """Project, leader and member summaries of a group.
+
+    Groups created before summaries were embedded fall back to the links,
+    which must have been prefetched into ``links``.
+    """
+    if group.has_summaries():
+        return group.project_summary, group.leader_summary, group.member_summaries
+
+    project = links.resolve(group.project)
+    leader = links.resolve(group.leaders)
+    return (
+        ProjectSummary.from_project(project) if project else None,
+        MemberSummary.from_user(leader) if leader else None,
+        [MemberSummary.from_user(member) for member in links.resolve_list(group.members)],
+    )
+
+
+def to_group_response(group, project, users: Dict[Any, Any]) -> Optional[GroupResponse]:
+    """Build a GroupResponse from a group or group projection, preferring its embedded summaries.
+
+    ``users`` maps ids to users for groups without summaries.
+    """
+    leader = group.leader_summary or users.get(getattr(group, "leader_id", None))
+    if group.member_summaries is not None:
+        members = group.member_summaries
+    else:
+        members = [users[member_id] for member_id in getattr(group, "member_ids", []) if member_id in users]
+    if not leader:
+        logger.warning(f"Could not resolve leader for group {group.id}")
+        return None
+
+    return GroupResponse(
+        name=group.name,
+        project_id=str(project.id),
+        project_title=project.title,
+        project_description=project.description,
+        leader_id=str(leader.id),
+        leader_name=leader.ho_ten or "",
+        leader_email=leader.email or "",
+        member_ids=[str(member.id) for member in members],
+        member_names=[member.ho_ten or "" for member in members],
+        member_emails=[member.email or "" for member in members],
+        created_at=group.created_at
+    )
+
+
+async def sync_user_summaries(user: User):
+    """Propagate a user's name and email to every group summary that embeds them."""
+    summary = MemberSummary.from_user(user)
+    await Group.find({"member_summaries.id": user.id}).update(
+        {"$set": {
+            "member_summaries.$[member].ho_ten": summary.ho_ten,
+            "member_summaries.$[member].email": summary.email,
+        }},
+        array_filters=[{"member.id": user.id}]
+    )
+    await Group.find({"leader_summary.id": user.id}).update(
+        {"$set": {
+            "leader_summary.ho_ten": summary.ho_ten,
+            "leader_summary.email": summary.email,
+        }}
+    )
+
+
+async def sync_project_summaries(project: Project):
+    """Propagate a project's title and description to the groups that embed it."""
+    await Group.find({"project_summary.id": project.id}).update(
+        {"$set": {
+            "project_summary.title": project.title,
+            "project_summary.description": project.description,
+        }}
+    )
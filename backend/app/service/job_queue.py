@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+from config import env
+from service.analysis_job_store import AnalysisJobStore
+from service.github_scheduler import PRIORITY_BACKGROUND, github_priority
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """In-process queue of analysis jobs run by a pool of worker tasks.
+
+    Submitting a job whose key is already queued or running returns the
+    existing job instead of starting another one. Status and results are
+    persisted by ``store`` so that clients can poll them.
+
+    Several processes may share the store. Each one holds a lease on its
+    unfinished jobs and renews it while it runs; jobs whose lease expired
+    belong to a process that stopped, and are marked failed.
+    """
+
+    def __init__(self, store, workers: int = 2, lease_seconds: float = 60):
+        self.store = store
+        self.worker_count = workers
+        self.owner = uuid.uuid4().hex
+        self.lease = timedelta(seconds=lease_seconds)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # key -> id of the job queued or running for it
+        self.active: Dict[str, "asyncio.Future[ObjectId]"] = {}
+        self.workers: List[asyncio.Task] = []
+
+    async def start(self):
+        await self.store.fail_expired(datetime.now())
+        self.workers = [asyncio.create_task(self.work()) for _ in range(self.worker_count)]
+        self.workers.append(asyncio.create_task(self.heartbeat()))
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def heartbeat(self):
+        """Renew the leases of this process's jobs and fail the jobs of stopped processes."""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                await self.store.renew_leases(self.owner, datetime.now() + self.lease)
+                await self.store.fail_expired(datetime.now())
+            except Exception as e:
+                logger.error(f"Could not renew the job leases of {self.owner}: {e}")
+
+    async def submit(self, kind: str, key: str, run: Callable[[], Awaitable[Any]],
+                     params: Optional[Dict[str, Any]] = None, coalesce_running: bool = True) -> ObjectId:
+        """Queue ``run()`` and return the job id, or the id of the job already active for ``key``.
+
+        ``params`` are stored with the job for reference. With
+        ``coalesce_running=False`` only a job that has not started yet is
+        reused, for jobs that must see data arriving after they started.
+        """
+        if key in self.active:
+            return await asyncio.shield(self.active[key])
+
+        # Reserved before the first await so that concurrent submissions coalesce
+        pending = self.active[key] = asyncio.get_running_loop().create_future()
+        job_id = ObjectId()
+        try:
+            await self.store.create(job_id, kind, key, params or {}, self.owner, datetime.now() + self.lease)
+        except BaseException:
+            del self.active[key]
+            pending.cancel()
+            raise
+        pending.set_result(job_id)
+        self.queue.put_nowait((job_id, key, run, coalesce_running))
+        return job_id
+
+    def release(self, key: str, job_id: ObjectId):
+        pending = self.active.get(key)
+        if pending and pending.done() and pending.result() == job_id:
+            del self.active[key]
+
+    async def work(self):
+        while True:
+            job_id, key, run, coalesce_running = await self.queue.get()
+            try:
+                if not coalesce_running:
+                    self.release(key, job_id)
+                await self.store.update(job_id, status="running", started_at=datetime.now())
+                # Interactive GitHub requests go first
+                with github_priority(PRIORITY_BACKGROUND):
+                    result = await run()
+                await self.store.update(job_id, status="done", result=jsonable_encoder(result), finished_at=datetime.now())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                logger.error(f"Job {job_id} ({key}) failed: {error}")
+                await self.store.update(job_id, status="failed", error=error, finished_at=datetime.now())
+            finally:
+                self.release(key, job_id)
+                self.queue.task_done()
+
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    return JobQueue(AnalysisJobStore(), env.JOB_WORKERS, env.JOB_LEASE_SECONDS)
@@ -0,0 +1,90 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Type
+
+from beanie import Document, Link
+from pydantic import BaseModel
+
+
+async def find_by_ids(
+    document_class: Type[Document], ids: Iterable[Any], projection_model: Optional[Type[BaseModel]] = None
+) -> Dict[Any, Any]:
+    """Load documents by id with one ``$in`` query, optionally projected, keyed by id."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    query = document_class.find({"_id": {"$in": ids}}, with_children=True)
+    if projection_model is not None:
+        query = query.project(projection_model)
+    return {document.id: document for document in await query.to_list()}
+
+
+def link_match(field: str, document_id: Any) -> Dict[str, Any]:
+    """Filter on a link stored either as an embedded copy or as a DBRef.
+
+    Links are inserted as embedded copies (``<field>._id``), but Beanie
+    rewrites them as DBRefs (``<field>.$id``) when a loaded document is saved.
+    """
+    return {"$or": [{f"{field}._id": document_id}, {f"{field}.$id": document_id}]}
+
+
+def link_id(value: Any) -> Optional[Any]:
+    """Id of the document behind a link, or of the value itself if it is already a document."""
+    if isinstance(value, Link):
+        return value.ref.id if value.ref else None
+    return value.id if value is not None else None
+
+
+class LinkResolver:
+    """Resolve Beanie links for a whole page of documents at once.
+
+    All link ids found on the requested fields are collected first, then
+    loaded with a single ``$in`` query per target collection. The loaded
+    documents are kept in memory so ``resolve`` never touches the database.
+    """
+
+    def __init__(self):
+        self._documents: Dict[Type[Document], Dict[Any, Document]] = defaultdict(dict)
+
+    async def prefetch(self, documents: Iterable[Document], *fields: str) -> "LinkResolver":
+        """Load every document referenced by ``fields`` on ``documents``."""
+        pending: Dict[Type[Document], Set[Any]] = defaultdict(set)
+        for document in documents:
+            for field in fields:
+                value = getattr(document, field, None)
+                for item in value if isinstance(value, list) else [value]:
+                    if self._is_unresolved(item):
+                        pending[item.document_class].add(item.ref.id)
+
+        await asyncio.gather(*[
+            self._load(document_class, ids) for document_class, ids in pending.items()
+        ])
+        return self
+
+    def resolve(self, value: Any) -> Optional[Document]:
+        """Return the document behind a link, or the value itself if it is already a document."""
+        if isinstance(value, Link):
+            if isinstance(value.ref, Document):
+                return value.ref
+            return self._documents[value.document_class].get(value.ref.id)
+        return value
+
+    def resolve_list(self, values: Optional[List[Any]]) -> List[Document]:
+        """Resolve a list of links, dropping the ones whose target no longer exists."""
+        resolved = [self.resolve(value) for value in values or []]
+        return [document for document in resolved if document is not None]
+
+    def _is_unresolved(self, item: Any) -> bool:
+        # Links built from an in-memory document carry the document as ``ref``
+        return (
+            isinstance(item, Link)
+            and not isinstance(item.ref, Document)
+            and item.ref.id not in self._documents[item.document_class]
+        )
+
+    async def _load(self, document_class: Type[Document], ids: Set[Any]):
+        cache = self._documents[document_class]
+        cache.update(await find_by_ids(document_class, ids))
+        # Remember misses too, so dangling links are not queried again
+        for document_id in ids:
+            cache.setdefault(document_id, None)
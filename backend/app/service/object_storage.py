@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+from functools import lru_cache, partial
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, List, Optional, Union
+
+import anyio
+import certifi
+import urllib3
+from fastapi import Depends, HTTPException, status
+from minio import Minio
+from minio.datatypes import Object
+from urllib3 import Retry, Timeout
+
+from config import env
+
+logger = logging.getLogger(__name__)
+
+
+class ObjectStream:
+    """Body of a ``get_object`` response, read in chunks off the event loop.
+
+    ``close`` must be called once done, including when the client went away
+    mid-transfer, to give the connection back to the pool.
+    """
+
+    def __init__(self, storage: "ObjectStorage", response: Optional[urllib3.BaseHTTPResponse]):
+        self.storage = storage
+        self.response = response
+
+    async def chunks(self, chunk_size: int) -> AsyncIterator[bytes]:
+        if self.response is None:
+            return
+        while True:
+            chunk = await self.storage.run(self.response.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        if self.response is not None:
+            self.response.close()
+            self.response.release_conn()
+
+
+class ObjectStorage:
+    """Async access to a MinIO bucket.
+
+    The MinIO client is blocking, so every call runs in a worker thread. The
+    threads come from a limiter of their own with ``max_concurrency`` slots:
+    transfers queue there instead of exhausting the thread pool that sync
+    routes and dependencies share, so they cannot stall unrelated requests.
+    """
+
+    def __init__(self, client: Minio, bucket: str, max_concurrency: int,
+                 presign_client: Optional[Minio] = None, probe_client: Optional[Minio] = None):
+        self.client = client
+        # Presigned URLs are signed for the host the browser will send them to
+        self.presign_client = presign_client or client
+        # Setup and health checks fail fast instead of waiting out the transfer timeouts and retries
+        self.probe_client = probe_client or client
+        self.bucket = bucket
+        self.max_concurrency = max_concurrency
+        self.bucket_ready = False
+        self.last_error: Optional[str] = None
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self._bucket_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        # Created lazily: the limiter binds to the running event loop
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.max_concurrency)
+        return self._limiter
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        return await anyio.to_thread.run_sync(partial(func, *args, **kwargs), limiter=self.limiter)
+
+    async def probe(self, func: Callable, *args) -> Any:
+        # Short calls outside the limiter, so they answer even while transfers fill it
+        return await anyio.to_thread.run_sync(partial(func, *args))
+
+    async def ensure_bucket(self):
+        if self.bucket_ready:
+            return
+        if self._bucket_lock is None:
+            self._bucket_lock = asyncio.Lock()
+        async with self._bucket_lock:
+            if not self.bucket_ready:
+                try:
+                    if not await self.probe(self.probe_client.bucket_exists, self.bucket):
+                        await self.probe(self.probe_client.make_bucket, self.bucket)
+                except Exception as e:
+                    self.last_error = str(e)
+                    raise
+                self.bucket_ready = True
+                self.last_error = None
+
+    async def connect(self, initial_delay: float = 0.5, max_delay: float = 30):
+        """Set up the bucket, retrying with exponential backoff until storage is reachable.
+
+        Meant to run in the background from the app's lifespan, so that the
+        workers start serving before storage is up.
+        """
+        delay = initial_delay
+        while True:
+            try:
+                await self.ensure_bucket()
+                logger.info(f"Object storage ready, bucket {self.bucket}")
+                return
+            except Exception as e:
+                logger.warning(f"Object storage unavailable, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+    async def health(self) -> Dict[str, Any]:
+        """Reachability of storage and of the bucket, with the probe latency."""
+        started = time.monotonic()
+        try:
+            exists = await self.probe(self.probe_client.bucket_exists, self.bucket)
+        except Exception as e:
+            return {"status": "unavailable", "bucket": self.bucket, "error": str(e)}
+        latency_ms = round((time.monotonic() - started) * 1000, 1)
+        if not exists:
+            return {"status": "unavailable", "bucket": self.bucket, "error": "Bucket does not exist", "latency_ms": latency_ms}
+        return {"status": "ok", "bucket": self.bucket, "latency_ms": latency_ms}
+
+    async def put(self, object_name: str, data: BinaryIO, length: int, content_type: str,
+                  part_size: int, parallel_parts: int):
+        """Stream ``data`` in parts of ``part_size``; ``length`` may be -1 when unknown."""
+        await self.run(
+            self.client.put_object, self.bucket, object_name,
+            data=data, length=length, content_type=content_type,
+            part_size=part_size, num_parallel_uploads=parallel_parts
+        )
+
+    async def list(self, prefix: str) -> List[Object]:
+        # list_objects pages lazily, so the listing is consumed in the worker thread too
+        return await self.run(lambda: list(self.client.list_objects(self.bucket, prefix=prefix)))
+
+    async def stat(self, object_name: str) -> Object:
+        return await self.run(self.client.stat_object, self.bucket, object_name)
+
+    async def open(self, object_name: str, offset: int, length: int) -> ObjectStream:
+        """Stream ``length`` bytes of an object from ``offset``."""
+        if length <= 0:
+            return ObjectStream(self, None)
+        response = await self.run(self.client.get_object, self.bucket, object_name, offset=offset, length=length)
+        return ObjectStream(self, response)
+
+    async def presigned_put(self, object_name: str, expires: timedelta) -> str:
+        """URL the browser can PUT the object's bytes to directly, valid for ``expires``."""
+        return await self.run(self.presign_client.presigned_put_object, self.bucket, object_name, expires=expires)
+
+    async def presigned_get(self, object_name: str, expires: timedelta, filename: Optional[str] = None) -> str:
+        """URL the browser can download the object from directly, valid for ``expires``."""
+        response_headers: Optional[Dict[str, str]] = None
+        if filename:
+            response_headers = {"response-content-disposition": f"attachment; filename={filename}"}
+        return await self.run(
+            self.presign_client.presigned_get_object, self.bucket, object_name,
+            expires=expires, response_headers=response_headers
+        )
+
+
+def create_minio_client(endpoint: Optional[str] = None, timeout: float = 5 * 60,
+                        retries: Union[Retry, bool, None] = None, pool_size: Optional[int] = None) -> Minio:
+    # MinIO's default pool, sized so that concurrent transfers reuse their connections
+    if retries is None:
+        retries = Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+    http_client = urllib3.PoolManager(
+        timeout=Timeout(connect=timeout, read=timeout),
+        maxsize=pool_size or env.STORAGE_POOL_SIZE,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=retries
+    )
+    # A known region spares a bucket location request, presigning then needs no round trip
+    return Minio(
+        endpoint or env.MINIO_ENDPOINT,
+        access_key=env.MINIO_ACCESS_KEY,
+        secret_key=env.MINIO_SECRET_KEY,
+        secure=env.MINIO_SECURE,
+        region=env.MINIO_REGION,
+        http_client=http_client
+    )
+
+
+@lru_cache
+def object_storage() -> ObjectStorage:
+    """Process-wide storage, so that every route shares the limiter and the connection pool."""
+    # Creating clients opens no connection: nothing here waits for storage
+    presign_client = create_minio_client(env.MINIO_PUBLIC_ENDPOINT) if env.MINIO_PUBLIC_ENDPOINT else None
+    probe_client = create_minio_client(timeout=env.STORAGE_PROBE_TIMEOUT, retries=False, pool_size=1)
+    return ObjectStorage(
+        create_minio_client(), env.MINIO_BUCKET, env.STORAGE_MAX_CONCURRENCY,
+        presign_client=presign_client, probe_client=probe_client
+    )
+
+
+async def get_object_storage(storage: ObjectStorage = Depends(object_storage)) -> ObjectStorage:
+    """Dependency returning the storage once its bucket is set up, or a 503 while storage is unreachable."""
+    try:
+        await storage.ensure_bucket()
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Object storage unavailable")
+    return storage
@@ -0,0 +1,41 @@
+import base64
+import binascii
+from typing import Any, List, Optional
+
+from beanie.odm.queries.find import FindMany
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(document_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(ObjectId(document_id).binary).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query: FindMany, skip: int, limit: int, cursor: Optional[str] = None) -> FindMany:
+    """Apply keyset pagination on ``_id`` when a cursor is given, ``skip`` otherwise.
+
+    Keyset pages are served from the ``_id`` index, so deep pages cost
+    O(limit) instead of walking every skipped document.
+    """
+    query = query.sort("+_id")
+    if cursor:
+        query = query.find({"_id": {"$gt": decode_cursor(cursor)}})
+    else:
+        query = query.skip(skip)
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, items: List[Any], limit: int):
+    """Expose the cursor of the next page; absent when this page is the last one."""
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].id)
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+import math
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+
+
+class FakeGitHub:
+    """Minimal GitHub REST API served over HTTP on localhost for tests.
+
+    Records every request path and the highest number of requests handled
+    concurrently. With ``rate_limit`` each token gets that many requests per
+    ``reset_after`` seconds, reported in ``X-RateLimit-*`` headers; requests
+    over quota are rejected with a 403 as GitHub does. Users, repositories
+    and contributors carry an ETag; a matching ``If-None-Match`` gets a 304
+    that, as on GitHub, costs no quota.
+    """
+
+    def __init__(self, login: str = "octocat", stats_delay: float = 0.0,
+                 rate_limit: Optional[int] = None, reset_after: float = 60):
+        self.login = login
+        self.stats_delay = stats_delay
+        self.rate_limit = rate_limit
+        self.reset_after = reset_after
+        self.quotas: Dict[str, dict] = {}
+        self.tokens: List[str] = []
+        self.rejected = 0
+        self.users: Dict[str, dict] = {}
+        self.contributors: Dict[str, List[dict]] = {}
+        self.not_modified = 0
+        self.repos: Dict[str, List[dict]] = {}
+        self.requests: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = self.build_app()
+
+    def add_commit(self, full_name: str, sha: str, author: str, message: str, date: str,
+                   additions: int = 0, deletions: int = 0, files: int = 0):
+        """Add a commit; commits are listed newest first, as GitHub does."""
+        self.repos.setdefault(full_name, []).insert(0, {
+            "sha": sha,
+            "commit": {
+                "message": message,
+                "author": {"name": author, "date": date},
+                "committer": {"name": author, "date": date},
+            },
+            "stats": {"additions": additions, "deletions": deletions, "total": additions + deletions},
+            "files": [{"filename": f"file{i}.py"} for i in range(files)],
+        })
+
+    def quota(self, token: str) -> dict:
+        quota = self.quotas.get(token)
+        if not quota or time.time() >= quota["reset"]:
+            quota = self.quotas[token] = {
+                "remaining": self.rate_limit,
+                "reset": math.ceil(time.time() + self.reset_after),
+            }
+        return quota
+
+    def count(self, prefix: str) -> int:
+        return sum(1 for path in self.requests if path.startswith(prefix))
+
+    def build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def track(request: Request, call_next):
+            self.requests.append(request.url.path)
+            token = request.headers.get("authorization", "").removeprefix("Bearer ")
+            self.tokens.append(token)
+            headers = {}
+            if self.rate_limit is not None:
+                quota = self.quota(token)
+                if quota["remaining"] == 0:
+                    self.rejected += 1
+                    return JSONResponse(
+                        {"message": "API rate limit exceeded"},
+                        status_code=403,
+                        headers=self.rate_limit_headers(quota),
+                    )
+
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                response = await call_next(request)
+            finally:
+                self.in_flight -= 1
+            if self.rate_limit is not None:
+                if response.status_code != 304:
+                    quota["remaining"] -= 1
+                response.headers.update(self.rate_limit_headers(quota))
+            return response
+
+        @app.get("/user")
+        async def user():
+            return {"login": self.login}
+
+        @app.get("/users/{username}")
+        async def get_user(username: str, request: Request):
+            if username not in self.users:
+                raise HTTPException(status_code=404, detail="Not Found")
+            return self.conditional(request, self.users[username])
+
+        @app.get("/users/{username}/repos")
+        async def list_repos(username: str, request: Request):
+            return self.conditional(request, [
+                {"id": i, "name": name.split("/")[1], "full_name": name, "html_url": f"https://github.com/{name}",
+                 "description": None, "language": "Python", "stargazers_count": 0}
+                for i, name in enumerate(sorted(self.repos)) if name.startswith(f"{username}/")
+            ])
+
+        @app.get("/repos/{owner}/{repo}/contributors")
+        async def list_contributors(owner: str, repo: str, request: Request):
+            return self.conditional(request, self.contributors.get(f"{owner}/{repo}", []))
+
+        @app.get("/repos/{owner}/{repo}/commits")
+        async def list_commits(owner: str, repo: str, request: Request, response: Response,
+                               page: int = 1, per_page: int = 30, since: Optional[str] = None):
+            commits = self.repos.get(f"{owner}/{repo}")
+            if commits is None:
+                raise HTTPException(status_code=404, detail="Not Found")
+            if since:
+                since_date = datetime.fromisoformat(since)
+                commits = [c for c in commits if datetime.fromisoformat(c["commit"]["committer"]["date"]) >= since_date]
+            start = (page - 1) * per_page
+            if start + per_page < len(commits):
+                next_url = request.url.include_query_params(page=page + 1, per_page=per_page)
+                response.headers["Link"] = f'<{next_url}>; rel="next"'
+            return [
+                {"sha": c["sha"], "commit": c["commit"]}
+                for c in commits[start:start + per_page]
+            ]
+
+        @app.get("/repos/{owner}/{repo}/commits/{sha}")
+        async def get_commit(owner: str, repo: str, sha: str):
+            await asyncio.sleep(self.stats_delay)
+            for commit in self.repos.get(f"{owner}/{repo}", []):
+                if commit["sha"] == sha:
+                    return commit
+            raise HTTPException(status_code=404, detail="Not Found")
+
+        return app
+
+    def conditional(self, request: Request, payload) -> Response:
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            self.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    def rate_limit_headers(self, quota: dict) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(quota["remaining"]),
+            "X-RateLimit-Reset": str(quota["reset"]),
+        }
+
+    @contextmanager
+    def serve(self):
+        """Run the API on a free local port and yield its base URL."""
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(self.app, log_level="warning"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        try:
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.should_exit = True
+            thread.join()
+            sock.close()
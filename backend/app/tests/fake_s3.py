@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import itertools
+import socket
+import threading
+import time
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+def xml_response(root: str, fields: Dict[str, str], status_code: int = 200) -> Response:
+    element = ET.Element(root, xmlns=NAMESPACE)
+    for name, value in fields.items():
+        ET.SubElement(element, name).text = value
+    return Response(ET.tostring(element), status_code=status_code, media_type="application/xml")
+
+
+class FakeS3:
+    """Minimal S3 API served over HTTP on localhost for tests.
+
+    Supports what the MinIO client needs for buckets, single and multipart
+    uploads and downloads; authentication is not checked. Every request is
+    answered after ``delay`` seconds, and the highest number of requests
+    handled concurrently is recorded; the next ``failures`` requests get a
+    503. Also records the size
+    of every request body and the part sizes of completed multipart uploads,
+    so tests can check that uploads were streamed in parts, and the
+    ``Range`` header of every download.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.buckets: Dict[str, Dict[str, dict]] = {}
+        self.uploads: Dict[str, dict] = {}
+        self.completed_uploads: List[dict] = []
+        self.body_sizes: List[int] = []
+        self.ranges: List[Optional[str]] = []
+        self.upload_ids = itertools.count(1)
+        self.app = self.build_app()
+
+    def put(self, bucket: str, key: str, data: bytes, content_type: str = "application/octet-stream"):
+        self.buckets.setdefault(bucket, {})[key] = {
+            "data": data,
+            "content_type": content_type,
+            "etag": hashlib.md5(data).hexdigest(),
+            "last_modified": datetime.now(timezone.utc).replace(microsecond=0),
+        }
+
+    def build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def track(request: Request, call_next):
+            if self.failures:
+                self.failures -= 1
+                return Response(status_code=503)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(self.delay)
+                return await call_next(request)
+            finally:
+                self.in_flight -= 1
+
+        @app.head("/{bucket}")
+        async def head_bucket(bucket: str):
+            return Response(status_code=200 if bucket in self.buckets else 404)
+
+        @app.put("/{bucket}")
+        async def create_bucket(bucket: str):
+            self.buckets.setdefault(bucket, {})
+            return Response(status_code=200)
+
+        @app.get("/{bucket}")
+        async def list_objects(bucket: str, request: Request):
+            prefix = request.query_params.get("prefix", "")
+            element = ET.Element("ListBucketResult", xmlns=NAMESPACE)
+            ET.SubElement(element, "Name").text = bucket
+            ET.SubElement(element, "IsTruncated").text = "false"
+            for key, stored in sorted(self.buckets.get(bucket, {}).items()):
+                if key.startswith(prefix):
+                    contents = ET.SubElement(element, "Contents")
+                    ET.SubElement(contents, "Key").text = key
+                    ET.SubElement(contents, "LastModified").text = stored["last_modified"].strftime("%Y-%m-%dT%H:%M:%S.000Z")
+                    ET.SubElement(contents, "ETag").text = f'"{stored["etag"]}"'
+                    ET.SubElement(contents, "Size").text = str(len(stored["data"]))
+            return Response(ET.tostring(element), media_type="application/xml")
+
+        @app.put("/{bucket}/{key:path}")
+        async def put_object(bucket: str, key: str, request: Request):
+            body = await request.body()
+            self.body_sizes.append(len(body))
+            upload_id = request.query_params.get("uploadId")
+            if upload_id:
+                part_number = int(request.query_params["partNumber"])
+                self.uploads[upload_id]["parts"][part_number] = body
+                return Response(headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+            self.put(bucket, key, body, request.headers.get("content-type", "application/octet-stream"))
+            return Response(headers={"ETag": f'"{self.buckets[bucket][key]["etag"]}"'})
+
+        @app.post("/{bucket}/{key:path}")
+        async def multipart_upload(bucket: str, key: str, request: Request):
+            if "uploads" in request.query_params:
+                upload_id = str(next(self.upload_ids))
+                self.uploads[upload_id] = {
+                    "bucket": bucket, "key": key, "parts": {},
+                    "content_type": request.headers.get("content-type", "application/octet-stream"),
+                }
+                return xml_response("InitiateMultipartUploadResult", {"Bucket": bucket, "Key": key, "UploadId": upload_id})
+
+            upload = self.uploads.pop(request.query_params["uploadId"])
+            completed = ET.fromstring(await request.body())
+            numbers = [int(part.findtext(f"{{{NAMESPACE}}}PartNumber")) for part in completed]
+            self.put(bucket, key, b"".join(upload["parts"][number] for number in numbers), upload["content_type"])
+            self.completed_uploads.append({"key": key, "part_sizes": [len(upload["parts"][number]) for number in numbers]})
+            return xml_response("CompleteMultipartUploadResult", {
+                "Bucket": bucket, "Key": key, "ETag": f'"{self.buckets[bucket][key]["etag"]}"',
+            })
+
+        @app.delete("/{bucket}/{key:path}")
+        async def abort_or_delete(bucket: str, key: str, request: Request):
+            upload_id = request.query_params.get("uploadId")
+            if upload_id:
+                self.uploads.pop(upload_id, None)
+            else:
+                self.buckets.get(bucket, {}).pop(key, None)
+            return Response(status_code=204)
+
+        @app.head("/{bucket}/{key:path}")
+        async def stat_object(bucket: str, key: str):
+            stored = self.buckets.get(bucket, {}).get(key)
+            if stored is None:
+                return Response(status_code=404)
+            return Response(headers={**self.object_headers(stored), "Content-Length": str(len(stored["data"]))})
+
+        @app.get("/{bucket}/{key:path}")
+        async def get_object(bucket: str, key: str, request: Request):
+            stored = self.buckets.get(bucket, {}).get(key)
+            if stored is None:
+                return xml_response("Error", {"Code": "NoSuchKey", "Message": "Not found", "Key": key}, 404)
+            self.ranges.append(request.headers.get("range"))
+            data = stored["data"]
+            headers = self.object_headers(stored)
+            if request.headers.get("range"):
+                # The MinIO client only sends "bytes=start-end" or "bytes=start-"
+                first, _, last = request.headers["range"].removeprefix("bytes=").partition("-")
+                start, end = int(first), min(int(last) if last else len(data) - 1, len(data) - 1)
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+                return Response(data[start:end + 1], status_code=206, headers=headers)
+            return Response(data, headers=headers)
+
+        return app
+
+    def object_headers(self, stored: dict) -> Dict[str, str]:
+        return {
+            "ETag": f'"{stored["etag"]}"',
+            "Last-Modified": format_datetime(stored["last_modified"], usegmt=True),
+            "Content-Type": stored["content_type"],
+        }
+
+    @contextmanager
+    def serve(self):
+        """Run the API on a free local port and yield its ``host:port`` endpoint."""
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(self.app, log_level="warning"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        try:
+            yield f"127.0.0.1:{port}"
+        finally:
+            server.should_exit = True
+            thread.join()
+            sock.close()
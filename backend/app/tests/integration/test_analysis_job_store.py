@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from models.analysis_job import AnalysisJob
+from service.analysis_job_store import AnalysisJobStore
+from tests.mongo import mongo
+
+
+@pytest.mark.asyncio
+async def test_fail_expired_spares_leased_jobs(mongo):
+    store = AnalysisJobStore()
+    now = datetime.now()
+    live = await store.create(ObjectId(), "analysis", "group-1", {}, "worker-1", now + timedelta(seconds=30))
+    stopped = await store.create(ObjectId(), "analysis", "group-2", {}, "worker-2", now - timedelta(seconds=1))
+    done = await store.create(ObjectId(), "analysis", "group-3", {}, "worker-2", now - timedelta(seconds=1))
+    await store.update(done.id, status="done")
+    # Created before jobs had an owner and a lease
+    legacy = AnalysisJob(kind="analysis", key="group-4", status="running")
+    await legacy.insert()
+
+    await store.fail_expired(now)
+    statuses = {job.key: (job.status, job.error) for job in await AnalysisJob.find_all().to_list()}
+    assert statuses == {
+        "group-1": ("queued", None),
+        "group-2": ("failed", "Interrupted by a server restart"),
+        "group-3": ("done", None),
+        "group-4": ("failed", "Interrupted by a server restart"),
+    }
+
+    await store.renew_leases("worker-1", now + timedelta(minutes=5))
+    await store.fail_expired(now + timedelta(minutes=1))
+    live = await store.get(live.id)
+    assert live.status == "queued"
+    assert live.lease_expires_at > now + timedelta(minutes=4)
@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+import pytest
+from service.contributor_activity_store import ContributorActivityStore
+from tests.mongo import mongo
+
+REPO = "octocat/project"
+
+
+def commit(author, message, lines_added, date):
+    return {author: {
+        "contributor": author, "messages": [message], "commit_count": 1,
+        "lines_added": lines_added, "lines_removed": 0, "files_modified": 1, "last_commit_date": date,
+    }}
+
+
+def cursor(day, *shas):
+    return {"date": datetime(2024, 3, day, 10, tzinfo=timezone.utc), "shas": list(shas)}
+
+
+@pytest.mark.asyncio
+async def test_apply_moves_the_cursor_with_compare_and_set(mongo):
+    store = ContributorActivityStore()
+    first = commit("Alice", "Initial commit", 100, "2024-03-01T10:00:00+00:00")
+    assert await store.apply(REPO, first, cursor(1, "a1"), None)
+    # A second first sync, e.g. from another process, lost the race
+    assert not await store.apply(REPO, first, cursor(1, "a1"), None)
+    assert await store.get_cursor(REPO) == cursor(1, "a1")
+
+    second = commit("Alice", "Fix login", 10, "2024-03-05T10:00:00+00:00")
+    assert await store.apply(REPO, second, cursor(5, "a3"), cursor(1, "a1"))
+    # Computed from the cursor the previous sync already moved
+    assert not await store.apply(REPO, second, cursor(5, "a3"), cursor(1, "a1"))
+
+    [alice] = await store.get_contributors(REPO)
+    assert (alice["commit_count"], alice["lines_added"]) == (2, 110)
+    assert alice["messages"] == ["Fix login", "Initial commit"]
+    assert await store.get_cursor(REPO) == cursor(5, "a3")
+
+
+@pytest.mark.asyncio
+async def test_apply_after_reset_is_rejected(mongo):
+    store = ContributorActivityStore()
+    await store.apply(REPO, commit("Alice", "Initial commit", 100, None), cursor(1, "a1"), None)
+    await store.reset(REPO)
+
+    # A sync that read the cursor before the reset
+    assert not await store.apply(REPO, commit("Alice", "Fix login", 10, None), cursor(5, "a3"), cursor(1, "a1"))
+    assert await store.get_cursor(REPO) is None
+    assert await store.get_contributors(REPO) == []
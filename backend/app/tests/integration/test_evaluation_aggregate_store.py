@@ -0,0 +1,224 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from beanie import Link
+from fastapi import FastAPI
+from models.evaluation_aggregate import EvaluationAggregate, EvaluationAggregateBuild
+from models.evaluation_model import Evaluation
+from models.project_model import Project
+from models.user_model import User
+from outh2 import get_current_user
+from routes import evaluation_routes
+from service.evaluation_aggregate_store import EvaluationAggregateStore
+from tests.mongo import mongo
+
+
+def new_user(name, email, role="student"):
+    return User(HoDem="Nguyen", Ten=name, email=email, password="hash", role=role,
+                group_id=None, tasks=[], contributions=None, ho_ten=f"Nguyen {name}")
+
+
+@pytest_asyncio.fixture
+async def api(mongo):
+    mentor = new_user("M", "m@example.com", role="mentor")
+    alice, bob = new_user("A", "a@example.com"), new_user("B", "b@example.com")
+    for user in (mentor, alice, bob):
+        await user.insert()
+    project = Project(title="ITSS", description="Task tracker", mentor=None, groups=[])
+    await project.insert()
+
+    app = FastAPI()
+    app.include_router(evaluation_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: mentor
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield SimpleNamespace(http=http, mentor=mentor, alice=alice, bob=bob, project=project)
+
+
+async def evaluate(api, student, score):
+    response = await api.http.post("/evaluations/", json={
+        "student_id": str(student.id), "project_id": str(api.project.id), "score": score,
+    })
+    assert response.status_code == 200
+    # EvaluationResponse does not serialize its id
+    [evaluation] = await Evaluation.find_all().sort("-_id").limit(1).to_list()
+    return str(evaluation.id)
+
+
+async def totals(api, student):
+    return await EvaluationAggregate.find_one({"project": api.project.id, "student": student.id})
+
+
+async def summary(api):
+    response = await api.http.get(f"/evaluations/projects/{api.project.id}/summary")
+    return {student["student"]["email"]: student for student in response.json()}
+
+
+@pytest.mark.asyncio
+async def test_add_and_remove_retract_totals(api):
+    ids = [await evaluate(api, api.alice, score) for score in (6, 8, 10)]
+    await evaluate(api, api.bob, 7)
+    alice = await totals(api, api.alice)
+    assert (alice.evaluation_count, alice.score_sum, alice.min_score, alice.max_score) == (3, 24, 6, 10)
+
+    # Removing a score that holds neither bound only retracts the counters
+    response = await api.http.delete(f"/evaluations/{ids[1]}")
+    assert response.status_code == 200
+    alice = await totals(api, api.alice)
+    assert (alice.evaluation_count, alice.scored_count, alice.score_sum, alice.score_sumsq) == (2, 2, 16, 136)
+    assert (alice.min_score, alice.max_score) == (6, 10)
+
+    stats = await summary(api)
+    assert (stats["a@example.com"]["avg"], stats["a@example.com"]["count"]) == (8, 2)
+    assert (stats["b@example.com"]["avg"], stats["b@example.com"]["count"]) == (7, 1)
+
+    # Deleting the last evaluation of a pair deletes its totals
+    for evaluation_id in (ids[0], ids[2]):
+        await api.http.delete(f"/evaluations/{evaluation_id}")
+    assert await totals(api, api.alice) is None
+    assert set(await summary(api)) == {"b@example.com"}
+
+
+@pytest.mark.asyncio
+async def test_removing_a_bound_recomputes_it(api):
+    ids = [await evaluate(api, api.alice, score) for score in (6, 8, 10)]
+
+    await api.http.delete(f"/evaluations/{ids[2]}")
+    alice = await totals(api, api.alice)
+    assert (alice.evaluation_count, alice.min_score, alice.max_score) == (2, 6, 8)
+
+    await api.http.delete(f"/evaluations/{ids[0]}")
+    alice = await totals(api, api.alice)
+    assert (alice.evaluation_count, alice.min_score, alice.max_score) == (1, 8, 8)
+
+
+@pytest.mark.asyncio
+async def test_update_moves_the_score_between_pairs(api):
+    ids = [await evaluate(api, api.alice, score) for score in (6, 9)]
+
+    # The updated evaluation is saved with its links as DBRefs
+    response = await api.http.put(f"/evaluations/{ids[1]}", json={
+        "student_id": str(api.alice.id), "project_id": str(api.project.id), "score": 4,
+    })
+    assert response.status_code == 200
+    alice = await totals(api, api.alice)
+    assert (alice.evaluation_count, alice.score_sum, alice.min_score, alice.max_score) == (2, 10, 4, 6)
+
+    response = await api.http.put(f"/evaluations/{ids[1]}", json={
+        "student_id": str(api.bob.id), "project_id": str(api.project.id), "score": 5,
+    })
+    assert response.status_code == 200
+    alice, bob = await totals(api, api.alice), await totals(api, api.bob)
+    assert (alice.evaluation_count, alice.score_sum, alice.min_score, alice.max_score) == (1, 6, 6, 6)
+    assert (bob.evaluation_count, bob.score_sum, bob.min_score, bob.max_score) == (1, 5, 5, 5)
+
+    # Rebuilding from the evaluations gives the same totals
+    await EvaluationAggregateStore().rebuild()
+    for student, maintained in ((api.alice, alice), (api.bob, bob)):
+        rebuilt = await totals(api, student)
+        assert rebuilt.model_dump(exclude={"id"}) == maintained.model_dump(exclude={"id"})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_add_while_recomputing_bounds(api, monkeypatch):
+    store = EvaluationAggregateStore()
+    ids = [await evaluate(api, api.alice, score) for score in (6, 8)]
+    aggregate = Evaluation.aggregate
+    scans = []
+
+    class ScanThenAdd:
+        # An evaluation created after the bounds were scanned, counted before they are written
+        def __init__(self, pipeline):
+            self.pipeline = pipeline
+
+        async def to_list(self):
+            rows = await aggregate(self.pipeline).to_list()
+            scans.append(rows)
+            if len(scans) == 1:
+                await Evaluation(evaluator=Link(api.mentor, document_class=User),
+                                 student=Link(api.alice, document_class=User),
+                                 project=Link(api.project, document_class=Project), score=3, comment=None).insert()
+                await store.add(api.project.id, api.alice.id, 3)
+            return rows
+
+    monkeypatch.setattr(Evaluation, "aggregate", ScanThenAdd)
+    evaluation = await Evaluation.get(ids[0])
+    await evaluation.delete()
+    await store.remove(api.project.id, api.alice.id, 6)
+
+    # The stale scan is discarded and the bounds include the new score
+    assert len(scans) == 2
+    alice = await totals(api, api.alice)
+    assert (alice.evaluation_count, alice.min_score, alice.max_score) == (2, 3, 8)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_repairs_drift(api):
+    store = EvaluationAggregateStore()
+    await evaluate(api, api.alice, 6)
+    await evaluate(api, api.alice, 8)
+    collection = EvaluationAggregate.get_motor_collection()
+    # An add applied twice, totals left behind by a deleted evaluation,
+    # and an evaluation whose totals were never written
+    await store.add(api.project.id, api.alice.id, 8)
+    await store.add(api.project.id, api.mentor.id, 5)
+    await Evaluation(evaluator=Link(api.mentor, document_class=User), student=Link(api.bob, document_class=User),
+                     project=Link(api.project, document_class=Project), score=None, comment=None).insert()
+
+    await store.rebuild(api.project.id)
+    alice, bob = await totals(api, api.alice), await totals(api, api.bob)
+    assert (alice.evaluation_count, alice.score_sum, alice.min_score, alice.max_score) == (2, 14, 6, 8)
+    assert (bob.evaluation_count, bob.scored_count, bob.min_score) == (1, 0, None)
+    assert await totals(api, api.mentor) is None
+    assert await collection.count_documents({}) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_add_while_reconciling(api, monkeypatch):
+    store = EvaluationAggregateStore()
+    await Evaluation(evaluator=Link(api.mentor, document_class=User), student=Link(api.alice, document_class=User),
+                     project=Link(api.project, document_class=Project), score=6, comment=None).insert()
+    aggregate = Evaluation.aggregate
+    scans = []
+
+    class ScanThenAdd:
+        # An evaluation created and counted after its pair was scanned
+        def __init__(self, pipeline):
+            self.pipeline = pipeline
+
+        async def to_list(self):
+            rows = await aggregate(self.pipeline).to_list()
+            scans.append(rows)
+            if len(scans) == 1:
+                await evaluate(api, api.alice, 9)
+            return rows
+
+    monkeypatch.setattr(Evaluation, "aggregate", ScanThenAdd)
+    await store.reconcile(api.project.id, api.alice.id)
+
+    # The insert of the scanned totals lost to the add and the pair was scanned again
+    assert len(scans) == 2
+    alice = await totals(api, api.alice)
+    assert (alice.evaluation_count, alice.score_sum, alice.min_score, alice.max_score) == (2, 15, 6, 9)
+
+
+@pytest.mark.asyncio
+async def test_ensure_built_runs_once(api, monkeypatch):
+    await Evaluation(evaluator=Link(api.mentor, document_class=User), student=Link(api.alice, document_class=User),
+                     project=Link(api.project, document_class=Project), score=7, comment=None).insert()
+    rebuilds = []
+    rebuild = EvaluationAggregateStore.rebuild
+
+    async def counted(self, *args):
+        rebuilds.append(args)
+        await rebuild(self, *args)
+
+    monkeypatch.setattr(EvaluationAggregateStore, "rebuild", counted)
+    await asyncio.gather(*(EvaluationAggregateStore().ensure_built() for _ in range(3)))
+    await EvaluationAggregateStore().ensure_built()
+
+    assert rebuilds == [()]
+    assert (await totals(api, api.alice)).score_sum == 7
+    [build] = await EvaluationAggregateBuild.find_all().to_list()
+    assert build.finished_at is not None
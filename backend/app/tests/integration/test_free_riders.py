@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+import pytest
+from beanie import Link
+from models.free_rider import FreeRider
+from models.group_model import Group
+from models.project_model import Project
+from models.user_model import User
+from service.free_rider_service import save_free_riders, score_project
+from tests.mongo import mongo
+
+
+def new_user(name, email):
+    return User(HoDem="Nguyen", Ten=name, email=email, password="hash", role="student",
+                group_id=None, tasks=[], contributions=None, ho_ten=f"Nguyen {name}")
+
+
+def free_rider(group, user, score):
+    return FreeRider(score=score, user=user.to_ref(), group=group.to_ref(),
+                     commit_count=0, lines_added=0, lines_removed=0, files_modified=0)
+
+
+async def stored(group):
+    free_riders = await FreeRider.get_motor_collection().find({"group.$id": group.id}).to_list(None)
+    return sorted((fr["user"].id, fr["score"]) for fr in free_riders)
+
+
+@pytest.mark.asyncio
+async def test_save_free_riders_replaces_the_group_entries(mongo):
+    alice, bob = new_user("A", "a@example.com"), new_user("B", "b@example.com")
+    for user in (alice, bob):
+        await user.insert()
+    team, other = (Group(name=name, project=None, leaders=None, members=[], allTasks=[]) for name in ("Team 1", "Team 2"))
+    for group in (team, other):
+        await group.insert()
+
+    await save_free_riders(team, [free_rider(team, alice, 0.1), free_rider(team, bob, 0.15)])
+    await save_free_riders(other, [free_rider(other, bob, 0.05)])
+    assert await stored(team) == sorted([(alice.id, 0.1), (bob.id, 0.15)])
+
+    # Bob no longer qualifies, Alice is rescored in place
+    await save_free_riders(team, [free_rider(team, alice, 0.12)])
+    assert await stored(team) == [(alice.id, 0.12)]
+    await save_free_riders(team, [free_rider(team, alice, 0.12)])
+    assert await stored(team) == [(alice.id, 0.12)]
+    assert await stored(other) == [(bob.id, 0.05)]
+
+    await save_free_riders(team, [])
+    assert await stored(team) == []
+    assert await FreeRider.get_motor_collection().count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_score_project_with_a_member_without_ho_ten(mongo):
+    alice, bob = new_user("A", "a@example.com"), new_user("B", "b@example.com")
+    alice.github_user, bob.ho_ten = "alice", None
+    for user in (alice, bob):
+        await user.insert()
+    project = Project(title="ITSS", description=None, mentor=None, groups=[])
+    await project.insert()
+    group = Group(name="Team 1", project=Link(project, document_class=Project), leaders=Link(alice, document_class=User),
+                  members=[Link(user, document_class=User) for user in (alice, bob)], allTasks=[],
+                  github_link="https://github.com/octocat/project")
+    await group.insert()
+    project = await Project.get(project.id)
+    project.groups = [Link(group, document_class=Group)]
+    await project.save()
+
+    async def analyze_contributor_activity(reponame, username):
+        return [{"contributor": "alice", "commit_count": 3, "lines_added": 90, "lines_removed": 10,
+                 "files_modified": 4, "last_commit_date": None, "messages": ["Add login"]}]
+
+    github_service = SimpleNamespace(analyze_contributor_activity=analyze_contributor_activity)
+    ranking = await score_project(str(project.id), github_service)
+    assert {row["user"].email: row["user"].ho_ten for row in ranking} == {
+        "a@example.com": "Nguyen A", "b@example.com": "Nguyen B",
+    }
@@ -0,0 +1,82 @@
+import pytest
+from beanie import Link
+from bson import DBRef, ObjectId
+from models.group_model import Group, MemberSummary, ProjectSummary
+from models.project_model import Project
+from models.user_model import User
+from service.group_aggregation import get_group_detail
+from tests.mongo import mongo
+
+
+def new_user(name, email):
+    return User(HoDem="Nguyen", Ten=name, email=email, password="hash", role="student",
+                group_id=None, tasks=[], contributions=None, ho_ten=f"Nguyen {name}")
+
+
+async def fetch(link):
+    # Links stored as embedded copies load as documents, DBRefs as Links
+    document = await link.fetch() if isinstance(link, Link) else link
+    return None if isinstance(document, Link) else document
+
+
+async def fetch_group_detail(group_id):
+    """Group detail as get_group_by_group_id built it before the aggregation: one fetch per link."""
+    group = await Group.get(group_id)
+    project = await fetch(group.project)
+    leader = await fetch(group.leaders)
+    members = [await fetch(member) for member in group.members]
+    return {
+        "_id": group.id,
+        "name": group.name,
+        "github_link": group.github_link,
+        "project": ProjectSummary.from_project(project) if project else None,
+        "leader": MemberSummary.from_user(leader) if leader else None,
+        "members": [MemberSummary.from_user(member) for member in members if member],
+    }
+
+
+@pytest.mark.asyncio
+async def test_group_detail_matches_link_fetch(mongo):
+    alice, bob, carol = new_user("A", "a@example.com"), new_user("B", "b@example.com"), new_user("C", "c@example.com")
+    for user in (alice, bob, carol):
+        await user.insert()
+    project = Project(title="ITSS", description="Task tracker", mentor=None, groups=[])
+    await project.insert()
+    group = Group(
+        name="Team 1",
+        project=Link(project, document_class=Project),
+        leaders=Link(bob, document_class=User),
+        members=[Link(user, document_class=User) for user in (carol, alice, bob)],
+        allTasks=[],
+        github_link="https://github.com/vqdung71104/ITSS",
+    )
+    await group.insert()
+
+    detail = await get_group_detail(group.id)
+    assert detail == await fetch_group_detail(group.id)
+    # Members keep the order in which they were added
+    assert [member.id for member in detail["members"]] == [carol.id, alice.id, bob.id]
+
+
+@pytest.mark.asyncio
+async def test_group_detail_with_missing_refs(mongo):
+    alice = new_user("A", "a@example.com")
+    await alice.insert()
+    deleted_user, deleted_project = ObjectId(), ObjectId()
+    # Groups written as DBRefs whose project and leader were deleted since
+    result = await Group.get_motor_collection().insert_one({
+        "name": "Team 2",
+        "project": DBRef("projects", deleted_project),
+        "leaders": DBRef("users", deleted_user),
+        "members": [DBRef("users", alice.id), DBRef("users", deleted_user)],
+        "allTasks": [],
+        "github_link": None,
+    })
+
+    detail = await get_group_detail(result.inserted_id)
+    assert detail == await fetch_group_detail(result.inserted_id)
+    assert detail["project"] is None
+    assert detail["leader"] is None
+    assert detail["members"] == [MemberSummary.from_user(alice)]
+
+    assert await get_group_detail(ObjectId()) is None
@@ -0,0 +1,132 @@
+import httpx
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from beanie import Link
+from fastapi import FastAPI
+from models.group_model import Group, MemberSummary, ProjectSummary
+from models.project_model import Project
+from models.user_model import User
+from outh2 import get_current_user
+from routes import group_routes, user_routes
+from service.group_summaries import sync_project_summaries
+from tests.mongo import mongo
+
+
+def new_user(name, email):
+    return User(HoDem="Nguyen", Ten=name, email=email, password="hash", role="student",
+                group_id=None, tasks=[], contributions=None, ho_ten=f"Nguyen {name}")
+
+
+def new_group(name, project, leader, members, summaries=True):
+    group = Group(
+        name=name,
+        project=Link(project, document_class=Project),
+        leaders=Link(leader, document_class=User),
+        members=[Link(member, document_class=User) for member in members],
+        allTasks=[],
+    )
+    if summaries:
+        group.project_summary = ProjectSummary.from_project(project)
+        group.leader_summary = MemberSummary.from_user(leader)
+        group.member_summaries = [MemberSummary.from_user(member) for member in members]
+    return group
+
+
+@pytest_asyncio.fixture
+async def api(mongo):
+    alice, bob = new_user("A", "a@example.com"), new_user("B", "b@example.com")
+    for user in (alice, bob):
+        await user.insert()
+    project = Project(title="ITSS", description="Task tracker", mentor=None, groups=[])
+    await project.insert()
+
+    current = SimpleNamespace(user=alice)
+    app = FastAPI()
+    app.include_router(user_routes.router)
+    app.include_router(group_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: current.user
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield SimpleNamespace(http=http, current=current, alice=alice, bob=bob, project=project)
+
+
+@pytest.mark.asyncio
+async def test_renaming_a_user_updates_group_summaries(api):
+    led = new_group("Team 1", api.project, api.alice, [api.alice, api.bob])
+    joined = new_group("Team 2", api.project, api.bob, [api.bob, api.alice])
+    for group in (led, joined):
+        await group.insert()
+
+    response = await api.http.put("/users/me", json={"Ten": "Anh"})
+    assert response.status_code == 200
+    assert response.json()["ho_ten"] == "Nguyen Anh"
+
+    led, joined = await Group.get(led.id), await Group.get(joined.id)
+    assert led.leader_summary.ho_ten == "Nguyen Anh"
+    assert [member.ho_ten for member in led.member_summaries] == ["Nguyen Anh", "Nguyen B"]
+    assert joined.leader_summary.ho_ten == "Nguyen B"
+    assert [member.ho_ten for member in joined.member_summaries] == ["Nguyen B", "Nguyen Anh"]
+
+    response = await api.http.get(f"/groups/{joined.id}")
+    assert response.json()["member_names"] == ["Nguyen B", "Nguyen Anh"]
+
+
+@pytest.mark.asyncio
+async def test_renaming_a_project_updates_group_summaries(api):
+    group = new_group("Team 1", api.project, api.alice, [api.alice])
+    await group.insert()
+
+    api.project.title = "ITSS 2"
+    api.project.description = None
+    await api.project.save()
+    await sync_project_summaries(api.project)
+
+    group = await Group.get(group.id)
+    assert group.project_summary == ProjectSummary(id=api.project.id, title="ITSS 2", description=None)
+
+
+@pytest.mark.asyncio
+async def test_groups_without_summaries_read_their_links(api):
+    legacy = new_group("Legacy", api.project, api.bob, [api.bob, api.alice], summaries=False)
+    current = new_group("Current", api.project, api.alice, [api.alice])
+    for group in (legacy, current):
+        await group.insert()
+    assert not (await Group.get(legacy.id)).has_summaries()
+
+    response = await api.http.get(f"/groups/{legacy.id}")
+    assert response.status_code == 200
+    detail = response.json()
+    assert (detail["project_title"], detail["leader_name"]) == ("ITSS", "Nguyen B")
+    assert detail["member_emails"] == ["b@example.com", "a@example.com"]
+
+    response = await api.http.get("/groups/")
+    groups = {group["name"]: group for group in response.json()}
+    assert groups["Legacy"]["leader_email"] == "b@example.com"
+    assert [member["ho_ten"] for member in groups["Legacy"]["members"]] == ["Nguyen B", "Nguyen A"]
+    assert [member["ho_ten"] for member in groups["Current"]["members"]] == ["Nguyen A"]
+
+
+@pytest.mark.asyncio
+async def test_profile_update_ignores_nulls_and_hides_the_password(api):
+    response = await api.http.put("/users/me", json={"HoDem": None, "Ten": "Anh", "github_user": None})
+    assert response.status_code == 200
+    assert response.json() == {"ho_ten": "Nguyen Anh", "email": "a@example.com", "role": "student"}
+
+    alice = await User.get(api.alice.id)
+    assert (alice.HoDem, alice.Ten, alice.ho_ten) == ("Nguyen", "Anh", "Nguyen Anh")
+
+
+@pytest.mark.asyncio
+async def test_profile_update_keeps_the_student_in_their_group(api):
+    group = new_group("Team 1", api.project, api.alice, [api.alice])
+    await group.insert()
+    alice = await User.get(api.alice.id)
+    alice.group_id = Link(group, document_class=Group)
+    await alice.save()
+    api.current.user = await User.get(api.alice.id)
+
+    response = await api.http.put("/users/me", json={"github_user": "alice-gh"})
+    assert response.status_code == 200
+
+    response = await api.http.get(f"/users/students-by-group/{group.id}")
+    assert [student["email"] for student in response.json()] == ["a@example.com"]
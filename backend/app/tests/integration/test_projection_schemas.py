@@ -0,0 +1,154 @@
+import httpx
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from beanie import Link
+from bson import DBRef
+from fastapi import FastAPI
+from models.evaluation_model import Evaluation
+from models.group_model import Group, MemberSummary, ProjectSummary
+from models.project_model import Project
+from models.report_model import Report
+from models.task_model import Task
+from models.user_model import User
+from outh2 import get_current_user
+from routes import evaluation_routes, project_routes, report_routes, user_routes
+from schemas.projection_schemas import UserRefView
+from service.link_resolver import find_by_ids
+from tests.mongo import mongo
+
+
+def new_user(name, email, role="student"):
+    return User(HoDem="Nguyen", Ten=name, email=email, password="hash", role=role,
+                group_id=None, tasks=[], contributions=None, ho_ten=f"Nguyen {name}")
+
+
+@pytest_asyncio.fixture
+async def api(mongo):
+    mentor = new_user("M", "m@example.com", role="mentor")
+    alice, bob = new_user("A", "a@example.com"), new_user("B", "b@example.com")
+    for user in (mentor, alice, bob):
+        await user.insert()
+    project = Project(title="ITSS", description="Task tracker", mentor=Link(mentor, document_class=User), groups=[])
+    await project.insert()
+
+    app = FastAPI()
+    for routes in (user_routes, project_routes, report_routes, evaluation_routes):
+        app.include_router(routes.router)
+    app.dependency_overrides[get_current_user] = lambda: mentor
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield SimpleNamespace(http=http, mentor=mentor, alice=alice, bob=bob, project=project)
+
+
+@pytest.mark.asyncio
+async def test_find_by_ids_projects_and_skips_missing(api):
+    users = await find_by_ids(User, [api.alice.id, api.bob.id, api.project.id], UserRefView)
+    assert set(users) == {api.alice.id, api.bob.id}
+    assert users[api.alice.id] == UserRefView(_id=api.alice.id, ho_ten="Nguyen A", email="a@example.com", role="student")
+    assert await find_by_ids(User, []) == {}
+
+
+@pytest.mark.asyncio
+async def test_user_list_fields(api):
+    group = Group(name="Team 1", project=Link(api.project, document_class=Project),
+                  leaders=Link(api.alice, document_class=User), members=[], allTasks=[])
+    await group.insert()
+    alice = await User.get(api.alice.id)
+    alice.group_id = Link(group, document_class=Group)
+    await alice.save()
+
+    response = await api.http.get("/users/get-all")
+    users = {user["email"]: user for user in response.json()}
+    assert set(users) == {"a@example.com", "b@example.com"}
+    # Same fields as the unprojected list, without the password hash
+    assert users["a@example.com"] == {
+        "id": str(api.alice.id), "ho_ten": "Nguyen A", "email": "a@example.com", "role": "student",
+        "group_id": {"_id": str(group.id)},
+    }
+    assert users["b@example.com"]["group_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_report_and_evaluation_list_fields(api):
+    task = Task(title="Login page", description=None, group=None, assigned_students=[])
+    await task.insert()
+    report = Report(content="Done", title="Week 1", student=Link(api.alice, document_class=User),
+                    task=Link(task, document_class=Task))
+    await report.insert()
+    await Evaluation(evaluator=Link(api.mentor, document_class=User), student=Link(api.alice, document_class=User),
+                     project=Link(api.project, document_class=Project), score=8, comment="Good").insert()
+
+    response = await api.http.get("/reports/")
+    [listed] = response.json()
+    assert set(listed) == {"id", "title", "content", "task", "created_at"}
+    assert listed["task"] == {"id": str(task.id), "title": "Login page", "deadline": None}
+
+    response = await api.http.get("/evaluations/")
+    [listed] = response.json()
+    assert listed == {
+        "evaluator": {"id": str(api.mentor.id), "ho_ten": "Nguyen M", "email": "m@example.com"},
+        "student": {"id": str(api.alice.id), "ho_ten": "Nguyen A", "email": "a@example.com"},
+        "project": {"id": str(api.project.id), "title": "ITSS", "description": "Task tracker"},
+        "score": 8.0,
+        "comment": "Good",
+        "created_at": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_project_list_with_groups(api):
+    current = Group(
+        name="Team 1", project=Link(api.project, document_class=Project),
+        leaders=Link(api.alice, document_class=User), members=[Link(api.alice, document_class=User)], allTasks=[],
+        project_summary=ProjectSummary.from_project(api.project),
+        leader_summary=MemberSummary.from_user(api.alice),
+        member_summaries=[MemberSummary.from_user(api.alice)],
+    )
+    legacy = Group(
+        name="Team 2", project=Link(api.project, document_class=Project),
+        leaders=Link(api.bob, document_class=User), members=[Link(api.bob, document_class=User)], allTasks=[],
+    )
+    for group in (current, legacy):
+        await group.insert()
+    project = await Project.get(api.project.id)
+    project.groups = [Link(group, document_class=Group) for group in (current, legacy)]
+    await project.save()
+
+    # Projects with groups used to fail GroupResponse validation and answer 500
+    response = await api.http.get("/projects/")
+    assert response.status_code == 200
+    [project] = response.json()
+    assert project["mentor"] == {"ho_ten": "Nguyen M", "email": "m@example.com", "role": "mentor"}
+    groups = {group["name"]: group for group in project["groups"]}
+    for name, leader in (("Team 1", api.alice), ("Team 2", api.bob)):
+        assert groups[name]["project_title"] == "ITSS"
+        assert groups[name]["leader_id"] == str(leader.id)
+        assert groups[name]["leader_email"] == leader.email
+        assert groups[name]["member_names"] == [leader.ho_ten]
+
+
+@pytest.mark.asyncio
+async def test_students_by_group_with_either_link_form(api):
+    group = Group(name="Team 1", project=Link(api.project, document_class=Project),
+                  leaders=Link(api.alice, document_class=User), members=[], allTasks=[])
+    await group.insert()
+    carol = new_user("C", "c@example.com")
+    carol.group_id = Link(group, document_class=Group)
+    await carol.insert()
+    # Saving a loaded user again stores its group as a DBRef
+    bob = await User.get(api.bob.id)
+    bob.group_id = Link(group, document_class=Group)
+    await bob.save()
+    bob = await User.get(api.bob.id)
+    await bob.save()
+    stored = {user["email"]: user["group_id"] async for user in User.get_motor_collection().find({"group_id": {"$ne": None}})}
+    assert isinstance(stored["b@example.com"], DBRef)
+    assert stored["c@example.com"]["_id"] == group.id
+
+    response = await api.http.get(f"/users/students-by-group/{group.id}")
+    assert sorted(student["email"] for student in response.json()) == ["b@example.com", "c@example.com"]
+
+    response = await api.http.get("/users/get-all")
+    assert {user["email"]: user["group_id"] for user in response.json()} == {
+        "a@example.com": None, "b@example.com": {"_id": str(group.id)}, "c@example.com": {"_id": str(group.id)},
+    }
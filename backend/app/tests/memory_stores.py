@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+from service.github_analysis import new_contributor, only_contributors
+
+# In-memory stand-ins for the Mongo-backed stores
+
+
+class MemoryStatsStore:
+    def __init__(self):
+        self.stats = {}
+
+    async def get_many(self, repo, shas):
+        return {sha: self.stats[(repo, sha)] for sha in shas if (repo, sha) in self.stats}
+
+    async def save_many(self, repo, stats):
+        for sha, commit_stats in stats.items():
+            self.stats.setdefault((repo, sha), commit_stats)
+
+
+class MemoryActivityStore:
+    def __init__(self):
+        self.cursor = None
+        self.aggregates = {}
+
+    async def get_cursor(self, repo):
+        return self.cursor
+
+    async def apply(self, repo, aggregates, cursor, previous):
+        if self.cursor != previous:
+            return False
+        for author, delta in aggregates.items():
+            total = self.aggregates.setdefault(author, new_contributor(author))
+            total["messages"] = delta["messages"] + total["messages"]
+            for field in ("commit_count", "lines_added", "lines_removed", "files_modified"):
+                total[field] += delta[field]
+            total["last_commit_date"] = max(filter(None, [total["last_commit_date"], delta["last_commit_date"]]), default=None)
+        self.cursor = cursor
+        return True
+
+    async def get_contributors(self, repo):
+        return only_contributors(self.aggregates.values())
+
+    async def reset(self, repo):
+        self.cursor = None
+        self.aggregates = {}
+
+
+class MemoryJobStore:
+    def __init__(self):
+        self.jobs = {}
+
+    async def create(self, job_id, kind, key, params, owner, lease_expires_at):
+        await asyncio.sleep(0)
+        self.jobs[job_id] = SimpleNamespace(id=job_id, kind=kind, key=key, params=params, status="queued",
+                                            result=None, error=None, owner=owner, lease_expires_at=lease_expires_at)
+        return self.jobs[job_id]
+
+    async def update(self, job_id, **fields):
+        vars(self.jobs[job_id]).update(fields)
+
+    async def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def unfinished(self):
+        return [job for job in self.jobs.values() if job.status in ("queued", "running")]
+
+    async def renew_leases(self, owner, lease_expires_at):
+        for job in self.unfinished():
+            if job.owner == owner:
+                job.lease_expires_at = lease_expires_at
+
+    async def fail_expired(self, now):
+        for job in self.unfinished():
+            if job.lease_expires_at is None or job.lease_expires_at < now:
+                job.status, job.error = "failed", "Interrupted by a server restart"
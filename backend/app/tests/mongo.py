@@ -0,0 +1,29 @@
+import os
+import uuid
+import pytest
+import pytest_asyncio
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import ServerSelectionTimeoutError
+from database import DOCUMENT_MODELS
+
+MONGO_TEST_URI = os.environ.get("MONGO_TEST_URI", "mongodb://localhost:27017")
+
+
+@pytest_asyncio.fixture
+async def mongo():
+    """A fresh database with every document model initialized, dropped after the test.
+
+    The test is skipped when no MongoDB server answers at ``MONGO_TEST_URI``.
+    """
+    client = AsyncIOMotorClient(MONGO_TEST_URI, serverSelectionTimeoutMS=1000)
+    try:
+        await client.admin.command("ping")
+    except ServerSelectionTimeoutError:
+        client.close()
+        pytest.skip(f"No MongoDB server at {MONGO_TEST_URI}")
+    db = client[f"test_{uuid.uuid4().hex}"]
+    await init_beanie(database=db, document_models=DOCUMENT_MODELS)
+    yield db
+    await client.drop_database(db.name)
+    client.close()
@@ -0,0 +1,55 @@
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from beanie.odm.fields import IndexModelField
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from database import check_indexes
+
+
+class FakeCollection:
+    def __init__(self, name, indexes, accesses=None, fail=False):
+        self.name = name
+        self.indexes = indexes
+        self.accesses = accesses or {}
+        self.fail = fail
+
+    async def index_information(self):
+        return {name: {} for name in self.indexes}
+
+    async def aggregate(self, pipeline):
+        assert pipeline == [{"$indexStats": {}}]
+        if self.fail:
+            raise OperationFailure("not authorized on test to execute command { aggregate: ... }")
+        for name in self.indexes:
+            yield {"name": name, "accesses": {"ops": self.accesses.get(name, 0), "since": datetime(2026, 1, 1)}}
+
+
+def model(collection, *index_names):
+    # Beanie validates the declared IndexModels into IndexModelFields
+    indexes = [IndexModelField(IndexModel([(name, ASCENDING)], name=name)) for name in index_names]
+    return SimpleNamespace(
+        get_motor_collection=lambda: collection,
+        get_settings=lambda: SimpleNamespace(indexes=indexes),
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_indexes_reports_missing_and_unused(caplog):
+    users = FakeCollection("users", ["_id_", "email_unique", "role_group"], accesses={"email_unique": 12})
+    groups = FakeCollection("groups", ["_id_"], fail=True)
+    with caplog.at_level(logging.INFO):
+        await check_indexes([
+            model(users, "email_unique", "role_group", "github_user"),
+            model(groups, "member_summaries"),
+        ])
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert "Missing index github_user on users" in messages
+    assert "Unused index role_group on users since 2026-01-01 00:00:00" in messages
+    # Used indexes and _id_ are not reported
+    assert not any("email_unique" in message or "_id_" in message for message in messages)
+    # A failed check is reported without stopping the other collections
+    assert "Missing index member_summaries on groups" in messages
+    assert any(message.startswith("Could not check indexes on groups") for message in messages)
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from bson import DBRef, ObjectId
+from beanie import Link
+from service.document_loader import DocumentLoader
+
+
+class FakeQuery:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self):
+        return self.documents
+
+
+class FakeUser:
+    store = {}
+    queries = []
+
+    @classmethod
+    def find(cls, query, with_children=False):
+        cls.queries.append(query)
+        ids = query["_id"]["$in"]
+        return FakeQuery([cls.store[i] for i in ids if i in cls.store])
+
+
+@pytest.fixture
+def users():
+    ids = [ObjectId() for _ in range(3)]
+    FakeUser.store = {i: SimpleNamespace(id=i) for i in ids}
+    FakeUser.queries = []
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced(users):
+    loader = DocumentLoader()
+    links = [Link(DBRef("User", i), document_class=FakeUser) for i in users]
+
+    first, members = await asyncio.gather(
+        loader.get(FakeUser, users[0]),
+        loader.fetch_many(links + links),
+    )
+
+    assert len(FakeUser.queries) == 1
+    assert sorted(FakeUser.queries[0]["_id"]["$in"]) == sorted(users)
+    assert members[0] is first
+    assert [m.id for m in members] == users + users
+
+
+@pytest.mark.asyncio
+async def test_results_and_misses_are_cached(users):
+    loader = DocumentLoader()
+    missing = ObjectId()
+
+    assert await loader.get(FakeUser, str(users[1])) is FakeUser.store[users[1]]
+    assert await loader.get(FakeUser, missing) is None
+    assert await loader.get(FakeUser, users[1]) is FakeUser.store[users[1]]
+    assert await loader.get(FakeUser, missing) is None
+    assert len(FakeUser.queries) == 2
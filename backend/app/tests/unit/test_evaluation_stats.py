@@ -0,0 +1,39 @@
+import pytest
+from service.evaluation_stats import empty_stats, summarize
+
+
+def totals(scores):
+    scored = [score for score in scores if score is not None]
+    return {
+        "evaluation_count": len(scores),
+        "scored_count": len(scored),
+        "score_sum": sum(scored),
+        "score_sumsq": sum(score * score for score in scored),
+        "min_score": min(scored, default=None),
+        "max_score": max(scored, default=None),
+    }
+
+
+def test_summarize():
+    stats = summarize(totals([0.5, 1.0, None]))
+    # Unscored evaluations lower the average but not the spread
+    assert stats["avg"] == pytest.approx(0.5)
+    assert stats["count"] == 3
+    assert (stats["min"], stats["max"]) == (0.5, 1.0)
+    assert stats["stddev"] == pytest.approx(0.25)
+
+
+def test_summarize_after_retraction():
+    running = totals([0.3, 0.7, 0.9])
+    # Retract 0.9 the way EvaluationAggregateStore.remove does
+    for field, delta in (("evaluation_count", -1), ("scored_count", -1), ("score_sum", -0.9), ("score_sumsq", -0.81)):
+        running[field] += delta
+    expected = summarize(totals([0.3, 0.7]))
+    stats = summarize(running)
+    assert stats["avg"] == pytest.approx(expected["avg"])
+    assert stats["stddev"] == pytest.approx(expected["stddev"])
+
+
+def test_summarize_empty():
+    assert summarize(totals([])) == empty_stats()
+    assert summarize(totals([None]))["stddev"] is None
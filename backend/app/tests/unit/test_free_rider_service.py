@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from service.free_rider_service import repo_of, score_student, score_students
+
+
+def test_score_students_matches_score_student():
+    # Two repositories: LOC ranges 10..110 and 50..50 (all contributors equal)
+    loc = np.array([10, 60, 110, 50, 0], dtype=float)
+    min_loc = np.array([10, 10, 10, 50, 50], dtype=float)
+    max_loc = np.array([110, 110, 110, 50, 50], dtype=float)
+    has_data = np.array([True, True, True, True, False])
+    avg_score = np.array([0.5, 1.0, 0.0, 0.9, 0.9])
+
+    scores = score_students(loc, min_loc, max_loc, has_data, avg_score)
+
+    expected = [
+        score_student({"loc": l} if data else None, avg, int(lo), int(hi))
+        for l, lo, hi, data, avg in zip(loc, min_loc, max_loc, has_data, avg_score)
+    ]
+    assert scores.tolist() == pytest.approx(expected)
+    assert scores.tolist() == pytest.approx([0.4, 0.9, 0.2, 0.72, 0.0])
+
+
+def test_repo_of():
+    assert repo_of("https://github.com/vqdung71104/ITSS") == ("vqdung71104", "ITSS")
+    assert repo_of("https://github.com/vqdung71104/ITSS/") == ("vqdung71104", "ITSS")
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import pytest
+from service.git_log_analysis import analyze_local_repository, clone_path, clone_repository
+
+
+def git(repo, *args, author="Alice", date="2024-03-01T10:00:00+00:00"):
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": author, "GIT_AUTHOR_EMAIL": "dev@example.com", "GIT_AUTHOR_DATE": date,
+        "GIT_COMMITTER_NAME": author, "GIT_COMMITTER_EMAIL": "dev@example.com", "GIT_COMMITTER_DATE": date,
+    }
+    subprocess.run(["git", *args], cwd=repo, env=env, check=True, capture_output=True)
+
+
+def commit(repo, files, message, **kwargs):
+    for name, content in files.items():
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with open(os.path.join(repo, name), mode) as f:
+            f.write(content)
+    git(repo, "add", *files)
+    git(repo, "commit", "-q", "-m", message, **kwargs)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = str(tmp_path / "project")
+    os.makedirs(path)
+    git(path, "init", "-q", "-b", "main")
+    commit(path, {"a.py": "1\n2\n3\n", "logo.png": b"\x89PNG\x00\x01"}, "Initial commit")
+    git(path, "checkout", "-q", "-b", "login")
+    commit(path, {"login.py": "x\ny\n"}, "Add login\n\nWith a body", author="Vu Quang Dung",
+           date="2024-03-02T17:00:00+07:00")
+    git(path, "checkout", "-q", "main")
+    commit(path, {"README.md": "readme\n"}, "Update README.md", author="Carol", date="2024-03-03T10:00:00+00:00")
+    git(path, "merge", "-q", "--no-ff", "-m", "Merge branch 'login'", "login", date="2024-03-04T10:00:00+00:00")
+    commit(path, {"login.py": "x\nz\n"}, "Fix login", date="2024-03-05T10:00:00+00:00")
+    return path
+
+
+@pytest.mark.asyncio
+async def test_analyze_local_repository(repo):
+    contributors = {c["contributor"]: c for c in await analyze_local_repository(repo)}
+
+    # Carol only authored an "Update" commit, the author map renames Dung
+    assert set(contributors) == {"Alice", "vqdung71104"}
+
+    alice = contributors["Alice"]
+    assert alice["commit_count"] == 3
+    assert alice["messages"] == ["Fix login", "Initial commit"]
+    # The merge counts the lines it brings in from the login branch; binary files count no lines
+    assert (alice["lines_added"], alice["lines_removed"], alice["files_modified"]) == (6, 1, 4)
+    assert alice["last_commit_date"] == "2024-03-05T10:00:00+00:00"
+
+    dung = contributors["vqdung71104"]
+    assert dung["messages"] == ["Add login\n\nWith a body"]
+    assert (dung["lines_added"], dung["files_modified"]) == (2, 1)
+    assert dung["last_commit_date"] == "2024-03-02T10:00:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_clone_then_fetch_new_commits(repo, tmp_path):
+    clone = str(tmp_path / "clones" / "project.git")
+    await clone_repository(repo, clone)
+    assert {c["contributor"] for c in await analyze_local_repository(clone)} == {"Alice", "vqdung71104"}
+
+    commit(repo, {"docs.md": "docs\n"}, "Add docs", author="Carol", date="2024-03-06T10:00:00+00:00")
+    await clone_repository(repo, clone)
+
+    contributors = {c["contributor"]: c for c in await analyze_local_repository(clone)}
+    assert contributors["Carol"]["commit_count"] == 2
+    assert contributors["Carol"]["lines_added"] == 2
+
+
+def test_clone_path_stays_in_clone_dir(tmp_path):
+    root = os.path.realpath(tmp_path)
+    assert clone_path(str(tmp_path), "Octocat/Hello-World.js") == os.path.join(root, "octocat", "hello-world.js.git")
+    for name in ("../../../srv/repo", "octocat/..", "./repo", "octocat", "octocat/repo/x", "octo cat/repo", ""):
+        with pytest.raises(ValueError):
+            clone_path(str(tmp_path), name)
+
+    os.symlink(tmp_path.parent, tmp_path / "elsewhere")
+    with pytest.raises(ValueError):
+        clone_path(str(tmp_path), "elsewhere/repo")
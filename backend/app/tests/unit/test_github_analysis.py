@@ -0,0 +1,116 @@
+import pytest
+from service.github_client import GitHubClient
+from service.github_analysis import (
+    aggregate_commits, commit_author, get_commit_stats, is_counted_message, only_contributors, resolve_repo_name,
+    sync_repository,
+)
+from tests.fake_github import FakeGitHub
+from tests.memory_stores import MemoryActivityStore, MemoryStatsStore
+
+REPO = "octocat/project"
+
+
+async def analyze_contributors(client, full_name, store=None):
+    """Reference for sync_repository: the contributors of the whole history, walked in one pass."""
+    commits = [commit async for commit in client.paginate(f"/repos/{full_name}/commits")]
+    # Only the commits of contributors need their stats
+    authors = {commit_author(c) for c in commits if is_counted_message(c["commit"]["message"])}
+    authors.discard(None)
+    commits = [c for c in commits if commit_author(c) in authors]
+    stats = await get_commit_stats(client, full_name, [c["sha"] for c in commits], store)
+    return only_contributors(list(aggregate_commits(commits, stats).values()))
+
+
+@pytest.fixture
+def github():
+    github = FakeGitHub(stats_delay=0.02)
+    github.add_commit(REPO, "a1", "Alice", "Initial commit", "2024-03-01T10:00:00Z", 100, 0, 3)
+    github.add_commit(REPO, "b1", "Vu Quang Dung", "Add login", "2024-03-02T10:00:00Z", 40, 5, 2)
+    github.add_commit(REPO, "a2", "Alice", "Merge branch 'login'", "2024-03-03T10:00:00Z", 0, 0, 0)
+    github.add_commit(REPO, "c1", "Carol", "Update README.md", "2024-03-04T10:00:00Z", 1, 1, 1)
+    github.add_commit(REPO, "a3", "Alice", "Fix login", "2024-03-05T10:00:00Z", 10, 2, 1)
+    with github.serve() as base_url:
+        github.base_url = base_url
+        yield github
+
+
+@pytest.mark.asyncio
+async def test_analyze_contributors(github):
+    async with GitHubClient(base_url=github.base_url, max_concurrency=4) as client:
+        contributors = await analyze_contributors(client, REPO)
+
+    by_name = {c["contributor"]: c for c in contributors}
+    # Carol only authored an "Update" commit, the author map renames Dung
+    assert set(by_name) == {"Alice", "vqdung71104"}
+
+    alice = by_name["Alice"]
+    assert alice["commit_count"] == 3
+    assert alice["messages"] == ["Fix login", "Initial commit"]
+    assert (alice["lines_added"], alice["lines_removed"], alice["files_modified"]) == (110, 2, 4)
+    assert alice["last_commit_date"] == "2024-03-05T10:00:00+00:00"
+    assert by_name["vqdung71104"]["lines_added"] == 40
+
+
+@pytest.mark.asyncio
+async def test_commit_list_walked_once_and_stats_fetched_concurrently(github):
+    for i in range(250):
+        github.add_commit(REPO, f"x{i}", "Bob", f"Commit {i}", "2024-04-01T10:00:00Z", 1, 0, 1)
+
+    async with GitHubClient(base_url=github.base_url, max_concurrency=5) as client:
+        contributors = await analyze_contributors(client, REPO)
+
+    assert next(c for c in contributors if c["contributor"] == "Bob")["commit_count"] == 250
+    # 254 commits at 100 per page
+    assert github.count(f"/repos/{REPO}/commits") - github.count(f"/repos/{REPO}/commits/") == 3
+    assert github.count(f"/repos/{REPO}/commits/") == 254
+    assert 1 < github.max_in_flight <= 5
+
+
+@pytest.mark.asyncio
+async def test_resolve_repo_name_defaults_to_authenticated_user(github):
+    async with GitHubClient(base_url=github.base_url) as client:
+        assert await resolve_repo_name(client, "project") == REPO
+        assert await resolve_repo_name(client, "project", "someone") == "someone/project"
+
+
+@pytest.mark.asyncio
+async def test_stats_fetched_only_for_unseen_commits(github):
+    store = MemoryStatsStore()
+    async with GitHubClient(base_url=github.base_url) as client:
+        first = await analyze_contributors(client, REPO, store)
+        assert github.count(f"/repos/{REPO}/commits/") == 4
+
+        second = await analyze_contributors(client, REPO, store)
+        assert github.count(f"/repos/{REPO}/commits/") == 4
+
+        github.add_commit(REPO, "a4", "Alice", "Add tests", "2024-03-06T10:00:00Z", 30, 0, 2)
+        third = await analyze_contributors(client, REPO, store)
+        assert github.count(f"/repos/{REPO}/commits/") == 5
+
+    assert first == second
+    alice = next(c for c in third if c["contributor"] == "Alice")
+    assert alice["lines_added"] == 140
+
+
+@pytest.mark.asyncio
+async def test_sync_ingests_only_new_commits(github):
+    activity = MemoryActivityStore()
+    async with GitHubClient(base_url=github.base_url) as client:
+        assert await sync_repository(client, REPO, activity) == 5
+        assert await sync_repository(client, REPO, activity) == 0
+        # Carol's "Update" commit is kept in case she contributes later
+        assert github.count(f"/repos/{REPO}/commits/") == 5
+
+        # Carol becomes a contributor; a commit at the cursor date is not skipped
+        github.add_commit(REPO, "c2", "Carol", "Add docs", "2024-03-05T10:00:00Z", 7, 0, 1)
+        github.add_commit(REPO, "a4", "Alice", "Add tests", "2024-03-06T10:00:00Z", 30, 0, 2)
+        assert await sync_repository(client, REPO, activity) == 2
+        assert github.count(f"/repos/{REPO}/commits/") == 7
+
+        full = await analyze_contributors(client, REPO)
+
+    synced = {c["contributor"]: c for c in await activity.get_contributors(REPO)}
+    assert synced == {c["contributor"]: c for c in full}
+    assert synced["Carol"]["commit_count"] == 2
+    assert synced["Alice"]["last_commit_date"] == "2024-03-06T10:00:00+00:00"
+    assert activity.cursor["shas"] == ["a4"]
@@ -0,0 +1,77 @@
+import asyncio
+import time
+import pytest
+from service.github_client import GitHubClient
+from service.github_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, GitHubScheduler, github_priority
+from tests.fake_github import FakeGitHub
+
+
+@pytest.fixture
+def github():
+    github = FakeGitHub(rate_limit=3, reset_after=1)
+    with github.serve() as base_url:
+        github.base_url = base_url
+        yield github
+
+
+@pytest.mark.asyncio
+async def test_requests_spread_over_token_pool_and_wait_for_reset(github):
+    async with GitHubClient(["token-a", "token-b"], base_url=github.base_url, max_concurrency=1) as client:
+        for _ in range(6):
+            await client.get_json("/user")
+        assert sorted(github.tokens) == ["token-a"] * 3 + ["token-b"] * 3
+
+        metrics = client.scheduler.metrics()
+        assert [token["remaining"] for token in metrics["tokens"]] == [0, 0]
+        assert [token["token"] for token in metrics["tokens"]] == ["...en-a", "...en-b"]
+
+        # Both tokens are exhausted: the next request waits for the reset
+        # instead of being rejected
+        reset_at = min(token["reset_at"] for token in metrics["tokens"])
+        assert (await client.get_json("/user"))["login"] == "octocat"
+        assert time.time() >= reset_at
+
+    assert github.rejected == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_is_retried_after_reset(github):
+    # Another process used up the token, this client has not seen its quota yet
+    async with GitHubClient(["token-a"], base_url=github.base_url) as other:
+        for _ in range(3):
+            await other.get_json("/user")
+
+    async with GitHubClient(["token-a"], base_url=github.base_url) as client:
+        assert (await client.get_json("/user"))["login"] == "octocat"
+        assert client.scheduler.metrics()["throttled"] == 1
+
+    assert github.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_requests_served_by_priority():
+    scheduler = GitHubScheduler(["token"], max_concurrency=1)
+    held = await scheduler.acquire()
+    order = []
+
+    async def request(name, priority=None):
+        quota = await scheduler.acquire(priority)
+        order.append(name)
+        await scheduler.release(quota)
+
+    tasks = [asyncio.create_task(request("background", PRIORITY_BACKGROUND))]
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(request("cancelled", PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0)
+    with github_priority(PRIORITY_INTERACTIVE):
+        tasks.append(asyncio.create_task(request("interactive")))
+    await asyncio.sleep(0)
+    assert scheduler.metrics()["queued"] == 3
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    await scheduler.release(held)
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive", "background"]
+    assert scheduler.metrics()["queued"] == 0
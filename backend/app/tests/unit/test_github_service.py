@@ -0,0 +1,92 @@
+import os
+import pytest
+from fastapi import HTTPException
+from config import env
+from service.github_client import GitHubClient
+from service.github_service import GitHubService
+from tests.fake_github import FakeGitHub
+
+
+@pytest.fixture
+def github():
+    github = FakeGitHub(rate_limit=100)
+    github.users["alice"] = {"login": "alice", "id": 1, "name": "Alice", "created_at": "2020-01-01T00:00:00Z"}
+    github.users["bob"] = {"login": "bob", "id": 2, "name": "Bob"}
+    github.add_commit("alice/project", "a1", "Alice", "Initial commit", "2024-03-01T10:00:00Z")
+    github.contributors["alice/project"] = [
+        {"login": "alice", "contributions": 3, "html_url": "https://github.com/alice"},
+        {"login": "bob", "contributions": 1, "html_url": "https://github.com/bob"},
+    ]
+    with github.serve() as base_url:
+        github.base_url = base_url
+        yield github
+
+
+@pytest.mark.asyncio
+async def test_unchanged_resources_served_from_conditional_cache(github):
+    async with GitHubClient(["token"], base_url=github.base_url) as client:
+        service = GitHubService(client)
+
+        first = await service.get_repo_contributors("project", "alice")
+        assert [(c["login"], c["name"]) for c in first] == [("alice", "Alice"), ("bob", "Bob")]
+        remaining = client.scheduler.quotas[0].remaining
+
+        assert await service.get_repo_contributors("project", "alice") == first
+        assert github.not_modified == 3
+        assert client.scheduler.quotas[0].remaining == remaining
+
+        github.users["bob"]["name"] = "Robert"
+        contributors = await service.get_repo_contributors("project", "alice")
+        assert contributors[1]["name"] == "Robert"
+        assert github.not_modified == 5
+
+
+@pytest.mark.asyncio
+async def test_user_info_and_repositories(github):
+    async with GitHubClient(["token"], base_url=github.base_url) as client:
+        service = GitHubService(client)
+        info = await service.get_user_info("alice")
+        assert info["created_at"] == "2020-01-01T00:00:00+00:00"
+        assert info == await service.get_user_info("alice")
+
+        repos = await service.get_user_repositories("alice")
+        assert [repo["full_name"] for repo in repos] == ["alice/project"]
+        assert await service.get_user_repositories("alice") == repos
+
+    assert github.not_modified == 2
+    assert service.http_cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_analysis_rejects_names_outside_the_clone_dir(github, tmp_path, monkeypatch):
+    monkeypatch.setattr(env, "GIT_CLONE_DIR", str(tmp_path / "clones"))
+    async with GitHubClient(["token"], base_url=github.base_url) as client:
+        service = GitHubService(client)
+        for username, repo_name in (("../../../srv", "project"), ("alice", "..")):
+            with pytest.raises(HTTPException) as error:
+                await service.analyze_contributor_activity(repo_name, username, backend="git")
+            assert error.value.status_code == 400
+            assert "Invalid repository name" in error.value.detail
+
+        with pytest.raises(HTTPException) as error:
+            await service.analyze_clone("../srv")
+        assert error.value.status_code == 400
+
+    assert not os.path.exists(tmp_path / "clones")
+    assert not os.path.exists(tmp_path / "srv.git")
+
+
+@pytest.mark.asyncio
+async def test_repo_commits_read_through_the_shared_client(github):
+    for number in range(2, 106):
+        github.add_commit("alice/project", f"c{number}", "Bob", f"Change {number}", "2024-03-02T10:00:00Z")
+    github.add_commit("alice/project", "m1", "Alice", "Merge branch 'login'", "2024-06-01T10:00:00Z")
+    async with GitHubClient(["token"], base_url=github.base_url) as client:
+        commits = await GitHubService(client).get_repo_commits("project", "alice")
+        # Two pages of 100, counted against the token pool's quota
+        assert github.count("/repos/alice/project/commits") == 2
+        assert client.scheduler.quotas[0].remaining == 98
+
+    assert len(commits) == 105
+    assert commits[0] == {"sha": "c105", "message": "Change 105", "author": "Bob", "date": "2024-03-02T10:00:00+00:00"}
+    assert commits[-1]["message"] == "Initial commit"
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import httpx
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from fastapi import FastAPI
+from config import env
+from routes import github_routes
+from service.github_client import GitHubClient
+from service.github_service import GitHubService, get_github_service
+from service.job_queue import JobQueue, get_job_queue
+from tests.fake_github import FakeGitHub
+from tests.memory_stores import MemoryActivityStore, MemoryJobStore, MemoryStatsStore
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "fixtures", "github")
+SECRET = "webhook-secret"
+REPO = "octocat/project"
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def signed(body, event="push", secret=SECRET):
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return {"X-GitHub-Event": event, "X-Hub-Signature-256": signature, "Content-Type": "application/json"}
+
+
+@pytest.fixture
+def github():
+    github = FakeGitHub()
+    github.add_commit(REPO, "a1", "Alice", "Initial commit", "2024-03-01T10:00:00Z", 100, 0, 3)
+    github.add_commit(REPO, "b1", "Vu Quang Dung", "Add login", "2024-03-02T10:00:00Z", 40, 5, 2)
+    github.add_commit(REPO, "a3", "Alice", "Fix login", "2024-03-05T10:00:00Z", 10, 2, 1)
+    with github.serve() as base_url:
+        github.base_url = base_url
+        yield github
+
+
+@pytest_asyncio.fixture
+async def api(github, monkeypatch):
+    monkeypatch.setattr(env, "GITHUB_WEBHOOK_SECRET", SECRET)
+    client = GitHubClient(base_url=github.base_url)
+    service = GitHubService(client)
+    service.contributor_activity = MemoryActivityStore()
+    service.commit_stats = MemoryStatsStore()
+    queue = JobQueue(MemoryJobStore(), workers=1)
+    await queue.start()
+
+    app = FastAPI()
+    app.include_router(github_routes.router)
+    app.dependency_overrides[get_github_service] = lambda: service
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield SimpleNamespace(http=http, service=service, queue=queue)
+
+    await queue.stop()
+    await client.aclose()
+
+
+def contributors(api):
+    return {c["contributor"]: c for c in api.service.contributor_activity.aggregates.values()}
+
+
+@pytest.mark.asyncio
+async def test_push_updates_contributor_aggregates(api, github):
+    await api.service.sync_contributor_activity(REPO)
+    github.add_commit(REPO, "a4", "Alice", "Add tests", "2024-03-06T10:00:00Z", 30, 0, 2)
+    github.add_commit(REPO, "b2", "Vu Quang Dung", "Add logout", "2024-03-07T10:00:00Z", 8, 0, 1)
+    stats_requests = github.count(f"/repos/{REPO}/commits/")
+
+    body = load("push.json")
+    response = await api.http.post("/github/webhook", content=body, headers=signed(body))
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    await api.queue.queue.join()
+
+    # Only the two pushed commits were fetched
+    assert github.count(f"/repos/{REPO}/commits/") == stats_requests + 2
+    assert contributors(api)["Alice"]["commit_count"] == 3
+    assert contributors(api)["Alice"]["lines_added"] == 140
+    assert contributors(api)["vqdung71104"]["messages"] == ["Add logout", "Add login"]
+    assert api.service.contributor_activity.cursor["shas"] == ["b2"]
+
+
+@pytest.mark.asyncio
+async def test_forced_push_rebuilds_aggregates(api, github):
+    await api.service.sync_contributor_activity(REPO)
+    # History rewritten: Dung's commit squashed away
+    github.repos[REPO] = [c for c in github.repos[REPO] if c["sha"] != "b1"]
+
+    body = json.dumps({**json.loads(load("push.json")), "forced": True}).encode()
+    response = await api.http.post("/github/webhook", content=body, headers=signed(body))
+    assert response.json()["status"] == "queued"
+    await api.queue.queue.join()
+
+    assert set(contributors(api)) == {"Alice"}
+
+
+@pytest.mark.asyncio
+async def test_invalid_signature_rejected(api):
+    body = load("push.json")
+    response = await api.http.post("/github/webhook", content=body, headers=signed(body, secret="wrong"))
+    assert response.status_code == 401
+
+    response = await api.http.post("/github/webhook", content=body, headers={"X-GitHub-Event": "push"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_ping_and_ignored_pushes(api):
+    body = load("ping.json")
+    response = await api.http.post("/github/webhook", content=body, headers=signed(body, event="ping"))
+    assert response.json() == {"status": "pong"}
+
+    # The repository was never analyzed
+    body = load("push.json")
+    response = await api.http.post("/github/webhook", content=body, headers=signed(body))
+    assert response.json() == {"status": "ignored", "reason": "Repository is not tracked"}
+
+    body = json.dumps({**json.loads(load("push.json")), "ref": "refs/heads/feature"}).encode()
+    response = await api.http.post("/github/webhook", content=body, headers=signed(body))
+    assert response.json()["status"] == "ignored"
+    assert api.queue.store.jobs == {}
+
+
+@pytest.mark.asyncio
+async def test_forced_push_during_a_sync(api, github):
+    await api.service.sync_contributor_activity(REPO)
+    github.add_commit(REPO, "a4", "Alice", "Add tests", "2024-03-06T10:00:00Z", 30, 0, 2)
+    # The sync is still fetching the stats of the new commit when the forced push lands
+    github.stats_delay = 0.2
+    running = asyncio.create_task(api.service.sync_contributor_activity(REPO))
+    await asyncio.sleep(0.1)
+
+    github.repos[REPO] = [c for c in github.repos[REPO] if c["sha"] != "b1"]
+    body = json.dumps({**json.loads(load("push.json")), "forced": True}).encode()
+    response = await api.http.post("/github/webhook", content=body, headers=signed(body))
+    assert response.json()["status"] == "queued"
+    assert await running == 1
+    await api.queue.queue.join()
+
+    # Rebuilt from the rewritten history, the running sync's commit counted once
+    assert set(contributors(api)) == {"Alice"}
+    assert contributors(api)["Alice"]["commit_count"] == 3
+    assert contributors(api)["Alice"]["lines_added"] == 140
+    assert api.service.contributor_activity.cursor["shas"] == ["a4"]
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from fastapi import HTTPException
+from service.job_queue import JobQueue
+from tests.memory_stores import MemoryJobStore
+
+
+@pytest_asyncio.fixture
+async def queue():
+    queue = JobQueue(MemoryJobStore(), workers=2)
+    await queue.start()
+    yield queue
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_for_same_key_coalesce(queue):
+    release = asyncio.Event()
+    runs = []
+
+    async def analyze(repo):
+        runs.append(repo)
+        await release.wait()
+        return {"repo": repo}
+
+    ids = await asyncio.gather(*(
+        queue.submit("analysis", "octocat/project", lambda: analyze("octocat/project"), {"repo": "octocat/project"})
+        for _ in range(5)
+    ))
+    assert len(set(ids)) == 1
+
+    release.set()
+    await queue.queue.join()
+    job = await queue.store.get(ids[0])
+    assert (job.status, job.result, job.params) == ("done", {"repo": "octocat/project"}, {"repo": "octocat/project"})
+    assert runs == ["octocat/project"]
+
+    # Once finished, a new submission starts a new job
+    assert await queue.submit("analysis", "octocat/project", lambda: analyze("octocat/project")) != ids[0]
+    await queue.queue.join()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_bounds_concurrency(queue):
+    running = 0
+    max_running = 0
+
+    async def analyze():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for i in range(6):
+        await queue.submit("analysis", f"repo-{i}", analyze)
+    await queue.queue.join()
+
+    assert max_running == 2
+    assert all(job.status == "done" for job in queue.store.jobs.values())
+
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error(queue):
+    async def analyze():
+        raise HTTPException(status_code=400, detail="Group does not have a GitHub link")
+
+    job_id = await queue.submit("analysis", "group", analyze)
+    await queue.queue.join()
+
+    job = await queue.store.get(job_id)
+    assert (job.status, job.error) == ("failed", "Group does not have a GitHub link")
+    assert "group" not in queue.active
+
+
+@pytest.mark.asyncio
+async def test_only_jobs_with_expired_leases_are_failed():
+    store = MemoryJobStore()
+    now = datetime.now()
+
+    def job(owner, lease_expires_at, status="running"):
+        job_id = ObjectId()
+        store.jobs[job_id] = SimpleNamespace(id=job_id, status=status, error=None, owner=owner,
+                                             lease_expires_at=lease_expires_at)
+        return store.jobs[job_id]
+
+    live = job("worker-1", now + timedelta(seconds=30))
+    stopped = job("worker-2", now - timedelta(seconds=1), status="queued")
+    legacy = job(None, None)
+
+    # A second process starting must not fail the jobs of the live one
+    queue = JobQueue(store, workers=1, lease_seconds=0.03)
+    await queue.start()
+    try:
+        assert live.status == "running"
+        assert (stopped.status, stopped.error) == ("failed", "Interrupted by a server restart")
+        assert legacy.status == "failed"
+
+        release = asyncio.Event()
+        job_id = await queue.submit("analysis", "octocat/project", release.wait)
+        await asyncio.sleep(0.1)
+        # The heartbeat kept renewing the running job past its first lease
+        own = await store.get(job_id)
+        assert (own.status, own.owner) == ("running", queue.owner)
+        assert own.lease_expires_at > datetime.now()
+        # The other process's job is failed once its lease runs out
+        assert live.status == "running"
+        live.lease_expires_at = datetime.now() - timedelta(seconds=1)
+        await asyncio.sleep(0.05)
+        assert live.status == "failed"
+
+        release.set()
+        await queue.queue.join()
+        assert own.status == "done"
+    finally:
+        await queue.stop()
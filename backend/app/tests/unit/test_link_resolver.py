@@ -0,0 +1,58 @@
+import pytest
+from types import SimpleNamespace
+from bson import DBRef, ObjectId
+from beanie import Link
+from service.link_resolver import LinkResolver
+
+
+class FakeQuery:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self):
+        return self.documents
+
+
+class FakeUser:
+    store = {}
+    queries = []
+
+    @classmethod
+    def find(cls, query, with_children=False):
+        cls.queries.append(query)
+        ids = query["_id"]["$in"]
+        return FakeQuery([cls.store[i] for i in ids if i in cls.store])
+
+
+def make_link(doc_id):
+    return Link(DBRef("User", doc_id), document_class=FakeUser)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_issues_one_query_per_collection():
+    ids = [ObjectId() for _ in range(4)]
+    FakeUser.store = {i: SimpleNamespace(id=i, ho_ten=f"User {n}") for n, i in enumerate(ids)}
+    FakeUser.queries = []
+    groups = [
+        SimpleNamespace(leaders=make_link(ids[0]), members=[make_link(ids[0]), make_link(ids[1])]),
+        SimpleNamespace(leaders=make_link(ids[2]), members=[make_link(ids[2]), make_link(ids[3])]),
+    ]
+
+    links = await LinkResolver().prefetch(groups, "leaders", "members")
+
+    assert len(FakeUser.queries) == 1
+    assert sorted(FakeUser.queries[0]["_id"]["$in"]) == sorted(ids)
+    assert links.resolve(groups[1].leaders).ho_ten == "User 2"
+    assert [m.id for m in links.resolve_list(groups[0].members)] == ids[:2]
+
+
+@pytest.mark.asyncio
+async def test_resolve_passes_through_documents_and_drops_missing():
+    FakeUser.store = {}
+    FakeUser.queries = []
+    embedded = SimpleNamespace(id=ObjectId(), ho_ten="Embedded")
+    group = SimpleNamespace(members=[embedded, make_link(ObjectId())])
+
+    links = await LinkResolver().prefetch([group], "members")
+
+    assert links.resolve_list(group.members) == [embedded]
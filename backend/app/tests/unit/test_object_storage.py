@@ -0,0 +1,79 @@
+import socket
+import httpx
+import pytest
+from fastapi import FastAPI
+from routes import health_routes, upload
+from service.object_storage import ObjectStorage, create_minio_client, object_storage
+from tests.fake_s3 import FakeS3
+
+BUCKET = "documents"
+
+
+@pytest.fixture
+def s3():
+    s3 = FakeS3()
+    with s3.serve() as endpoint:
+        s3.endpoint = endpoint
+        yield s3
+
+
+def storage_at(endpoint):
+    # Set up as in production: a fast-failing client without retries for setup and health probes
+    probe_client = create_minio_client(endpoint, timeout=1, retries=False, pool_size=1)
+    return ObjectStorage(create_minio_client(endpoint), BUCKET, 2, probe_client=probe_client)
+
+
+def unreachable_endpoint():
+    # A port nothing listens on: connections are refused at once
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"127.0.0.1:{port}"
+
+
+async def get(storage, path):
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.include_router(health_routes.router)
+    app.dependency_overrides[object_storage] = lambda: storage
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        return await http.get(path)
+
+
+@pytest.mark.asyncio
+async def test_connect_retries_until_storage_is_up(s3):
+    s3.failures = 3
+    storage = storage_at(s3.endpoint)
+
+    await storage.connect(initial_delay=0.01)
+
+    assert storage.bucket_ready
+    assert BUCKET in s3.buckets
+    assert s3.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_routes_answer_503_while_storage_is_down():
+    storage = storage_at(unreachable_endpoint())
+
+    response = await get(storage, "/upload/tasks/t1/list-files/")
+    assert response.status_code == 503
+    assert storage.last_error
+
+    response = await get(storage, "/health/storage")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+
+
+@pytest.mark.asyncio
+async def test_bucket_created_on_first_request(s3):
+    storage = storage_at(s3.endpoint)
+
+    response = await get(storage, "/upload/tasks/t1/list-files/")
+    assert response.status_code == 200
+    assert BUCKET in s3.buckets
+
+    response = await get(storage, "/health/storage")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
@@ -0,0 +1,30 @@
+import pytest
+from types import SimpleNamespace
+from bson import ObjectId
+from fastapi import HTTPException, Response
+from service.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, set_next_cursor
+
+
+def test_cursor_round_trip():
+    document_id = ObjectId()
+    cursor = encode_cursor(document_id)
+    assert str(document_id) not in cursor
+    assert decode_cursor(cursor) == document_id
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_next_cursor_only_set_on_full_pages():
+    items = [SimpleNamespace(id=ObjectId()) for _ in range(3)]
+
+    response = Response()
+    set_next_cursor(response, items, limit=3)
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == items[-1].id
+
+    response = Response()
+    set_next_cursor(response, items, limit=5)
+    assert NEXT_CURSOR_HEADER not in response.headers
@@ -0,0 +1,214 @@
+import asyncio
+import os
+from datetime import timedelta
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from minio import Minio
+from config import env
+from routes import upload
+from service.object_storage import ObjectStorage, get_object_storage
+from tests.fake_s3 import FakeS3
+
+PART_SIZE = 5 * 1024 * 1024
+
+
+@pytest.fixture
+def s3():
+    s3 = FakeS3()
+    s3.buckets[env.MINIO_BUCKET] = {}
+    with s3.serve() as endpoint:
+        s3.endpoint = endpoint
+        yield s3
+
+
+def create_app(s3, max_concurrency=4):
+    client = Minio(s3.endpoint, access_key="test", secret_key="test", secure=False, region="us-east-1")
+    storage = ObjectStorage(client, env.MINIO_BUCKET, max_concurrency)
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.dependency_overrides[get_object_storage] = lambda: storage
+    app.state.storage = storage
+    return app
+
+
+@pytest.fixture
+def app(s3, monkeypatch):
+    monkeypatch.setattr(env, "UPLOAD_PART_SIZE", PART_SIZE)
+    return create_app(s3)
+
+
+@pytest_asyncio.fixture
+async def http(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+
+
+@pytest.mark.asyncio
+async def test_large_upload_is_streamed_in_parts(http, s3):
+    data = os.urandom(2 * PART_SIZE + 1024)
+    response = await http.post("/upload/tasks/t1/upload-file/", files={"file": ("report.pdf", data, "application/pdf")})
+    assert response.status_code == 200
+
+    stored = s3.buckets[env.MINIO_BUCKET]["t1/report.pdf"]
+    assert stored["data"] == data
+    assert stored["content_type"] == "application/pdf"
+    # Never more than one part per request
+    assert s3.completed_uploads == [{"key": "t1/report.pdf", "part_sizes": [PART_SIZE, PART_SIZE, 1024]}]
+    assert max(s3.body_sizes) == PART_SIZE
+
+
+@pytest.mark.asyncio
+async def test_small_upload_is_a_single_put(http, s3):
+    response = await http.post("/upload/tasks/t1/upload-file/", files={"file": ("notes.txt", b"hello", "text/plain")})
+    assert response.status_code == 200
+    assert s3.buckets[env.MINIO_BUCKET]["t1/notes.txt"]["data"] == b"hello"
+    assert s3.completed_uploads == []
+
+    response = await http.get("/upload/tasks/t1/list-files/")
+    assert [f["filename"] for f in response.json()["files"]] == ["notes.txt"]
+
+
+@pytest.fixture
+def video(s3):
+    data = bytes(range(256)) * 40
+    s3.put(env.MINIO_BUCKET, "t1/demo.mp4", data, "video/mp4")
+    return data
+
+
+@pytest.mark.asyncio
+async def test_download_whole_file(http, video):
+    response = await http.get("/upload/tasks/t1/download-file/demo.mp4")
+    assert response.status_code == 200
+    assert response.content == video
+    assert response.headers["content-type"] == "video/mp4"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(video))
+
+
+@pytest.mark.asyncio
+async def test_download_range(http, s3, video):
+    response = await http.get("/upload/tasks/t1/download-file/demo.mp4", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == video[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(video)}"
+    # Only the requested bytes are fetched from storage
+    assert s3.ranges[-1] == "bytes=100-199"
+
+    response = await http.get("/upload/tasks/t1/download-file/demo.mp4", headers={"Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == video[-10:]
+
+    response = await http.get("/upload/tasks/t1/download-file/demo.mp4", headers={"Range": f"bytes={len(video)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(video)}"
+
+
+@pytest.mark.asyncio
+async def test_download_if_range(http, video):
+    full = await http.get("/upload/tasks/t1/download-file/demo.mp4")
+    etag, last_modified = full.headers["etag"], full.headers["last-modified"]
+
+    for validator in (etag, last_modified):
+        response = await http.get("/upload/tasks/t1/download-file/demo.mp4",
+                                  headers={"Range": "bytes=0-9", "If-Range": validator})
+        assert response.status_code == 206
+
+    # The file changed since the partial download: start over
+    response = await http.get("/upload/tasks/t1/download-file/demo.mp4",
+                              headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == video
+
+
+@pytest.mark.asyncio
+async def test_download_missing_file(http):
+    response = await http.get("/upload/tasks/t1/download-file/missing.mp4")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_disconnect_releases_storage_connection(app, video, monkeypatch):
+    monkeypatch.setattr(upload, "CHUNK_SIZE", 1024)
+    client = app.state.storage.client
+    opened = []
+    get_object = client.get_object
+    monkeypatch.setattr(client, "get_object", lambda *args, **kwargs: opened.append(get_object(*args, **kwargs)) or opened[-1])
+
+    chunks = []
+    first_chunk = asyncio.Event()
+    requests = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+    async def receive():
+        request = next(requests, None)
+        if request:
+            return request
+        await first_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+            first_chunk.set()
+            # Client gone: the next chunk would wait forever
+            await asyncio.sleep(3600)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/upload/tasks/t1/download-file/demo.mp4", "raw_path": b"/upload/tasks/t1/download-file/demo.mp4",
+        "query_string": b"", "headers": [], "server": ("test", 80), "client": ("test", 1234), "root_path": "",
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=10)
+
+    assert len(chunks) == 1
+    assert opened[0].closed
+    assert opened[0].connection is None
+
+
+@pytest.mark.asyncio
+async def test_storage_calls_are_limited_without_stalling_other_routes(s3, video):
+    s3.delay = 0.3
+    app = create_app(s3, max_concurrency=2)
+
+    @app.get("/ping")
+    def ping():
+        return "pong"
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        downloads = [asyncio.create_task(http.get("/upload/tasks/t1/download-file/demo.mp4")) for _ in range(6)]
+        await asyncio.sleep(0.1)
+        # Sync routes run in the shared thread pool, which the queued transfers leave alone
+        started = asyncio.get_running_loop().time()
+        assert (await http.get("/ping")).json() == "pong"
+        assert asyncio.get_running_loop().time() - started < 0.2
+
+        for response in await asyncio.gather(*downloads):
+            assert response.content == video
+    assert s3.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_presigned_urls_go_straight_to_storage(app, s3):
+    storage = app.state.storage
+    data = b"report contents"
+
+    url = await storage.presigned_put("t1/report.pdf", timedelta(minutes=15))
+    assert "X-Amz-Expires=900" in url
+    async with httpx.AsyncClient() as browser:
+        assert (await browser.put(url, content=data)).status_code == 200
+        assert (await storage.stat("t1/report.pdf")).size == len(data)
+
+        url = await storage.presigned_get("t1/report.pdf", timedelta(minutes=15), "report.pdf")
+        assert "response-content-disposition=attachment" in url
+        assert (await browser.get(url)).content == data
+
+
+@pytest.mark.asyncio
+async def test_presigned_urls_use_public_endpoint(s3):
+    client = Minio(s3.endpoint, access_key="test", secret_key="test", secure=False, region="us-east-1")
+    public = Minio("files.example.com", access_key="test", secret_key="test", secure=True, region="us-east-1")
+    storage = ObjectStorage(client, env.MINIO_BUCKET, 1, presign_client=public)
+
+    url = await storage.presigned_put("t1/report.pdf", timedelta(minutes=15))
+    assert url.startswith(f"https://files.example.com/{env.MINIO_BUCKET}/t1/report.pdf?")
@@ -0,0 +1,114 @@
+"""Latency of hydrating a page of tasks: per-link fetches vs. batched $in queries.
+
+Mongo is simulated in memory with a fixed round-trip latency so the numbers
+only reflect the number of round trips each strategy needs.
+
+    PYTHONPATH=app python benchmarks/task_hydration.py
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from beanie import Link
+from bson import DBRef, ObjectId
+
+from service.link_resolver import LinkResolver
+
+
+class FakeQuery:
+    def __init__(self, collection, ids):
+        self.collection = collection
+        self.ids = ids
+
+    async def to_list(self):
+        await asyncio.sleep(self.collection.latency)
+        return [self.collection.store[i] for i in self.ids if i in self.collection.store]
+
+
+class FakeCollection:
+    latency = 0.0
+
+    def __init__(self, name):
+        self.name = name
+        self.store = {}
+
+    def find(self, query, with_children=False):
+        return FakeQuery(self, query["_id"]["$in"])
+
+    async def get(self, document_id):
+        await asyncio.sleep(self.latency)
+        return self.store.get(document_id)
+
+
+def build_page(groups, users, task_count, students_per_task):
+    tasks = []
+    for n in range(task_count):
+        group = SimpleNamespace(id=ObjectId(), name=f"Group {n % 20}")
+        groups.store[group.id] = group
+        students = []
+        for m in range(students_per_task):
+            student = SimpleNamespace(id=ObjectId(), ho_ten=f"Student {n}-{m}", email=f"s{n}{m}@example.com")
+            users.store[student.id] = student
+            students.append(Link(DBRef(users.name, student.id), document_class=users))
+        tasks.append(SimpleNamespace(
+            group=Link(DBRef(groups.name, group.id), document_class=groups),
+            assigned_students=students,
+        ))
+    return tasks
+
+
+def to_row(group, students):
+    return {
+        "group_name": group.name,
+        "assigned_students": [{"id": str(s.id), "ho_ten": s.ho_ten, "email": s.email} for s in students],
+    }
+
+
+async def sequential(tasks):
+    """The previous get_all_tasks loop: one round trip per link."""
+    result = []
+    for task in tasks:
+        group = await task.group.document_class.get(task.group.ref.id)
+        students = []
+        for link in task.assigned_students:
+            students.append(await link.document_class.get(link.ref.id))
+        result.append(to_row(group, students))
+    return result
+
+
+async def batched(tasks):
+    links = await LinkResolver().prefetch(tasks, "group", "assigned_students")
+    return [to_row(links.resolve(t.group), links.resolve_list(t.assigned_students)) for t in tasks]
+
+
+async def measure(strategy, tasks, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await strategy(tasks)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+async def main(args):
+    FakeCollection.latency = args.latency_ms / 1000
+    groups, users = FakeCollection("Group"), FakeCollection("User")
+    tasks = build_page(groups, users, args.tasks, args.students)
+    assert await sequential(tasks) == await batched(tasks)
+
+    print(f"{args.tasks} tasks x {args.students} students, {args.latency_ms} ms per round trip, {args.runs} runs")
+    print(f"{'strategy':<12}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for name, strategy in (("sequential", sequential), ("batched", batched)):
+        p50, p99 = await measure(strategy, tasks, args.runs)
+        print(f"{name:<12}{p50:>12.1f}{p99:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--students", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.5)
+    parser.add_argument("--runs", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))